@@ -6,11 +6,18 @@ cd "$(dirname "$0")/.." || exit
 APP_PATH="web_ui/app.py"
 LOG_FILE="logs/ui.log"
 VENV_PYTHON="venv/bin/python"
+# Resident prediction service (warm models/history for /predict runs)
+SERVICE_PATH="ml_project/prediction_service.py"
+SERVICE_LOG="logs/prediction_service.log"
 
 function get_pid {
     ps aux | grep "$APP_PATH" | grep -v grep | awk '{print $2}'
 }
 
+function get_service_pid {
+    ps aux | grep "$SERVICE_PATH serve" | grep -v grep | awk '{print $2}'
+}
+
 function start {
     PID=$(get_pid)
     if [ -n "$PID" ]; then
@@ -22,6 +29,13 @@ function start {
         NEW_PID=$(get_pid)
         echo "Server started (PID: $NEW_PID). Logs at $LOG_FILE"
     fi
+
+    SERVICE_PID=$(get_service_pid)
+    if [ -z "$SERVICE_PID" ]; then
+        echo "Starting prediction service..."
+        PYTHONPATH=$(pwd):$(pwd)/ml_project nohup $VENV_PYTHON $SERVICE_PATH serve > $SERVICE_LOG 2>&1 &
+        echo "Prediction service started. Logs at $SERVICE_LOG"
+    fi
 }
 
 function stop {
@@ -33,6 +47,12 @@ function stop {
     else
         echo "Server is not running."
     fi
+
+    SERVICE_PID=$(get_service_pid)
+    if [ -n "$SERVICE_PID" ]; then
+        echo "Stopping prediction service (PID: $SERVICE_PID)..."
+        kill $SERVICE_PID
+    fi
 }
 
 function restart {
@@ -49,6 +69,13 @@ function status {
     else
         echo "Server is STOPPED."
     fi
+
+    SERVICE_PID=$(get_service_pid)
+    if [ -n "$SERVICE_PID" ]; then
+        echo "Prediction service is RUNNING (PID: $SERVICE_PID)."
+    else
+        echo "Prediction service is STOPPED."
+    fi
 }
 
 case "$1" in
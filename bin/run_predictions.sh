@@ -5,13 +5,23 @@ cd "$(dirname "$0")/.." || exit
 
 # Configuration
 VENV_PATH="venv/bin/activate"
-# Check for --force flag and Date Arg
+# Detail pages scraped in parallel on reusable Playwright pages (0 = one request per match)
+PAGE_POOL=${PAGE_POOL:-4}
+# Predict while scraping: the spider streams matches as JSON Lines and the predictor tails them
+STREAM_PREDICT=${STREAM_PREDICT:-true}
+# Per-match scrape cache: --force only revisits detail pages whose cached fields are stale
+SCRAPE_CACHE="data_sets/scrape_cache.json"
+# Check for --force / --no-cache flags and Date Arg
 FORCE_SCRAPE=false
 TARGET_DATE=""
 
 for arg in "$@"; do
     if [ "$arg" == "--force" ] || [ "$arg" == "-f" ]; then
         FORCE_SCRAPE=true
+    elif [ "$arg" == "--no-cache" ]; then
+        # Full re-scrape of every detail page (cache is still refreshed)
+        FORCE_SCRAPE=true
+        rm -f "$SCRAPE_CACHE"
     elif [[ "$arg" =~ ^[0-9]{4}-[0-9]{2}-[0-9]{2}$ ]]; then
         TARGET_DATE="$arg"
     fi
@@ -33,6 +43,8 @@ else
 fi
 
 OUTPUT_JSON="output/matches_$DATE.json"
+STREAM_JSONL="output/matches_$DATE.jsonl"
+PREDICTIONS_CSV="output/predictions_$DATE.csv"
 
 echo "========================================"
 echo "    Flashscore ML Prediction Pipeline   "
@@ -94,49 +106,85 @@ else
     fi
 fi
 
+# Export PYTHONPATH to include project root and ml_project so imports work
+export PYTHONPATH=$PYTHONPATH:$(pwd):$(pwd)/ml_project
+
+STREAMED=false
 if [ "$NEED_SCRAPE" == "true" ]; then
+    STREAM_ARGS=""
+    if [ "$STREAM_PREDICT" == "true" ]; then
+        # A forced run re-predicts everything; otherwise (e.g. after a crash) already predicted matches are kept
+        if [ "$FORCE_SCRAPE" == "true" ]; then
+            rm -f "$STREAM_JSONL" "$PREDICTIONS_CSV"
+        fi
+        rm -f "$STREAM_JSONL.done"
+        echo "[*] Starting streaming predictor (tailing $STREAM_JSONL)..."
+        # Submitted to the resident prediction service if it is running (in-process otherwise)
+        python3 ml_project/prediction_service.py submit --stream "$STREAM_JSONL" --output "$PREDICTIONS_CSV" &
+        PREDICT_PID=$!
+        STREAM_ARGS="-a stream_output=$STREAM_JSONL"
+        STREAMED=true
+    fi
+
     echo "[*] Starting Scraper..."
     start_ts=$(date +%s)
     start_date=$(date "+%Y-%m-%d %H:%M:%S")
     echo "[$start_date] Status: Started" >> logs/scraper_status.log
 
-    # Pass day_diff
-    scrapy crawl flashscore -O $OUTPUT_JSON -L WARNING -a filter_leagues=true -a day_diff=$DAY_DIFF
+    # Pass day_diff, page pool size, scrape cache and stream output
+    scrapy crawl flashscore -O $OUTPUT_JSON -L WARNING -a filter_leagues=true -a day_diff=$DAY_DIFF -a page_pool=$PAGE_POOL -a scrape_cache=$SCRAPE_CACHE $STREAM_ARGS
+    scrape_status=$?
 
     end_ts=$(date +%s)
     end_date=$(date "+%Y-%m-%d %H:%M:%S")
     duration=$((end_ts - start_ts))
 
-    if [ $? -eq 0 ]; then
+    if [ $scrape_status -eq 0 ]; then
         echo "[+] Scraper Finished. Data saved to $OUTPUT_JSON"
         echo "[$end_date] Status: Success | Start: $start_date | End: $end_date | Duration: ${duration}s" >> logs/scraper_status.log
     else
         echo "[-] Scraper Failed."
         echo "[$end_date] Status: Failed | Start: $start_date | End: $end_date | Duration: ${duration}s" >> logs/scraper_status.log
+        if [ "$STREAMED" == "true" ]; then
+            # End marker first, so a service-side stream job stops too
+            touch "$STREAM_JSONL.done"
+            kill $PREDICT_PID 2>/dev/null
+        fi
         exit 1
     fi
 fi
 
-# 3. Run Prediction
-echo ""
-echo "[*] Running ML Prediction Engine..."
+if [ "$STREAMED" == "true" ]; then
+    # Predictor drains the remaining lines and exits on the crawl's end marker
+    wait $PREDICT_PID
+    if [ $? -eq 0 ]; then
+        echo "[+] Streaming Prediction Complete. Saved to $PREDICTIONS_CSV"
+    else
+        echo "[-] Streaming Prediction Failed!"
+        exit 1
+    fi
+fi
 
-# Export PYTHONPATH to include project root and ml_project so imports work
-export PYTHONPATH=$PYTHONPATH:$(pwd):$(pwd)/ml_project
+# 3. Run Prediction (batch, when the scrape was reused or not streamed)
+if [ "$STREAMED" == "false" ]; then
+    echo ""
+    echo "[*] Running ML Prediction Engine..."
 
-# Check if JSON is valid (rudimentary check) or just run script
-if [ ! -s "$OUTPUT_JSON" ]; then
-    echo "[-] Error: Output JSON is empty. Scraper likely failed."
-    exit 1
-fi
+    # Check if JSON is valid (rudimentary check) or just run script
+    if [ ! -s "$OUTPUT_JSON" ]; then
+        echo "[-] Error: Output JSON is empty. Scraper likely failed."
+        exit 1
+    fi
 
-python3 -c "from ml_project.predict_matches import MatchPredictor; predictor = MatchPredictor(scraper_output='$OUTPUT_JSON'); predictor.predict()"
+    # Warm models/history in the prediction service if it is running (in-process otherwise)
+    python3 ml_project/prediction_service.py submit --input "$OUTPUT_JSON"
 
-if [ $? -eq 0 ]; then
-    echo "[+] Prediction Complete."
-else
-    echo "[-] Prediction Failed!"
-    exit 1
+    if [ $? -eq 0 ]; then
+        echo "[+] Prediction Complete."
+    else
+        echo "[-] Prediction Failed!"
+        exit 1
+    fi
 fi
 
 echo ""
@@ -8,6 +8,7 @@ source venv/bin/activate
 # Run the standings spider
 # No -O because the pipeline handles the files.
 # Run the standings spider (Silenced)
-scrapy crawl standings -L WARNING
+# fast: one browser context per league, all nine tables fetched in parallel tabs
+scrapy crawl standings -L WARNING -a fast=true
 
 echo "Standings update complete."
@@ -0,0 +1,100 @@
+# Parser for the match-list feed the Flashscore page fetches for each day
+# (e.g. https://local-global.flashscore.ninja/2/x/feed/f_1_1_2_en_1 for
+# football, tomorrow). Records are separated by '~', fields by '¬' and
+# key/value by '÷':
+#
+#   SA÷1¬~ZA÷ENGLAND: Premier League¬ZY÷England¬...¬~AA÷<match id>¬AD÷<unix start>¬
+#   AB÷<status>¬AE÷<home>¬AF÷<away>¬AG÷<home score>¬AH÷<away score>¬WU÷<home slug>¬PX÷<home id>¬...¬~
+#
+# A 'ZA' record opens a league; the 'AA' records after it are its matches.
+
+import datetime
+import re
+
+RECORD_SEP = '~'
+FIELD_SEP = '¬'
+KV_SEP = '÷'
+
+# f_<sport>_<day offset>_<tz>_<lang>_<page>; sport 1 = football
+FEED_URL_RE = re.compile(r'/feed/f_1_(-?\d+)_')
+
+MATCH_URL = "https://www.flashscore.com/match/football/{home_slug}-{home_id}/{away_slug}-{away_id}/"
+
+
+class FeedDecodeError(ValueError):
+    """The payload is not a match-list feed we can read."""
+
+
+def feed_day_offset(url):
+    """Day offset (0 = today) of a football match-list feed URL, else None."""
+    m = FEED_URL_RE.search(url or '')
+    return int(m.group(1)) if m else None
+
+
+def parse_records(text):
+    """Split a feed payload into a list of {key: value} records."""
+    records = []
+    for raw in text.split(RECORD_SEP):
+        record = {}
+        for field in raw.split(FIELD_SEP):
+            if KV_SEP in field:
+                key, value = field.split(KV_SEP, 1)
+                record[key] = value
+        if record:
+            records.append(record)
+    return records
+
+
+def _score(value):
+    return value if value not in (None, '') else None
+
+
+def _start_time(value):
+    """Unix timestamp -> 'DD.MM.YYYY HH:MM' (local time, as shown on the match page)."""
+    try:
+        return datetime.datetime.fromtimestamp(int(value)).strftime("%d.%m.%Y %H:%M")
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def parse_match_list(text):
+    """
+    Fixtures of a match-list feed payload, in page order:
+    [{'match_id', 'league', 'home_team', 'away_team', 'home_score', 'away_score',
+      'start_time', 'status', 'base_url'}, ...]
+
+    Raises FeedDecodeError if the payload has no league/match records or a
+    match is missing its id or team names.
+    """
+    if not isinstance(text, str) or KV_SEP not in text:
+        raise FeedDecodeError("not a Flashscore feed payload")
+
+    fixtures = []
+    league = None
+    for record in parse_records(text):
+        if 'ZA' in record:
+            league = " ".join(record['ZA'].split())
+        elif 'AA' in record:
+            home = record.get('AE') or record.get('CX')
+            away = record.get('AF')
+            if league is None or not record['AA'] or not home or not away:
+                raise FeedDecodeError(f"incomplete match record: {record.get('AA')!r}")
+            base_url = None
+            if all(record.get(k) for k in ('WU', 'PX', 'WV', 'PY')):
+                base_url = MATCH_URL.format(home_slug=record['WU'], home_id=record['PX'],
+                                            away_slug=record['WV'], away_id=record['PY'])
+            fixtures.append({
+                'match_id': record['AA'],
+                'league': league,
+                'home_team': home,
+                'away_team': away,
+                'home_score': _score(record.get('AG')),
+                'away_score': _score(record.get('AH')),
+                'start_time': _start_time(record.get('AD')),
+                'status': record.get('AB'),
+                'base_url': base_url,
+            })
+
+    if not fixtures:
+        raise FeedDecodeError("feed has no match records")
+    return fixtures
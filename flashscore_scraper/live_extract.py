@@ -0,0 +1,178 @@
+# Page readers for in-play matches, shared by the flashscore spider
+# (live_list / live_ids runs) and the resident live service
+# (scripts/live_service.py), which keeps its pages open and re-reads them.
+#
+# Everything is read with one page.evaluate() per call: the live list
+# (ids, teams, score and stage of every row on the LIVE tab) and the
+# match statistics page (score, clock and the stats LiveAdjuster uses).
+
+import re
+
+LIVE_LIST_URL = "https://www.flashscore.com/"
+MATCH_STATS_URL = "https://www.flashscore.com/match/{match_id}/#/match-summary/match-statistics/0"
+
+MATCH_ROW_SELECTOR = '[id^="g_1_"]'
+LIVE_TAB_SELECTOR = '.filters__tab:has-text("LIVE")'
+COOKIE_BUTTON = "button#onetrust-accept-btn-handler"
+
+# Rows of the match list: [{match_id, home_team, away_team, home_score, away_score, stage}]
+LIVE_LIST_JS = r"""
+() => Array.from(document.querySelectorAll('[id^="g_1_"]')).map(row => {
+    const text = sel => {
+        const el = row.querySelector(sel);
+        return el ? el.innerText.split('\n')[0].trim() : null;
+    };
+    return {
+        match_id: row.id.replace('g_1_', ''),
+        home_team: text('.event__homeParticipant') || text('.event__participant--home'),
+        away_team: text('.event__awayParticipant') || text('.event__participant--away'),
+        home_score: text('.event__score--home'),
+        away_score: text('.event__score--away'),
+        stage: text('.event__stage--block') || text('.event__stage'),
+    };
+})
+"""
+
+# Score, clock and statistics of a match page (regex on the page text, the most robust option)
+LIVE_STATS_JS = r"""
+() => {
+    const bodyText = document.body.innerText;
+    const stats = {};
+
+    function extractStat(label, key) {
+        // Matches: Value - Label - Value (with optional hyphens/spaces)
+        // Example: 0.18 - Expected Goals (xG) - 1.31
+        const regex = new RegExp(`([\\d\\.]+)[^\\d\\n]*${label}[^\\d\\n]*([\\d\\.]+)`, 'i');
+        const match = bodyText.match(regex);
+        if (match) {
+            stats[key + '_home'] = parseFloat(match[1]);
+            stats[key + '_away'] = parseFloat(match[2]);
+        }
+    }
+
+    extractStat('Expected Goals', 'xg');
+    extractStat('Total shots', 'shots');
+    extractStat('Goal Attempts', 'shots'); // Alt
+    extractStat('Ball Possession', 'possession');
+    extractStat('Corner Kicks', 'corners');
+
+    let scores = document.querySelector('.detailScore__wrapper')?.innerText || '0-0';
+    scores = scores.replace(/\n/g, '').replace(/\s+/g, '');
+    const hScore = document.querySelector('.detailScore__wrapper span:nth-child(1)')?.innerText;
+    const aScore = document.querySelector('.detailScore__wrapper span:nth-child(3)')?.innerText;
+    if (hScore && aScore) scores = hScore + "-" + aScore;
+
+    let time = document.querySelector('.eventTime')?.innerText;
+    if (!time) {
+        time = document.querySelector('.detailScore__status')?.innerText || '0';
+    }
+
+    // 2nd Half status, for relative clocks
+    const bodyUpper = bodyText.toUpperCase();
+    const is2nd = bodyUpper.includes("2ND HALF") || bodyUpper.includes("SECOND HALF");
+
+    // Look for mm:ss or a match state if the clock element is missing
+    if (!time || (!time.includes(':') && !time.includes("'"))) {
+        const timeMatch = bodyText.match(/(\d{1,3}):(\d{2})/);
+        if (timeMatch) {
+            time = timeMatch[0]; // "63:06"
+        } else if (bodyText.includes("Half Time") || bodyText.includes("HT")) {
+            time = "45";
+        } else if (bodyText.includes("Finished")) {
+            time = "90";
+        }
+    }
+
+    return { score: scores, time: time, stats: stats, is_second_half: is2nd };
+}
+"""
+
+STATS_VISIBLE_JS = "() => document.body.innerText.includes('Ball Possession') || document.body.innerText.includes('Total shots')"
+
+
+def parse_minute(time_str, is_2nd_half=False):
+    """Match minute (0-90, more only in extra time) from the clock text of a match page."""
+    time_str = str(time_str or '').strip().upper()
+
+    mm_ss = re.search(r'(\d+):(\d+)', time_str)
+    if mm_ss:
+        minute = int(mm_ss.group(1))
+        # Some views show the clock relative to the half (18:00 in the 2nd half = 63')
+        if is_2nd_half and minute < 45:
+            minute += 45
+        if minute > 90 and "EXTRA" not in time_str:
+            minute = 90
+        return minute
+    if "HALF" in time_str:
+        return 45
+    if "FULL" in time_str or "FINISH" in time_str:
+        return 90
+    if "'" in time_str:
+        head = time_str.split("'")[0]
+        if head.isdigit():
+            minute = int(head)
+            return minute + 45 if is_2nd_half and minute < 45 else minute
+        base = head.split('+')[0]
+        return int(base) if base.isdigit() else 0
+    if time_str.isdigit():
+        minute = int(time_str)
+        return minute + 45 if is_2nd_half and minute < 45 else minute
+    return 0
+
+
+def is_women_match(home, away):
+    """Women's fixtures ("Arsenal W", "USA (W)", "Chelsea Women"), which we have no models for."""
+    text = f"{home} {away}".lower()
+    return (" w " in f" {text} " or "(w)" in text or "women" in text
+            or home.endswith(" W") or away.endswith(" W"))
+
+
+async def accept_cookies(page, wait_ms=500):
+    try:
+        if await page.query_selector(COOKIE_BUTTON):
+            await page.click(COOKIE_BUTTON)
+            await page.wait_for_timeout(wait_ms)
+    except Exception:
+        pass
+
+
+async def open_live_tab(page, timeout=15000):
+    """Wait for the match list and switch it to the LIVE tab (best effort)."""
+    try:
+        await page.wait_for_selector(MATCH_ROW_SELECTOR, timeout=timeout)
+        await page.click(LIVE_TAB_SELECTOR)
+        await page.wait_for_timeout(2000)
+    except Exception:
+        pass
+
+
+async def read_live_list(page, skip_women=True):
+    """Rows of the (LIVE tab) match list that have an id and both team names."""
+    rows = await page.evaluate(LIVE_LIST_JS)
+    return [
+        row for row in rows
+        if row['match_id'] and row['home_team'] and row['away_team']
+        and not (skip_women and is_women_match(row['home_team'], row['away_team']))
+    ]
+
+
+async def show_stats_tab(page):
+    """Click the Stats tab if the statistics are not on screen (SPA routing sometimes ignores the URL)."""
+    try:
+        if not await page.evaluate(STATS_VISIBLE_JS):
+            stats_tab = page.locator('a[href*="/match-statistics"], button:has-text("Stats")')
+            if await stats_tab.count() > 0:
+                await stats_tab.first.click()
+                await page.wait_for_timeout(2000)
+    except Exception:
+        pass
+
+
+async def read_match_state(page):
+    """{'score': 'H-A', 'minute': int, 'stats': {...}} of an open match statistics page."""
+    data = await page.evaluate(LIVE_STATS_JS)
+    return {
+        'score': data['score'],
+        'minute': parse_minute(data.get('time'), data.get('is_second_half', False)),
+        'stats': data['stats'],
+    }
@@ -13,6 +13,38 @@ class FlashscoreScraperPipeline:
     def process_item(self, item, spider):
         return item
 
+class JsonLinesStreamPipeline:
+    """
+    -a stream_output=<path>: appends every item to a JSON Lines file as soon as
+    it is scraped (flushed per line), so the predictor can tail the crawl.
+    '<path>.done' is written when the spider closes.
+    """
+    def open_spider(self, spider):
+        self.file = None
+        self.path = getattr(spider, 'stream_output', None)
+        if not self.path: return
+        
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if os.path.exists(self.done_marker()):
+            os.remove(self.done_marker())
+        # Append: a restarted crawl keeps what was already streamed (consumers skip known match_ids)
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def done_marker(self):
+        return f"{self.path}.done"
+
+    def process_item(self, item, spider):
+        if self.file is not None:
+            self.file.write(json.dumps(ItemAdapter(item).asdict(), ensure_ascii=False) + "\n")
+            self.file.flush()
+        return item
+
+    def close_spider(self, spider):
+        if self.file is None: return
+        self.file.close()
+        with open(self.done_marker(), 'w') as f:
+            f.write("done\n")
+
 class StandingsPipeline:
     def open_spider(self, spider):
         if spider.name != "standings": return
@@ -64,8 +96,35 @@ class StandingsPipeline:
     def close_spider(self, spider):
         if spider.name != "standings": return
         
+        # Write every table to a temp file first and swap them in at the end (os.replace is atomic),
+        # so a crash or a partial crawl never leaves half-written or emptied tables behind
+        attempted = getattr(spider, 'attempted_leagues', set())
+        pending = []
         for key, rows in self.data_store.items():
             filepath = os.path.join(self.base_dir, f"{key}.json")
-            with open(filepath, 'w') as f:
+            rows = rows + self.previous_rows(filepath, rows, attempted)
+            if not rows:
+                spider.logger.warning(f"No rows scraped for {key}; keeping {filepath} as is.")
+                continue
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(rows, f, indent=2)
-            spider.logger.info(f"Saved {len(rows)} rows to {filepath}")
+            pending.append((tmp_path, filepath, len(rows)))
+        
+        for tmp_path, filepath, count in pending:
+            os.replace(tmp_path, filepath)
+            spider.logger.info(f"Saved {count} rows to {filepath}")
+
+    def previous_rows(self, filepath, rows, attempted):
+        """Rows of the existing file for leagues that were requested but not scraped this time (failed)."""
+        if not os.path.exists(filepath):
+            return []
+        scraped = {(r['country'], r['league']) for r in rows}
+        try:
+            with open(filepath, 'r') as f:
+                old_rows = json.load(f)
+        except Exception:
+            return []
+        return [r for r in old_rows
+                if (r.get('country'), r.get('league')) in attempted
+                and (r.get('country'), r.get('league')) not in scraped]
@@ -0,0 +1,131 @@
+# Abort Playwright requests for assets we never read (images, media, fonts,
+# ad/analytics hosts). We only parse DOM text, so these are pure load cost.
+#
+# Wiring (see settings.py):
+#   PLAYWRIGHT_ABORT_REQUEST -> abort_request (pages created by scrapy-playwright)
+#   EXTENSIONS               -> ResourceFilterExtension (per-spider config + crawl stats)
+# Pages opened outside scrapy-playwright (page pool, fetch_espn_odds.py, live_service.py)
+# install the filter themselves with page.route("**", resource_filter.route).
+
+from urllib.parse import urlsplit
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+# Filter of the running spider, used by the module-level hooks
+_active = None
+
+
+class ResourceFilter:
+    def __init__(self, block_types=(), block_hosts=(), allow_types=(), allow_hosts=(), est_bytes=None, stats=None):
+        self.block_types = set(block_types) - set(allow_types)
+        self.block_hosts = tuple(h.lower() for h in block_hosts)
+        self.allow_hosts = tuple(h.lower() for h in allow_hosts)
+        self.est_bytes = est_bytes or {}
+        self.stats = stats
+        self.requests_allowed = 0
+        self.requests_aborted = 0
+        self.bytes_saved_est = 0
+        self.aborted_by_reason = {}
+
+    @classmethod
+    def from_settings(cls, settings, name=None, stats=None):
+        """Build from a Scrapy Settings object or a plain module/dict of RESOURCE_FILTER_* values."""
+        get = settings.get if hasattr(settings, 'get') else (lambda k, d=None: getattr(settings, k, d))
+        allow = (get('RESOURCE_FILTER_ALLOW') or {}).get(name, {})
+        return cls(
+            block_types=get('RESOURCE_FILTER_BLOCK_TYPES') or (),
+            block_hosts=get('RESOURCE_FILTER_BLOCK_HOSTS') or (),
+            allow_types=allow.get('types', ()),
+            allow_hosts=allow.get('hosts', ()),
+            est_bytes=get('RESOURCE_FILTER_EST_BYTES') or {},
+            stats=stats,
+        )
+
+    def _host_matches(self, host, hosts):
+        return any(host == h or host.endswith('.' + h) for h in hosts)
+
+    def abort_reason(self, resource_type, url):
+        """'type' or 'host' if the request should be aborted, else None."""
+        host = (urlsplit(url).hostname or '').lower()
+        if self._host_matches(host, self.allow_hosts):
+            return None
+        if resource_type in self.block_types:
+            return 'type'
+        if self._host_matches(host, self.block_hosts):
+            return 'host'
+        return None
+
+    def check(self, request):
+        """Decide for a Playwright request and update the counters. True = abort."""
+        reason = self.abort_reason(request.resource_type, request.url)
+        if reason is None:
+            self.requests_allowed += 1
+            self._inc('resource_filter/requests_allowed')
+            return False
+
+        key = request.resource_type if reason == 'type' else 'tracker'
+        saved = self.est_bytes.get(key, 0)
+        self.requests_aborted += 1
+        self.bytes_saved_est += saved
+        self.aborted_by_reason[key] = self.aborted_by_reason.get(key, 0) + 1
+        self._inc('resource_filter/requests_aborted')
+        self._inc(f'resource_filter/requests_aborted/{key}')
+        self._inc('resource_filter/bytes_saved_est', saved)
+        return True
+
+    def _inc(self, key, count=1):
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    async def route(self, route):
+        """page.route / context.route handler."""
+        if self.check(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def summary(self):
+        total = self.requests_allowed + self.requests_aborted
+        by_reason = ", ".join(f"{k}: {v}" for k, v in sorted(self.aborted_by_reason.items()))
+        return (f"Resource filter: aborted {self.requests_aborted}/{total} requests "
+                f"(~{self.bytes_saved_est / 1e6:.1f} MB saved){' [' + by_reason + ']' if by_reason else ''}")
+
+
+def abort_request(request):
+    """PLAYWRIGHT_ABORT_REQUEST hook."""
+    return _active is not None and _active.check(request)
+
+
+async def route(playwright_route):
+    """Route handler for pages created outside scrapy-playwright (pass-through if no spider filter)."""
+    if _active is None:
+        await playwright_route.continue_()
+    else:
+        await _active.route(playwright_route)
+
+
+class ResourceFilterExtension:
+    """Builds the running spider's ResourceFilter (with its allowlist) and logs the savings at close."""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('RESOURCE_FILTER_ENABLED'):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        global _active
+        _active = ResourceFilter.from_settings(self.crawler.settings, spider.name, stats=self.crawler.stats)
+
+    def spider_closed(self, spider):
+        global _active
+        if _active is not None:
+            spider.logger.info(_active.summary())
+        _active = None
@@ -0,0 +1,87 @@
+# Persistent per-match cache of detail-page fields, keyed by match_id.
+#
+# Each field group has its own timestamp and freshness budget, so an
+# intraday re-run only revisits the detail pages (and page steps) whose
+# data is stale: odds every 30 minutes, H2H once a day. The file is
+# rewritten (atomically) after every finished match, so a crash mid-scrape
+# keeps everything scraped so far.
+#
+# Layout: {match_id: {group: {"ts": unix seconds, "values": {item field: value}}}}
+
+import json
+import os
+import time
+
+# Item fields stored per group; a group is cached only when all its fields were scraped
+FIELD_GROUPS = {
+    'odds_1x2': ('interaction_1x2_1', 'interaction_1x2_X', 'interaction_1x2_2'),
+    'odds_ou': ('over_2_5', 'under_2_5'),
+    'h2h': ('last_matches_home', 'last_matches_away'),
+    'start_time': ('start_time',),
+}
+
+# Seconds before a group must be re-scraped (overridable with SCRAPE_CACHE_FRESHNESS)
+FRESHNESS = {
+    'odds_1x2': 30 * 60,
+    'odds_ou': 30 * 60,
+    'h2h': 24 * 3600,
+    'start_time': 6 * 3600,
+}
+
+# Entries not touched for this long are dropped on load
+MAX_AGE = 7 * 24 * 3600
+
+
+class ScrapeCache:
+    def __init__(self, path, freshness=None):
+        self.path = path
+        self.freshness = {**FRESHNESS, **(freshness or {})}
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"Scrape cache unreadable ({e}), starting empty.")
+                self.entries = {}
+        cutoff = time.time() - MAX_AGE
+        self.entries = {
+            match_id: groups for match_id, groups in self.entries.items()
+            if max((g.get('ts', 0) for g in groups.values()), default=0) >= cutoff
+        }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+    def stale_groups(self, match_id, now=None):
+        """Field groups of a match that are missing or past their freshness budget."""
+        now = time.time() if now is None else now
+        groups = self.entries.get(match_id, {})
+        return {
+            group for group in FIELD_GROUPS
+            if group not in groups or now - groups[group].get('ts', 0) > self.freshness[group]
+        }
+
+    def fill(self, item):
+        """Copy cached values into the item for every group it is missing (not scraped, or scrape failed)."""
+        for group, entry in self.entries.get(item['match_id'], {}).items():
+            if any(item.get(field) is None for field in FIELD_GROUPS.get(group, ())):
+                for field, value in entry.get('values', {}).items():
+                    item[field] = value
+
+    def update(self, item, groups, now=None):
+        """Store the freshly scraped `groups` of an item (those with all fields present) and save."""
+        now = time.time() if now is None else now
+        entry = self.entries.setdefault(item['match_id'], {})
+        for group in groups:
+            fields = FIELD_GROUPS[group]
+            if all(item.get(field) is not None for field in fields):
+                entry[group] = {'ts': now, 'values': {field: item[field] for field in fields}}
+        self.save()
@@ -20,6 +20,37 @@ PLAYWRIGHT_LAUNCH_OPTIONS = {
     "args": ["--no-sandbox", "--disable-setuid-sandbox"]
 }
 
+# Abort requests for assets we never read (see resource_filter.py); stats under resource_filter/*
+RESOURCE_FILTER_ENABLED = True
+PLAYWRIGHT_ABORT_REQUEST = "flashscore_scraper.resource_filter.abort_request"
+RESOURCE_FILTER_BLOCK_TYPES = ["image", "media", "font"]
+RESOURCE_FILTER_BLOCK_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "amazon-adsystem.com", "adnxs.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+    "scorecardresearch.com", "quantserve.com", "chartbeat.com", "chartbeat.net", "hotjar.com",
+    "facebook.net", "bat.bing.com", "nr-data.net", "moatads.com",
+]
+# Per-spider exceptions: {spider name: {"types": [...], "hosts": [...]}} ("espn_odds" = fetch_espn_odds.py)
+RESOURCE_FILTER_ALLOW = {
+    # The ESPN debug screenshot on timeout is useless without team logos
+    "espn_odds": {"types": ["image"]},
+}
+# Typical transfer size per aborted request, for the bytes_saved_est stat
+RESOURCE_FILTER_EST_BYTES = {"image": 25000, "media": 400000, "font": 40000, "tracker": 20000}
+
+EXTENSIONS = {
+    "flashscore_scraper.resource_filter.ResourceFilterExtension": 500,
+}
+
+# Freshness budget (seconds) per cached field group, for -a scrape_cache=<path> (see scrape_cache.py)
+SCRAPE_CACHE_FRESHNESS = {
+    "odds_1x2": 30 * 60,
+    "odds_ou": 30 * 60,
+    "h2h": 24 * 3600,
+    "start_time": 6 * 3600,
+}
+
 # Reduce concurrency to avoid overloading the machine/browser
 CONCURRENT_REQUESTS = 4
 CONCURRENT_REQUESTS_PER_DOMAIN = 4
@@ -34,4 +65,5 @@ FEED_EXPORT_ENCODING = "utf-8"
 
 ITEM_PIPELINES = {
    'flashscore_scraper.pipelines.StandingsPipeline': 300,
+   'flashscore_scraper.pipelines.JsonLinesStreamPipeline': 400,
 }
@@ -1,16 +1,28 @@
 import scrapy
 from scrapy_playwright.page import PageMethod
 from flashscore_scraper.items import MatchItem
-from flashscore_scraper.items import MatchItem
+from flashscore_scraper import feed_parser, resource_filter
+from flashscore_scraper.scrape_cache import FIELD_GROUPS, ScrapeCache
+from flashscore_scraper.live_extract import MATCH_STATS_URL, accept_cookies, open_live_tab, read_live_list, read_match_state, show_stats_tab
+import asyncio
 import json
 import datetime
+import os
+import time
+
+# Match rows on the list page, and the 2.5 line on the O/U odds page
+MATCH_ROW_SELECTOR = '[id^="g_1_"]'
+OU_ROW_SELECTOR = '.ui-table__row:has-text("2.5")'
+# JS predicates for page.wait_for_function (page pool mode)
+DATE_CHANGED_JS = "prev => { const el = document.querySelector('.calendar__datepicker'); return !!el && el.innerText !== prev; }"
+ROWS_GREW_JS = "n => document.querySelectorAll('[id^=\"g_1_\"]').length > n"
 
 class FlashscoreSpider(scrapy.Spider):
     name = "flashscore"
     allowed_domains = ["flashscore.com"]
     start_urls = ["https://www.flashscore.com/"]
 
-    def __init__(self, day_diff=None, days_back=None, filter_leagues='false', mode='prediction', live_match_id=None, live_list='false', live_ids=None, *args, **kwargs):
+    def __init__(self, day_diff=None, days_back=None, filter_leagues='false', mode='prediction', live_match_id=None, live_list='false', live_ids=None, page_pool=0, list_source='dom', feed_record_dir=None, scrape_cache=None, stream_output=None, *args, **kwargs):
         super(FlashscoreSpider, self).__init__(*args, **kwargs)
         
         # Resolve Date Offset (day_diff)
@@ -30,8 +42,23 @@ class FlashscoreSpider(scrapy.Spider):
         self.live_list = live_list.lower() == 'true'
         self.live_ids = live_ids # Comma separated string
         self.target_leagues = set()
+        # page_pool > 0: scrape detail pages on N long-lived pages instead of one Request (and page) per match
+        self.page_pool = int(page_pool)
+        self.detail_latencies = []
+        # list_source='feed': read the match list from the page's own feed responses (DOM scroll as fallback)
+        self.list_source = list_source.lower()
+        self.feed_record_dir = feed_record_dir # save raw feed payloads (offline fixtures for feed_parser)
+        self.feed_payloads = {}
+        # scrape_cache=<path>: only revisit detail pages (and page steps) whose cached fields are stale
+        self.scrape_cache_path = scrape_cache
+        self.scrape_cache = None
+        self.refresh_groups = {}
+        # stream_output=<path>: JsonLinesStreamPipeline writes each item to this JSON Lines file as it is scraped
+        self.stream_output = stream_output
         
         self.logger.info(f"Spider initialized in {self.mode} mode.")
+        if self.page_pool:
+             self.logger.info(f"Page pool enabled: {self.page_pool} detail pages.")
         if self.live_ids:
              self.logger.info(f"Batch Live IDs provided: {self.live_ids}")
              
@@ -92,69 +119,22 @@ class FlashscoreSpider(scrapy.Spider):
             )
         else:
             # Default Batch Mode
+            if self.scrape_cache_path and self.mode != 'verification':
+                self.scrape_cache = ScrapeCache(self.scrape_cache_path, freshness=self.settings.getdict('SCRAPE_CACHE_FRESHNESS'))
+                self.logger.info(f"Scrape cache: {len(self.scrape_cache.entries)} matches in {self.scrape_cache_path}")
             yield scrapy.Request(
                 url="https://www.flashscore.com/",
                 meta={
                     "playwright": True,
                     "playwright_include_page": True,
                     "playwright_context": "match_list",
+                    "playwright_page_event_handlers": (
+                        {"response": self.capture_feed_response} if self.list_source == 'feed' else {}
+                    ),
                 },
                 callback=self.parse_match_list
             )
 
-    async def parse_live_list_page(self, response):
-        page = response.meta["playwright_page"]
-        
-        try:
-            # Click LIVE tab - robust try
-            try:
-                # Wait for at least one match to appear first to ensure page loaded
-                await page.wait_for_selector('[id^="g_1_"]', timeout=15000)
-                
-                # Then try to click LIVE
-                await page.click('.filters__tab:has-text("LIVE")')
-                await page.wait_for_timeout(2000) 
-            except:
-                pass 
-            
-            # Use Locators (slower but verified to work in debug script)
-            matches = []
-            rows = page.locator('[id^="g_1_"]')
-            count = await rows.count()
-            self.logger.info(f"Spider found {count} match elements via Locators.")
-            
-            for i in range(count):
-                row = rows.nth(i)
-                id_attr = await row.get_attribute('id')
-                if not id_attr: continue
-                match_id = id_attr.replace('g_1_', '')
-                
-                # Try new selector first
-                h_loc = row.locator('.event__homeParticipant')
-                if await h_loc.count() == 0:
-                   h_loc = row.locator('.event__participant--home') # Fallback
-                   
-                a_loc = row.locator('.event__awayParticipant')
-                if await a_loc.count() == 0:
-                   a_loc = row.locator('.event__participant--away') # Fallback
-
-                h_text = await h_loc.inner_text() if await h_loc.count() > 0 else None
-                a_text = await a_loc.inner_text() if await a_loc.count() > 0 else None
-                
-                if h_text: h_text = h_text.split('\n')[0]
-                if a_text: a_text = a_text.split('\n')[0]
-                
-                if match_id and h_text and a_text:
-                    matches.append({'match_id': match_id, 'home_team': h_text, 'away_team': a_text})
-            
-            for m in matches:
-                # Log first few to verify
-                yield m
-        except Exception as e:
-            self.logger.error(f"Live List Error: {e}")
-        finally:
-            await page.close()
-
     async def parse_match_list(self, response):
         page = response.meta["playwright_page"]
         
@@ -169,6 +149,7 @@ class FlashscoreSpider(scrapy.Spider):
 
 
         # 2. Navigate to Target Date
+        feed_items = None
         try:
             # Wait for navigation to be stable
             await page.wait_for_load_state("domcontentloaded")
@@ -184,6 +165,7 @@ class FlashscoreSpider(scrapy.Spider):
                 days_to_go_back = abs(self.day_diff)
                 for i in range(days_to_go_back):
                     clicked_prev = False
+                    date_before = await self.datepicker_text(page)
                     if await page.locator("button[aria-label='Previous day']").count() > 0:
                          await page.locator("button[aria-label='Previous day']").click()
                          self.logger.info(f"Clicked previous day ({i+1}/{days_to_go_back})")
@@ -194,7 +176,7 @@ class FlashscoreSpider(scrapy.Spider):
                          clicked_prev = True
                     
                     if clicked_prev:
-                        await page.wait_for_timeout(1000)
+                        await self.settle(page, 1000, function=DATE_CHANGED_JS, arg=date_before)
                     else:
                         self.logger.warning("Previous day button not found!")
                         break
@@ -204,6 +186,7 @@ class FlashscoreSpider(scrapy.Spider):
                 days_to_go_fwd = self.day_diff
                 for i in range(days_to_go_fwd):
                     clicked_next = False
+                    date_before = await self.datepicker_text(page)
                     if await page.locator("button[aria-label='Next day']").count() > 0:
                          await page.locator("button[aria-label='Next day']").click()
                          self.logger.info(f"Clicked next day ({i+1}/{days_to_go_fwd})")
@@ -214,13 +197,13 @@ class FlashscoreSpider(scrapy.Spider):
                          clicked_next = True
                     
                     if clicked_next:
-                        await page.wait_for_timeout(1000)
+                        await self.settle(page, 1000, function=DATE_CHANGED_JS, arg=date_before)
                     else:
                         self.logger.warning("Next day button not found!")
                         break
             
             # Wait after final navigation
-            await page.wait_for_timeout(2000)
+            await self.settle(page, 2000, selector=MATCH_ROW_SELECTOR)
             
             # 2a. Click ODDS tab for better listing (Verification Mode)
             # DISABLED: Verification needs SCORES, which are best visible on the main ALL tab.
@@ -233,31 +216,11 @@ class FlashscoreSpider(scrapy.Spider):
             #      except:
             #          self.logger.warning("Could not click ODDS tab.")
 
-            # 2b. Scroll and Load All Matches (Lazy Loading) - PageDown Strategy
-            # 2b. Scroll and Load All Matches (Lazy Loading) - JS Scroll Strategy
-            self.logger.info("Scrolling (JS) to load all matches...")
-            
-            for i in range(20): # 20 scrolls should be enough with "Show More" handling
-                # Scroll to bottom
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(1000)
-                
-                # Try clicking "Show more" (for past days matches often hidden behind this)
-                if await page.locator(".event__more").count() > 0:
-                     try:
-                        await page.locator(".event__more").click()
-                        self.logger.info("Clicked 'Show more' button.")
-                        await page.wait_for_timeout(2000)
-                     except: pass
-                     
-                # Check for "pinned" headers or other elements that might block view? No need.
-                
-                # Check match count
-                if i % 5 == 0:
-                    count = await page.evaluate("document.querySelectorAll('[id^=\"g_1_\"]').length")
-                    self.logger.info(f"Scroll {i}: Found {count} match elements (g_1_*) so far.")
-            
-            self.logger.info("Finished scrolling.")
+            # 2b. Feed mode: fixtures come from the day's feed response, no scrolling needed
+            if self.list_source == 'feed':
+                feed_items = await self.match_items_from_feed()
+            if feed_items is None:
+                await self.load_all_matches(page)
             
             # DEBUG: Log the date displayed on the page
             try:
@@ -274,6 +237,107 @@ class FlashscoreSpider(scrapy.Spider):
             return
 
         # 3. Extract Match IDs (and Leagues)
+        if feed_items is not None:
+            matches_to_scrape = feed_items
+        else:
+            matches_to_scrape = await self.match_items_from_dom(page)
+                    
+        self.logger.info(f"Found {len(matches_to_scrape)} matches for next day.")
+
+        # await page.close() # Let Playwright handler close it or do it after yielding if needed, but safer to let it be.
+        
+        self.logger.info(f"Yielding {len(matches_to_scrape)} requests...")
+        # debug limit removed
+
+        pool_items = []
+        for item in matches_to_scrape:
+            # Verification Mode Optimization: Yield item directly with score, skip detail page
+            # ONLY if we successfully captured names. If names are "Unknown", we MUST visit the page.
+            if self.mode == 'verification':
+                if item['home_team'] != "Unknown Home" and item['away_team'] != "Unknown Away":
+                     self.logger.debug(f"Verification Mode: Yielding result for {item['match_id']} ({item['home_score']}-{item['away_score']})")
+                     yield item
+                     continue
+                else:
+                     self.logger.info(f"Verification Mode: Names unknown for {item['match_id']}, visiting detail page...")
+
+            # Scrape cache: skip the detail page entirely if every field is still fresh
+            if self.scrape_cache is not None:
+                groups = self.scrape_cache.stale_groups(item['match_id'])
+                if not groups:
+                    self.scrape_cache.fill(item)
+                    self.inc_stat('scrape_cache/hits')
+                    yield item
+                    continue
+                self.refresh_groups[item['match_id']] = groups
+
+            if self.page_pool:
+                pool_items.append(item)
+                continue
+
+            # Request 1X2 Odds
+            # URL: .../match/{id}/#/odds-comparison/1x2-odds/full-time
+            url = f"https://www.flashscore.com/match/{item['match_id']}/#/odds-comparison/1x2-odds/full-time"
+            self.logger.debug(f"Yielding request for match {item['match_id']}")
+            yield scrapy.Request(
+                url=url,
+                meta={
+                    "playwright": True,
+                    "playwright_include_page": True,
+                    "playwright_page_goto_kwargs": {
+                        "timeout": 30000,
+                        "wait_until": "domcontentloaded",
+                    },
+                    "item": item,
+                    "playwright_context": "odds_context", # reusing context
+                },
+                callback=self.parse_odds_1x2
+            )
+
+        if self.page_pool:
+            # Reuse the list page's context (cookie consent already accepted)
+            context = page.context
+            await page.close()
+            async for item in self.scrape_with_pool(context, pool_items):
+                yield item
+        
+    async def load_all_matches(self, page):
+        """Scroll and click "Show more" until every match row of the day is in the DOM."""
+        # 2b. Scroll and Load All Matches (Lazy Loading) - JS Scroll Strategy
+        self.logger.info("Scrolling (JS) to load all matches...")
+        
+        for i in range(20): # 20 scrolls should be enough with "Show More" handling
+            rows_before = await self.match_row_count(page)
+            # Scroll to bottom
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await self.settle(page, 1000, function=ROWS_GREW_JS, arg=rows_before, timeout=1500)
+            
+            # Try clicking "Show more" (for past days matches often hidden behind this)
+            show_more = await page.locator(".event__more").count() > 0
+            if show_more:
+                 try:
+                    rows_shown = await self.match_row_count(page)
+                    await page.locator(".event__more").click()
+                    self.logger.info("Clicked 'Show more' button.")
+                    await self.settle(page, 2000, function=ROWS_GREW_JS, arg=rows_shown)
+                 except: pass
+            
+            # Page pool mode: stop once lazy loading adds no more rows
+            if self.page_pool and not show_more and await self.match_row_count(page) == rows_before:
+                self.logger.info(f"Scroll {i}: match count settled at {rows_before}.")
+                break
+                 
+            # Check for "pinned" headers or other elements that might block view? No need.
+            
+            # Check match count
+            if i % 5 == 0:
+                count = await page.evaluate("document.querySelectorAll('[id^=\"g_1_\"]').length")
+                self.logger.info(f"Scroll {i}: Found {count} match elements (g_1_*) so far.")
+        
+        self.logger.info("Finished scrolling.")
+
+    async def match_items_from_dom(self, page):
+        """Match items from the rendered list (page.content() re-parsed with a Selector)."""
         content = await page.content()
         sel = scrapy.Selector(text=content)
         
@@ -296,7 +360,6 @@ class FlashscoreSpider(scrapy.Spider):
                 
                 # Check for Header
                 if 'headerLeague__wrapper' in classes or 'event__header' in classes:
-                    # ... (header parsing logic same as before) ...
                     country = child.css('.headerLeague__category-text::text').get() or ""
                     league = child.css('.headerLeague__title-text::text').get() or ""
                     country = country.strip()
@@ -308,348 +371,472 @@ class FlashscoreSpider(scrapy.Spider):
                     else:
                          current_league = f"{country}: {league}".strip(": ")
                     
-                    # self.logger.info(f"Header Found: {current_league}") # Uncomment for deeper debug if needed
-
-                    # 1. Women's League Filter
-                    league_lower = current_league.lower()
-                    if "women" in league_lower or " w " in " " + league_lower + " " or "(w)" in league_lower:
-                        skip_league = True
-                        continue
-
-                    # 2. Target League Filter
-                    if self.filter_leagues_enabled:
-                        if current_league not in self.target_leagues:
-                            skip_league = True
-                        else:
-                            skip_league = False
+                    skip_league = self.skip_league(current_league)
                     
                 elif c_id.startswith('g_1_'):
                     match_id = c_id.replace("g_1_", "")
-                    # Log existence
-                    # self.logger.info(f"Scanning match {match_id} in {current_league} (Skip: {skip_league})")
                     
                     if skip_league:
                         continue
                     
-                    # Debug Filter: If debug_match is set, skip others
-                    debug_id = getattr(self, 'debug_match', None)
-                    if debug_id and match_id != debug_id:
-                        continue
-
                     # Updated Selectors for Team Names (2025)
                     home_team = child.css('.event__participant--home::text').get()
                     if not home_team:
                         home_team = child.css('.event__homeParticipant').xpath('normalize-space()').get()
-                    home_team = home_team or "Unknown Home"
 
                     away_team = child.css('.event__participant--away::text').get()
                     if not away_team:
                          away_team = child.css('.event__awayParticipant').xpath('normalize-space()').get()
-                    away_team = away_team or "Unknown Away"
                     
                     # Capture scores if available (for verification mode)
                     home_score = child.css('.event__score--home::text').get()
                     away_score = child.css('.event__score--away::text').get()
                     
-                    item = MatchItem()
-                    item['match_id'] = match_id
-                    item['home_team'] = home_team
-                    item['away_team'] = away_team
-                    item['league'] = current_league  # Assign captured league
-                    item['home_score'] = home_score
-                    item['away_score'] = away_score
-                    
                     # Optimization: Extract full URL for Direct Navigation
+                    # Full URL: https://www.flashscore.com/match/slugs/?mid=ID
                     full_url = child.css('a.eventRowLink::attr(href)').get()
-                    if full_url:
-                        # Full URL: https://www.flashscore.com/match/slugs/?mid=ID
-                        # Clean it
-                        item['base_url'] = full_url.split('?')[0]
+                    base_url = full_url.split('?')[0] if full_url else None
                     
-                        # Filter Women's Matches (Consistent with Live List)
-                        is_women = False
-                        check_text = (item['home_team'] + " " + item['away_team']).lower()
-                        
-                        if " w " in " " + check_text + " ": is_women = True 
-                        elif "(w)" in check_text: is_women = True
-                        elif "women" in check_text: is_women = True
-                        elif item['home_team'].endswith(" W") or item['away_team'].endswith(" W"): is_women = True
-                        
-                        if is_women:
-                            self.logger.info(f"Skipping Women's match (Prediction): {item['home_team']} vs {item['away_team']}")
-                            continue
+                    item = self.make_match_item(match_id, current_league, home_team, away_team,
+                                                home_score, away_score, base_url=base_url)
+                    if item is not None:
+                        matches_to_scrape.append(item)
+        return matches_to_scrape
+
+    async def match_items_from_feed(self):
+        """Match items from the day's feed response, or None (-> DOM path) if it never arrived or can't be decoded."""
+        deadline = time.monotonic() + 10
+        while self.day_diff not in self.feed_payloads and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        payload = self.feed_payloads.get(self.day_diff)
+        if payload is None:
+            self.logger.warning(f"No match-list feed captured for day offset {self.day_diff}; falling back to DOM.")
+            return None
+        try:
+            fixtures = feed_parser.parse_match_list(payload)
+        except feed_parser.FeedDecodeError as e:
+            self.logger.warning(f"Could not decode match-list feed ({e}); falling back to DOM.")
+            return None
+        
+        items = []
+        for f in fixtures:
+            if self.skip_league(f['league']):
+                continue
+            item = self.make_match_item(f['match_id'], f['league'], f['home_team'], f['away_team'],
+                                        f['home_score'], f['away_score'], base_url=f['base_url'])
+            if item is not None:
+                if f['start_time']:
+                    item['start_time'] = f['start_time']
+                items.append(item)
+        self.logger.info(f"Feed: {len(fixtures)} fixtures, {len(items)} kept after league filters.")
+        return items
+
+    async def capture_feed_response(self, response):
+        """Page 'response' handler (feed mode): keep the raw match-list feed per day offset."""
+        day = feed_parser.feed_day_offset(response.url)
+        if day is None:
+            return
+        try:
+            payload = await response.text()
+        except Exception as e:
+            self.logger.warning(f"Could not read feed response {response.url}: {e}")
+            return
+        self.feed_payloads[day] = payload
+        if self.feed_record_dir:
+            os.makedirs(self.feed_record_dir, exist_ok=True)
+            path = os.path.join(self.feed_record_dir, f"f_1_{day}_{datetime.datetime.now():%Y%m%d_%H%M%S}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+
+    def skip_league(self, league):
+        # 1. Women's League Filter
+        league_lower = league.lower()
+        if "women" in league_lower or " w " in " " + league_lower + " " or "(w)" in league_lower:
+            return True
+        # 2. Target League Filter
+        return self.filter_leagues_enabled and league not in self.target_leagues
+
+    def make_match_item(self, match_id, league, home_team, away_team, home_score, away_score, base_url=None):
+        """MatchItem for a list row, or None if it is filtered out (debug_match, women's teams)."""
+        # Debug Filter: If debug_match is set, skip others
+        debug_id = getattr(self, 'debug_match', None)
+        if debug_id and match_id != debug_id:
+            return None
+        
+        item = MatchItem()
+        item['match_id'] = match_id
+        item['home_team'] = home_team or "Unknown Home"
+        item['away_team'] = away_team or "Unknown Away"
+        item['league'] = league
+        item['home_score'] = home_score
+        item['away_score'] = away_score
+        
+        if base_url:
+            item['base_url'] = base_url
+            
+            # Filter Women's Matches (Consistent with Live List)
+            is_women = False
+            check_text = (item['home_team'] + " " + item['away_team']).lower()
+            
+            if " w " in " " + check_text + " ": is_women = True 
+            elif "(w)" in check_text: is_women = True
+            elif "women" in check_text: is_women = True
+            elif item['home_team'].endswith(" W") or item['away_team'].endswith(" W"): is_women = True
+            
+            if is_women:
+                self.logger.info(f"Skipping Women's match (Prediction): {item['home_team']} vs {item['away_team']}")
+                return None
+        return item
+
+    async def settle(self, page, legacy_ms, selector=None, function=None, arg=None, timeout=5000):
+        """Fixed sleep in legacy mode; in page pool mode wait for the DOM condition instead (bounded by timeout)."""
+        if not self.page_pool:
+            await page.wait_for_timeout(legacy_ms)
+            return
+        try:
+            if function:
+                await page.wait_for_function(function, arg=arg, timeout=timeout)
+            elif selector:
+                await page.wait_for_selector(selector, timeout=timeout)
+        except Exception:
+            pass
+
+    async def datepicker_text(self, page):
+        try:
+            return await page.inner_text(".calendar__datepicker", timeout=2000)
+        except Exception:
+            return None
 
-                    matches_to_scrape.append(item)
-                    
-        self.logger.info(f"Found {len(matches_to_scrape)} matches for next day.")
+    async def match_row_count(self, page):
+        return await page.evaluate(f"document.querySelectorAll('{MATCH_ROW_SELECTOR}').length")
 
-        # await page.close() # Let Playwright handler close it or do it after yielding if needed, but safer to let it be.
-        
-        self.logger.info(f"Yielding {len(matches_to_scrape)} requests...")
-        # debug limit removed
+    async def scrape_with_pool(self, context, items):
+        """Scrape detail pages on `page_pool` reusable pages; yields each item as soon as it is done."""
+        if not items:
+            return
+        todo = asyncio.Queue()
+        for item in items:
+            todo.put_nowait(item)
+        done = asyncio.Queue()
+        workers = [asyncio.ensure_future(self.pool_worker(context, todo, done))
+                   for _ in range(min(self.page_pool, len(items)))]
+        try:
+            for _ in range(len(items)):
+                yield await done.get()
+        finally:
+            await asyncio.gather(*workers, return_exceptions=True)
 
-        for item in matches_to_scrape:
-            # Verification Mode Optimization: Yield item directly with score, skip detail page
-            # ONLY if we successfully captured names. If names are "Unknown", we MUST visit the page.
-            if self.mode == 'verification':
-                if item['home_team'] != "Unknown Home" and item['away_team'] != "Unknown Away":
-                     self.logger.debug(f"Verification Mode: Yielding result for {item['match_id']} ({item['home_score']}-{item['away_score']})")
-                     yield item
-                     continue
-                else:
-                     self.logger.info(f"Verification Mode: Names unknown for {item['match_id']}, visiting detail page...")
+    async def pool_worker(self, context, todo, done):
+        page = None
+        while True:
+            try:
+                item = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            started = time.monotonic()
+            try:
+                # Replace pages that crashed or were closed mid-scrape
+                if page is None or page.is_closed():
+                    page = await context.new_page()
+                    # Not created by scrapy-playwright, so PLAYWRIGHT_ABORT_REQUEST does not apply
+                    await page.route("**", resource_filter.route)
+                await self.scrape_match_detail(page, item)
+            except Exception as e:
+                self.logger.warning(f"Page pool: match {item['match_id']} failed: {e}")
+            self.finish_match(item)
+            self.record_latency(time.monotonic() - started)
+            await done.put(item)
+        if page is not None and not page.is_closed():
+            await page.close()
 
-            # Request 1X2 Odds
-            # URL: .../match/{id}/#/odds-comparison/1x2-odds/full-time
-            url = f"https://www.flashscore.com/match/{item['match_id']}/#/odds-comparison/1x2-odds/full-time"
-            self.logger.debug(f"Yielding request for match {item['match_id']}")
-            yield scrapy.Request(
-                url=url,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "playwright_page_goto_kwargs": {
-                        "timeout": 30000,
-                        "wait_until": "domcontentloaded",
-                    },
-                    "item": item,
-                    "playwright_context": "odds_context", # reusing context
-                },
-                callback=self.parse_odds_1x2
-            )
+    async def scrape_match_detail(self, page, item):
+        url = f"https://www.flashscore.com/match/{item['match_id']}/#/odds-comparison/1x2-odds/full-time"
+        self.logger.info(f"Processing match {item['match_id']} odds.")
+        # The O/U step navigates by itself; only load the odds page if another step needs it
+        groups = self.refresh_groups.get(item['match_id'], set(FIELD_GROUPS))
+        if groups - {'odds_ou'}:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await self.extract_match_details(page, item)
+
+    def finish_match(self, item):
+        """Cache the groups just scraped and fill the rest (or failed ones) from the cache."""
+        if self.scrape_cache is None:
+            return
+        groups = self.refresh_groups.pop(item['match_id'], set(FIELD_GROUPS))
+        self.scrape_cache.update(item, groups)
+        self.scrape_cache.fill(item)
+        self.inc_stat('scrape_cache/refreshed_matches')
+        for group in groups:
+            self.inc_stat(f'scrape_cache/refreshed/{group}')
+
+    def inc_stat(self, key, count=1):
+        if getattr(self, "crawler", None) is not None:
+            self.crawler.stats.inc_value(key, count)
+
+    def record_latency(self, seconds):
+        self.detail_latencies.append(seconds)
+
+    def closed(self, reason):
+        if not self.detail_latencies:
+            return
+        lat = sorted(self.detail_latencies)
+        def pct(q):
+            return lat[min(len(lat) - 1, int(q * len(lat)))]
+        summary = {'count': len(lat), 'p50': pct(0.5), 'p90': pct(0.9), 'p99': pct(0.99), 'max': lat[-1]}
+        self.logger.info(
+            f"Detail pages ({'pool of ' + str(self.page_pool) if self.page_pool else 'request per match'}): "
+            f"{summary['count']} matches, p50 {summary['p50']:.2f}s, p90 {summary['p90']:.2f}s, "
+            f"p99 {summary['p99']:.2f}s, max {summary['max']:.2f}s")
+        if getattr(self, "crawler", None) is not None:
+            for key, value in summary.items():
+                self.crawler.stats.set_value(f"detail_pages/{key}", value)
 
     async def parse_odds_1x2(self, response):
         page = response.meta["playwright_page"]
         item = response.meta["item"]
+        started = time.monotonic()
         
         try:
             self.logger.info(f"Processing match {item['match_id']} odds.")
-            # debug screenshot
-            await page.screenshot(path=f"/Users/thodorischaros/.gemini/antigravity/brain/b595ea4f-41cb-4b5d-a284-d6c2acb923a3/debug_odds_{item['match_id']}.png")
-            
-            # Extract Team Names from Title (Robust)
-            if item['home_team'] == "Unknown Home":
-                 title = await page.title()
-                 # Format: "Home - Away | Home v Away ..." or similar
-                 # Example: "KAI - OLY | Kairat Almaty v Olympiacos Piraeus ..."
-                 if "|" in title:
-                     parts = title.split("|")
-                     if len(parts) > 1:
-                         match_part = parts[1].strip()
-                         # Format: "Kairat Almaty v Olympiacos Piraeus" or "Home - Away"
-                         if " v " in match_part:
-                             teams = match_part.split(" v ")[0:2]
-                             item['home_team'] = teams[0].strip()
-                             # Cleanup away name (often has extra info)
-                             away_full = teams[1]
-                             for sep in [" LIVE", " - ", " |"]:
-                                 away_full = away_full.split(sep)[0]
-                             item['away_team'] = away_full.strip()
-
-            # --- 2. EXTRACT 1X2 ODDS ---
-            # Wait for odds
-            try:
-                await page.wait_for_selector("[class*='oddsValue']", timeout=5000)
-            except:
-                self.logger.warning(f"Timeout waiting for 1X2 odds for {item['match_id']}")
+            await self.extract_match_details(page, item)
+        except Exception as e:
+             pass
+        finally:
+            await page.close()
+        
+        self.finish_match(item)
+        self.record_latency(response.meta.get('download_latency', 0.0) + time.monotonic() - started)
+        yield item
 
-            odds_elements = page.locator("[class*='oddsValue']")
-            odds_texts = await odds_elements.all_text_contents()
-            
-            if len(odds_texts) >= 3:
-                item['interaction_1x2_1'] = odds_texts[0]
-                item['interaction_1x2_X'] = odds_texts[1]
-                item['interaction_1x2_2'] = odds_texts[2]
-            else:
-                self.logger.warning(f"1X2 Odds length {len(odds_texts)} insufficient.")
+    async def extract_match_details(self, page, item):
+        """Summary/odds tab (names, 1X2, start time, scores) -> H2H tab -> O/U odds page, on an open match page.
+        With a scrape cache, only the steps for the match's stale field groups run."""
+        groups = self.refresh_groups.get(item['match_id'], set(FIELD_GROUPS))
+        if groups & {'odds_1x2', 'start_time'}:
+            await self.extract_summary(page, item)
+        if 'h2h' in groups:
+            await self.extract_h2h(page, item)
+        if 'odds_ou' in groups:
+            await self.extract_ou_odds(page, item)
+
+    async def extract_summary(self, page, item):
+        # Extract Team Names from Title (Robust)
+        if item['home_team'] == "Unknown Home":
+             title = await page.title()
+             # Format: "Home - Away | Home v Away ..." or similar
+             # Example: "KAI - OLY | Kairat Almaty v Olympiacos Piraeus ..."
+             if "|" in title:
+                 parts = title.split("|")
+                 if len(parts) > 1:
+                     match_part = parts[1].strip()
+                     # Format: "Kairat Almaty v Olympiacos Piraeus" or "Home - Away"
+                     if " v " in match_part:
+                         teams = match_part.split(" v ")[0:2]
+                         item['home_team'] = teams[0].strip()
+                         # Cleanup away name (often has extra info)
+                         away_full = teams[1]
+                         for sep in [" LIVE", " - ", " |"]:
+                             away_full = away_full.split(sep)[0]
+                         item['away_team'] = away_full.strip()
+
+        # --- 2. EXTRACT 1X2 ODDS ---
+        # Wait for odds
+        try:
+            await page.wait_for_selector("[class*='oddsValue']", timeout=5000)
+        except:
+            self.logger.warning(f"Timeout waiting for 1X2 odds for {item['match_id']}")
 
-            # --- EXTRACT START TIME ---
-            try:
-                # Format: "12.08.2023 12:30"
-                start_time = await page.locator(".duelParticipant__startTime").inner_text()
-                if start_time:
-                    item['start_time'] = start_time.strip()
-                else:
-                    self.logger.warning(f"Start time not found for {item['match_id']}")
-            except Exception as e:
-                self.logger.warning(f"Error extracting start time: {e}")
+        odds_elements = page.locator("[class*='oddsValue']")
+        odds_texts = await odds_elements.all_text_contents()
+        
+        if len(odds_texts) >= 3:
+            item['interaction_1x2_1'] = odds_texts[0]
+            item['interaction_1x2_X'] = odds_texts[1]
+            item['interaction_1x2_2'] = odds_texts[2]
+        else:
+            self.logger.warning(f"1X2 Odds length {len(odds_texts)} insufficient.")
 
-            # --- EXTRACT SCORES (If available) ---
-            try:
-                # Scores are usually in .duelParticipant__score
-                # Home: .duelParticipant__home .participant__score
-                # Away: .duelParticipant__away .participant__score
-                # Flashscore often uses simpler wrapper
-                home_score = await page.locator(".duelParticipant__home .participant__score").inner_text()
-                away_score = await page.locator(".duelParticipant__away .participant__score").inner_text()
-                
-                if home_score and away_score:
-                    item['home_score'] = home_score
-                    item['away_score'] = away_score
-            except:
-                pass # Expected for upcoming matches
-
-            # --- 3. EXTRACT H2H DATA (Last 5 Matches) ---
-            # --- 3. EXTRACT H2H DATA (Last 5 Matches) ---
-            try:
-                # Use get_by_text for robust selection, similar to O/U tab
-                h2h_tab = page.get_by_text("H2H", exact=True)
-                
-                # Check visibility
-                if await h2h_tab.count() > 0:
-                     await h2h_tab.first.click()
-                     self.logger.info(f"Clicked H2H tab for {item['match_id']}")
-                     await page.wait_for_selector(".h2h__section", timeout=5000)
-
-                     
-                     async def parse_h2h_section(section_index):
-                         results = []
-                         sections = page.locator(".h2h__section")
-                         if await sections.count() > section_index:
-                             rows = sections.nth(section_index).locator(".h2h__row")
-                             count = await rows.count()
-                             for i in range(min(count, 5)):
-                                 row = rows.nth(i)
+        # --- EXTRACT START TIME ---
+        try:
+            # Format: "12.08.2023 12:30"
+            start_time = await page.locator(".duelParticipant__startTime").inner_text()
+            if start_time:
+                item['start_time'] = start_time.strip()
+            else:
+                self.logger.warning(f"Start time not found for {item['match_id']}")
+        except Exception as e:
+            self.logger.warning(f"Error extracting start time: {e}")
+
+        # --- EXTRACT SCORES (If available) ---
+        try:
+            # Scores are usually in .duelParticipant__score
+            # Home: .duelParticipant__home .participant__score
+            # Away: .duelParticipant__away .participant__score
+            # Flashscore often uses simpler wrapper
+            home_score = await page.locator(".duelParticipant__home .participant__score").inner_text()
+            away_score = await page.locator(".duelParticipant__away .participant__score").inner_text()
+            
+            if home_score and away_score:
+                item['home_score'] = home_score
+                item['away_score'] = away_score
+        except:
+            pass # Expected for upcoming matches
+
+    async def extract_h2h(self, page, item):
+        # --- 3. EXTRACT H2H DATA (Last 5 Matches) ---
+        try:
+            # Use get_by_text for robust selection, similar to O/U tab
+            h2h_tab = page.get_by_text("H2H", exact=True)
+            
+            # Check visibility
+            if await h2h_tab.count() > 0:
+                 await h2h_tab.first.click()
+                 self.logger.info(f"Clicked H2H tab for {item['match_id']}")
+                 await page.wait_for_selector(".h2h__section", timeout=5000)
+
+                 
+                 async def parse_h2h_section(section_index):
+                     results = []
+                     sections = page.locator(".h2h__section")
+                     if await sections.count() > section_index:
+                         rows = sections.nth(section_index).locator(".h2h__row")
+                         count = await rows.count()
+                         for i in range(min(count, 5)):
+                             row = rows.nth(i)
+                             try:
+                                 date = await row.locator(".h2h__date").first.inner_text()
+                                 home = await row.locator(".h2h__homeParticipant").first.inner_text()
+                                 away = await row.locator(".h2h__awayParticipant").first.inner_text()
+                                 score = ""
                                  try:
-                                     date = await row.locator(".h2h__date").first.inner_text()
-                                     home = await row.locator(".h2h__homeParticipant").first.inner_text()
-                                     away = await row.locator(".h2h__awayParticipant").first.inner_text()
-                                     score = ""
-                                     try:
-                                         # Pattern: Digit(s) - Digit(s) (handling hyphen, en-dash, spaces, newlines)
-                                         import re
-                                         score_pattern = re.compile(r"^\s*(\d+)\s*[-–\n]\s*(\d+)\s*$")
-                                         
-                                         spans = row.locator("span")
-                                         count_spans = await spans.count()
-                                         
-                                         for k in range(count_spans):
-                                             txt = await spans.nth(k).inner_text()
+                                     # Pattern: Digit(s) - Digit(s) (handling hyphen, en-dash, spaces, newlines)
+                                     import re
+                                     score_pattern = re.compile(r"^\s*(\d+)\s*[-–\n]\s*(\d+)\s*$")
+                                     
+                                     spans = row.locator("span")
+                                     count_spans = await spans.count()
+                                     
+                                     for k in range(count_spans):
+                                         txt = await spans.nth(k).inner_text()
+                                         match = score_pattern.match(txt)
+                                         if match:
+                                             # Normalize to "H-A" format
+                                             score = f"{match.group(1)}-{match.group(2)}"
+                                             break
+                                     
+                                     # Fallback: Check direct text if no span matched (rare)
+                                     if not score:
+                                         divs = row.locator("div")
+                                         count_divs = await divs.count()
+                                         for k in range(count_divs):
+                                             txt = await divs.nth(k).inner_text()
                                              match = score_pattern.match(txt)
                                              if match:
-                                                 # Normalize to "H-A" format
                                                  score = f"{match.group(1)}-{match.group(2)}"
                                                  break
-                                         
-                                         # Fallback: Check direct text if no span matched (rare)
-                                         if not score:
-                                             divs = row.locator("div")
-                                             count_divs = await divs.count()
-                                             for k in range(count_divs):
-                                                 txt = await divs.nth(k).inner_text()
-                                                 match = score_pattern.match(txt)
-                                                 if match:
-                                                     score = f"{match.group(1)}-{match.group(2)}"
-                                                     break
-
-                                     except Exception as e:
-                                         self.logger.warning(f"Error parsing score: {e}")
-
-                                     results.append({
-                                         "date": date.strip(),
-                                         "home_team": home.strip(),
-                                         "away_team": away.strip(),
-                                         "score": score
-                                     })
-                                 except Exception as row_e:
-                                     self.logger.warning(f"Error parsing row {i} in section {section_index}: {row_e}")
-                         return results
-
-                     # Section 0: Home Team Last Matches
-                     # Section 1: Away Team Last Matches
-                     item['last_matches_home'] = await parse_h2h_section(0)
-                     item['last_matches_away'] = await parse_h2h_section(1)
-                else:
-                     self.logger.warning(f"H2H tab not found for {item['match_id']}")
 
-            except Exception as e:
-                self.logger.warning(f"Error extracting H2H data: {e}")
+                                 except Exception as e:
+                                     self.logger.warning(f"Error parsing score: {e}")
+
+                                 results.append({
+                                     "date": date.strip(),
+                                     "home_team": home.strip(),
+                                     "away_team": away.strip(),
+                                     "score": score
+                                 })
+                             except Exception as row_e:
+                                 self.logger.warning(f"Error parsing row {i} in section {section_index}: {row_e}")
+                     return results
+
+                 # Section 0: Home Team Last Matches
+                 # Section 1: Away Team Last Matches
+                 item['last_matches_home'] = await parse_h2h_section(0)
+                 item['last_matches_away'] = await parse_h2h_section(1)
+            else:
+                 self.logger.warning(f"H2H tab not found for {item['match_id']}")
 
-            # --- 3. NAVIGATE TO O/U (Optimized Direct Strategy) ---
-            try:
-                base_url = item.get('base_url')
-                if base_url:
-                    if base_url.endswith('/'): base_url = base_url[:-1]
-                    ou_url = f"{base_url}/odds/over-under/full-time/?mid={item['match_id']}"
-                    
-                    # Direct Navigation with fast wait
+        except Exception as e:
+            self.logger.warning(f"Error extracting H2H data: {e}")
+
+    async def extract_ou_odds(self, page, item):
+        # --- 3. NAVIGATE TO O/U (Optimized Direct Strategy) ---
+        try:
+            base_url = item.get('base_url')
+            if base_url:
+                if base_url.endswith('/'): base_url = base_url[:-1]
+                ou_url = f"{base_url}/odds/over-under/full-time/?mid={item['match_id']}"
+                
+                # Direct Navigation with fast wait
+                await page.goto(ou_url, timeout=30000, wait_until='domcontentloaded')
+                
+                # Wait for the 2.5 line itself (page pool) or the generic table
+                try:
+                    await page.wait_for_selector(OU_ROW_SELECTOR if self.page_pool else '.ui-table', timeout=5000)
+                except:
+                    pass
+            else:
+                # Fallback: Summary -> User URL Strategy (If base_url missing)
+                summary_url = f"https://www.flashscore.com/match/{item['match_id']}/#/match-summary"
+                await page.goto(summary_url, timeout=30000)
+                await page.wait_for_load_state('domcontentloaded') # Faster wait
+                
+                current_url = page.url
+                if "/match/" in current_url:
+                    base_url_fallback = current_url.split('#')[0].split('?')[0]
+                    if base_url_fallback.endswith('/'): base_url_fallback = base_url_fallback[:-1]
+                    ou_url = f"{base_url_fallback}/odds/over-under/full-time/?mid={item['match_id']}"
                     await page.goto(ou_url, timeout=30000, wait_until='domcontentloaded')
-                    
-                    # Wait for generic table to ensure basics loaded
-                    try:
-                        await page.wait_for_selector('.ui-table', timeout=5000)
-                    except:
-                        pass
-                else:
-                    # Fallback: Summary -> User URL Strategy (If base_url missing)
-                    summary_url = f"https://www.flashscore.com/match/{item['match_id']}/#/match-summary"
-                    await page.goto(summary_url, timeout=30000)
-                    await page.wait_for_load_state('domcontentloaded') # Faster wait
-                    
-                    current_url = page.url
-                    if "/match/" in current_url:
-                        base_url_fallback = current_url.split('#')[0].split('?')[0]
-                        if base_url_fallback.endswith('/'): base_url_fallback = base_url_fallback[:-1]
-                        ou_url = f"{base_url_fallback}/odds/over-under/full-time/?mid={item['match_id']}"
-                        await page.goto(ou_url, timeout=30000, wait_until='domcontentloaded')
 
-            except Exception as e:
-                 self.logger.warning(f"Error navigating O/U via Optimized User URL: {e}")
+        except Exception as e:
+             self.logger.warning(f"Error navigating O/U via Optimized User URL: {e}")
 
-            # --- 4. EXTRACT O/U 2.5 ODDS (Row-Based Strategy) ---
-            # Iterate .ui-table__row elements to find the specific "2.5" line row
-            found_odds = False
-            import re
-            
-            # Broad selector for rows - works for both odds and standings, so we must filter by content
-            rows = page.locator('.ui-table__row') 
-            count = await rows.count()
+        # --- 4. EXTRACT O/U 2.5 ODDS (Row-Based Strategy) ---
+        # Iterate .ui-table__row elements to find the specific "2.5" line row
+        found_odds = False
+        import re
+        
+        # Broad selector for rows - works for both odds and standings, so we must filter by content
+        rows = page.locator('.ui-table__row') 
+        count = await rows.count()
+        
+        for i in range(count):
+            row = rows.nth(i)
+            text = await row.inner_text()
+            # Clean text
+            clean_text = text.replace("\n", " ").strip()
             
-            for i in range(count):
-                row = rows.nth(i)
-                text = await row.inner_text()
-                # Clean text
-                clean_text = text.replace("\n", " ").strip()
+            # Pattern: Start with "2.5" or contain "2.5" distinctly
+            # Usually "2.5" is the first text in the row for that line
+            if re.search(r'(?:^|[^\d])2\.5(?:[^\d]|$)', clean_text):
+                # This row contains "2.5". Is it the odds row?
+                # Check for odds numbers.
+                nums = re.findall(r'\d+\.\d+', clean_text)
                 
-                # Pattern: Start with "2.5" or contain "2.5" distinctly
-                # Usually "2.5" is the first text in the row for that line
-                if re.search(r'(?:^|[^\d])2\.5(?:[^\d]|$)', clean_text):
-                    # This row contains "2.5". Is it the odds row?
-                    # Check for odds numbers.
-                    nums = re.findall(r'\d+\.\d+', clean_text)
-                    
-                    # Logic:
-                    # If row is "2.5  1.50  2.50", nums=['2.5', '1.50', '2.50']
-                    # If row is "2.5  1.50", nums=['2.5', '1.50'] (Missing under?)
-                    
-                    # We expect at least 3 numbers (Line + 2 Odds) OR 2 numbers if line is integer? No 2.5 is float.
-                    if len(nums) >= 3:
-                        # Assume first is line, next two are Over/Under
-                        # But sometimes order is different?
-                        # Usually Flashscore O/U columns: Over | Under
-                        item['over_2_5'] = nums[1]
-                        item['under_2_5'] = nums[2]
-                        found_odds = True
-                        self.logger.info(f"O/U 2.5 Found: {item['over_2_5']} / {item['under_2_5']} (Row: {clean_text[:50]}...)")
-                        break
-                    elif len(nums) == 2:
-                         # Maybe 2.5 isn't captured as float? But regex matched 2.5
-                         # If nums=['1.50', '2.50'] and line 2.5 was text only?
-                         item['over_2_5'] = nums[0]
-                         item['under_2_5'] = nums[1]
-                         found_odds = True
-                         self.logger.info(f"O/U 2.5 Found (2 nums): {item['over_2_5']} / {item['under_2_5']}")
-                         break
-            
-            if not found_odds:
-                 self.logger.warning(f"O/U 2.5 row not found for {item['match_id']}")
+                # Logic:
+                # If row is "2.5  1.50  2.50", nums=['2.5', '1.50', '2.50']
+                # If row is "2.5  1.50", nums=['2.5', '1.50'] (Missing under?)
                 
-        except Exception as e:
-             pass
-        finally:
-            await page.close()
+                # We expect at least 3 numbers (Line + 2 Odds) OR 2 numbers if line is integer? No 2.5 is float.
+                if len(nums) >= 3:
+                    # Assume first is line, next two are Over/Under
+                    # But sometimes order is different?
+                    # Usually Flashscore O/U columns: Over | Under
+                    item['over_2_5'] = nums[1]
+                    item['under_2_5'] = nums[2]
+                    found_odds = True
+                    self.logger.info(f"O/U 2.5 Found: {item['over_2_5']} / {item['under_2_5']} (Row: {clean_text[:50]}...)")
+                    break
+                elif len(nums) == 2:
+                     # Maybe 2.5 isn't captured as float? But regex matched 2.5
+                     # If nums=['1.50', '2.50'] and line 2.5 was text only?
+                     item['over_2_5'] = nums[0]
+                     item['under_2_5'] = nums[1]
+                     found_odds = True
+                     self.logger.info(f"O/U 2.5 Found (2 nums): {item['over_2_5']} / {item['under_2_5']}")
+                     break
         
-        yield item
+        if not found_odds:
+             self.logger.warning(f"O/U 2.5 row not found for {item['match_id']}")
 
     async def parse_live_batch(self, response):
         page = response.meta["playwright_page"]
@@ -660,14 +847,10 @@ class FlashscoreSpider(scrapy.Spider):
             if not match_id: continue
             
             # 0.5 Handle Cookie Banner (Just in case)
-            try:
-                if await page.query_selector("button#onetrust-accept-btn-handler"):
-                    await page.click("button#onetrust-accept-btn-handler")
-                    await page.wait_for_timeout(500)
-            except: pass
+            await accept_cookies(page)
 
             # 1. Navigate
-            url = f"https://www.flashscore.com/match/{match_id}/#/match-summary/match-statistics/0"
+            url = MATCH_STATS_URL.format(match_id=match_id)
             try:
                 await page.goto(url, timeout=20000, wait_until='domcontentloaded')
                 
@@ -676,124 +859,10 @@ class FlashscoreSpider(scrapy.Spider):
                     await page.wait_for_selector('.detailScore__wrapper', timeout=5000)
                 except: pass
                 
-                # 3. Ensure Stats Tab is Active
-                # Sometimes direct URL doesn't work for SPAs, need to click
-                try:
-                    # Check if stats container is visible using text search for a common stat
-                    stats_visible = await page.evaluate("() => document.body.innerText.includes('Ball Possession') || document.body.innerText.includes('Total shots')")
-                    
-                    if not stats_visible:
-                        stats_tab = page.locator('a[href*="/match-statistics"], button:has-text("Stats")')
-                        if await stats_tab.count() > 0:
-                             await stats_tab.first.click()
-                             await page.wait_for_timeout(2000)
-                except:
-                    pass
-
-                # Debug: Screenshot the first match to see structure
-                if match_id == ids[0]:
-                    await page.screenshot(path="debug_live_batch_stats.png")
-
-                # 3. Extract Data (Regex on Text - Most Robust)
-                data = await page.evaluate(r"""
-                    () => {
-                        const bodyText = document.body.innerText;
-                        const stats = {};
-                        
-                        function extractStat(label, key) {
-                            // Matches: Value - Label - Value (with optional hyphens/spaces)
-                            // Example: 0.18 - Expected Goals (xG) - 1.31
-                            // Regex: Number ... Label ... Number
-                            const regex = new RegExp(`([\\d\\.]+)[^\\d\\n]*${label}[^\\d\\n]*([\\d\\.]+)`, 'i');
-                            const match = bodyText.match(regex);
-                            if (match) {
-                                stats[key + '_home'] = parseFloat(match[1]);
-                                stats[key + '_away'] = parseFloat(match[2]);
-                            }
-                        }
-
-                        extractStat('Expected Goals', 'xg');
-                        extractStat('Total shots', 'shots');
-                        extractStat('Goal Attempts', 'shots'); // Alt
-                        extractStat('Ball Possession', 'possession');
-                        extractStat('Corner Kicks', 'corners');
-                        
-                        let scores = document.querySelector('.detailScore__wrapper')?.innerText || '0-0';
-                        scores = scores.replace(/\n/g, '').replace(/\s+/g, '').replace(/-/g, '-'); 
-                        const hScore = document.querySelector('.detailScore__wrapper span:nth-child(1)')?.innerText;
-                        const aScore = document.querySelector('.detailScore__wrapper span:nth-child(3)')?.innerText;
-                        if(hScore && aScore) scores = hScore + "-" + aScore;
-                        
-                        let time = document.querySelector('.eventTime')?.innerText;
-                        
-                        if (!time) {
-                             time = document.querySelector('.detailScore__status')?.innerText || '0';
-                        }
-                        
-                        // Check for 2nd Half Status for time correction
-                        const bodyUpper = document.body.innerText.toUpperCase();
-                        const is2nd = bodyUpper.includes("2ND HALF") || bodyUpper.includes("SECOND HALF");
-                        
-                        // Robust Time Extraction (Look for mm:ss or 90+)
-                        if (!time || (!time.includes(':') && !time.includes("'"))) {
-                             const timeMatch = document.body.innerText.match(/(\d{1,3}):(\d{2})/);
-                             if (timeMatch) {
-                                 time = timeMatch[0]; // "63:06"
-                             } else if (document.body.innerText.includes("Half Time") || document.body.innerText.includes("HT")) {
-                                 time = "45";
-                             } else if (document.body.innerText.includes("Finished")) {
-                                  time = "90";
-                             }
-                        }
-
-                        
-                        return { score: scores, time: time, stats: stats, is_second_half: is2nd };
-                    }
-                """)
-                
-                # 4. Parse Minute
-                min_val = 0
-                time_str = str(data.get('time', '')).strip().upper()
-                is_2nd_half = data.get('is_second_half', False)
-                
-                # Regex for MM:SS
-                import re
-                mm_ss = re.search(r'(\d+):(\d+)', time_str)
-                if mm_ss:
-                    min_val = int(mm_ss.group(1))
-                    # Correction: If 2nd Half and time < 45 (e.g. 18' meaning 63'), add 45.
-                    # Some views might show relative time.
-                    if is_2nd_half and min_val < 45:
-                        min_val += 45
-                        
-                    if min_val > 90 and not "EXTRA" in time_str: min_val = 90 # Cap regular time
-                    
-                elif "HALF" in time_str:
-                    min_val = 45
-                    if is_2nd_half or "2ND" in time_str: min_val = 45 # Fallback if no digits found
-                elif "FULL" in time_str or "FINISH" in time_str:
-                    min_val = 90
-                elif "'" in time_str:
-                    try:
-                        val = int(time_str.split("'")[0])
-                        if is_2nd_half and val < 45: val += 45
-                        min_val = val
-                    except:
-                        if "+" in time_str:
-                             parts = time_str.split("'")[0].split('+')
-                             if len(parts) > 0 and parts[0].isdigit():
-                                 min_val = int(parts[0])
-                else:
-                    if time_str.isdigit():
-                        val = int(time_str)
-                        if is_2nd_half and val < 45: val += 45
-                        min_val = val
-
-                # 4.5 Fallback: Look for time in body text via regex if selector failed (often "2nd Half" selector hides the time)
-                # If min_val is 0 or 45 but score suggests game is on.
-                if min_val <= 45 and "2ND" in time_str:
-                     # Attempt to find "63:06" pattern in body near score? Too risky?
-                     pass
+                # 3. Ensure Stats Tab is Active, then read score, clock and stats
+                await show_stats_tab(page)
+                data = await read_match_state(page)
+                min_val = data['minute']
 
                 # Log
                 self.logger.info(f"Match {match_id}: {data['score']} ({min_val}')")
@@ -845,64 +914,12 @@ class FlashscoreSpider(scrapy.Spider):
         page = response.meta["playwright_page"]
         
         try:
-            # Click LIVE tab - robust try
-            try:
-                # Wait for at least one match to appear first to ensure page loaded
-                await page.wait_for_selector('[id^="g_1_"]', timeout=15000)
-                
-                # Then try to click LIVE
-                await page.click('.filters__tab:has-text("LIVE")')
-                await page.wait_for_timeout(2000) 
-            except:
-                pass 
-            
-            # Use Locators (slower but verified to work in debug script)
-            matches = []
-            rows = page.locator('[id^="g_1_"]')
-            count = await rows.count()
-            self.logger.info(f"Spider found {count} match elements via Locators.")
-            
-            for i in range(count):
-                row = rows.nth(i)
-                id_attr = await row.get_attribute('id')
-                if not id_attr: continue
-                match_id = id_attr.replace('g_1_', '')
-                
-                # Try new selector first
-                h_loc = row.locator('.event__homeParticipant')
-                if await h_loc.count() == 0:
-                   h_loc = row.locator('.event__participant--home') # Fallback
-                   
-                a_loc = row.locator('.event__awayParticipant')
-                if await a_loc.count() == 0:
-                   a_loc = row.locator('.event__participant--away') # Fallback
-
-                h_text = await h_loc.inner_text() if await h_loc.count() > 0 else None
-                a_text = await a_loc.inner_text() if await a_loc.count() > 0 else None
-                
-                if h_text: h_text = h_text.split('\n')[0]
-                if a_text: a_text = a_text.split('\n')[0]
-                
-                if match_id and h_text and a_text:
-                    # Filter Women's Matches
-                    is_women = False
-                    check_text = (h_text + " " + a_text).lower()
-                    
-                    # Patterns: "arsenal w", "usa (w)", "chelsea women"
-                    if " w " in " " + check_text + " ": is_women = True 
-                    elif "(w)" in check_text: is_women = True
-                    elif "women" in check_text: is_women = True
-                    # Common suffixes check
-                    elif h_text.endswith(" W") or a_text.endswith(" W"): is_women = True
-                    
-                    if is_women:
-                        self.logger.info(f"Skipping Women's match: {h_text} vs {a_text}")
-                        continue
-
-                    matches.append({'match_id': match_id, 'home_team': h_text, 'away_team': a_text})
-            
+            await open_live_tab(page)
+            # Women's matches are skipped (no models for them)
+            matches = await read_live_list(page)
+            self.logger.info(f"Spider found {len(matches)} live matches.")
             for m in matches:
-                yield m
+                yield {'match_id': m['match_id'], 'home_team': m['home_team'], 'away_team': m['away_team']}
         except Exception as e:
             self.logger.error(f"Live List Error: {e}")
         finally:
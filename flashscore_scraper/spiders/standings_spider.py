@@ -1,12 +1,36 @@
 import scrapy
+import asyncio
 import csv
 import os
 import json
 from scrapy_playwright.page import PageMethod
+from flashscore_scraper import resource_filter
+
+# Every table row in one round-trip: row text (same as inner_text) and form icon texts
+TABLE_ROWS_JS = """() => Array.from(document.querySelectorAll('.ui-table__row')).map(row => ({
+    text: row.innerText,
+    form: Array.from(row.querySelectorAll('.tableCellFormIcon')).map(icon => icon.innerText),
+}))"""
+# Links of the Home / Away sub-tabs of a standings or form table
+TAB_HREFS_JS = """kind => {
+    const out = {};
+    for (const side of ['home', 'away']) {
+        const a = document.querySelector(`a[href*='${kind}/${side}']`);
+        if (a && a.href) out[side] = a.href;
+    }
+    return out;
+}"""
 
 class StandingsSpider(scrapy.Spider):
     name = "standings"
     
+    def __init__(self, fast='false', *args, **kwargs):
+        super(StandingsSpider, self).__init__(*args, **kwargs)
+        # fast=true: one request (and browser context) per league, all nine tables in parallel tabs,
+        # each table read with a single evaluate() call
+        self.fast = str(fast).lower() == 'true'
+        # (country, league) pairs requested this crawl (StandingsPipeline keeps old rows of failed ones)
+        self.attempted_leagues = set()
     
     def start_requests(self):
         csv_path = os.path.join(self.settings.get('PROJECT_ROOT', '.'), 'data_sets/standings_form_flashscore_direct_links.csv')
@@ -14,6 +38,31 @@ class StandingsSpider(scrapy.Spider):
         with open(csv_path, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f, delimiter=';')
             for row in reader:
+                self.attempted_leagues.add((row['COUNTRY'], row['LEAGUE']))
+                
+                if self.fast:
+                    yield scrapy.Request(
+                        url=row['STANDINGS_OVERALL'],
+                        callback=self.parse_league_fast,
+                        meta={
+                            'country': row['COUNTRY'],
+                            'league': row['LEAGUE'],
+                            'form_urls': {
+                                'last_5': row['FORM_LAST_5_OVERALL'],
+                                'last_10': row.get('FORM_LAST_10_OVERALL') or None,
+                            },
+                            'playwright': True,
+                            'playwright_include_page': True,
+                            'playwright_context': f"standings_{row['COUNTRY']}_{row['LEAGUE']}",
+                            "playwright_page_goto_kwargs": {
+                                "wait_until": "domcontentloaded",
+                                "timeout": 60000
+                            }
+                        },
+                        dont_filter=True
+                    )
+                    continue
+                
                 meta = {
                     'country': row['COUNTRY'],
                     'league': row['LEAGUE'],
@@ -151,6 +200,88 @@ class StandingsSpider(scrapy.Spider):
         
         await page.close()
 
+    async def parse_league_fast(self, response):
+        page = response.meta["playwright_page"]
+        league = response.meta['league']
+        country = response.meta['country']
+        context = page.context
+        
+        groups = [self.fetch_table_group(context, 'standings', 'standings', page=page)]
+        for form_type, url in response.meta['form_urls'].items():
+            if url:
+                groups.append(self.fetch_table_group(context, 'form', f'{form_type}_matches', url=url))
+        
+        try:
+            results = await asyncio.gather(*groups, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.logger.error(f"Error extracting tables for {country}: {league}: {result}")
+                    continue
+                for table_name, table in result:
+                    yield {
+                        'type': table_name,
+                        'country': country,
+                        'league': league,
+                        'table': table
+                    }
+        finally:
+            # One context per league: closing it closes all of its tabs
+            await context.close()
+
+    async def fetch_table_group(self, context, kind, prefix, page=None, url=None):
+        """Overall table of a standings/form page plus its Home and Away variants in parallel tabs.
+        Returns [(type, rows), ...]; types are '<prefix>_overall|home|away'."""
+        if page is None:
+            page = await self.open_tab(context, url)
+        await page.wait_for_selector(".ui-table__row", timeout=30000)
+        hrefs = await page.evaluate(TAB_HREFS_JS, kind)
+        tables = [(f"{prefix}_overall", await self.extract_table_fast(page, kind))]
+        
+        if 'home' in hrefs and 'away' in hrefs:
+            async def side_table(side):
+                tab = await self.open_tab(context, hrefs[side])
+                try:
+                    await tab.wait_for_selector(".ui-table__row", timeout=30000)
+                    return await self.extract_table_fast(tab, kind)
+                finally:
+                    await tab.close()
+            sides = await asyncio.gather(side_table('home'), side_table('away'), return_exceptions=True)
+            for side, rows in zip(('home', 'away'), sides):
+                if isinstance(rows, Exception):
+                    self.logger.error(f"Error extracting {prefix}_{side}: {rows}")
+                else:
+                    tables.append((f"{prefix}_{side}", rows))
+        else:
+            # No tab links: click through the tabs on the same page
+            for side in ('home', 'away'):
+                try:
+                    first_row = await page.evaluate("() => { const r = document.querySelector('.ui-table__row'); return r ? r.innerText : null; }")
+                    await page.click(f"a[href*='{kind}/{side}']")
+                    await page.wait_for_function(
+                        "prev => { const r = document.querySelector('.ui-table__row'); return r && r.innerText !== prev; }",
+                        arg=first_row, timeout=5000)
+                    tables.append((f"{prefix}_{side}", await self.extract_table_fast(page, kind)))
+                except Exception as e:
+                    self.logger.error(f"Error extracting {prefix}_{side}: {e}")
+        return tables
+
+    async def open_tab(self, context, url):
+        page = await context.new_page()
+        # Not created by scrapy-playwright, so PLAYWRIGHT_ABORT_REQUEST does not apply
+        await page.route("**", resource_filter.route)
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        return page
+
+    async def extract_table_fast(self, page, table_type):
+        rows = await page.evaluate(TABLE_ROWS_JS)
+        self.logger.info(f"Extracting {table_type}: Found {len(rows)} rows.")
+        data = []
+        for row in rows:
+            item = self.parse_row(row['text'].split('\n'), row['form'], table_type)
+            if item is not None:
+                data.append(item)
+        return data
+
     async def extract_table(self, page, table_type):
         # Identify rows
         rows = await page.query_selector_all(".ui-table__row")
@@ -158,92 +289,83 @@ class StandingsSpider(scrapy.Spider):
         data = []
         for row in rows:
             text = await row.inner_text()
-            lines = text.split('\n')
-            # Format varies slightly but usually: Rank, Team, MP, W, D, L, Goals, Pts, Form?
-            # Standings: 1. \n Team \n MP \n W \n D \n L \n GF:GA \n GD \n Pts \n ? \n Form...
+            form_texts = []
+            if table_type != "standings":
+                # Explicitly get form icons
+                form_texts = [await i.inner_text() for i in await row.query_selector_all(".tableCellFormIcon")]
+            item = self.parse_row(text.split('\n'), form_texts, table_type)
+            if item is not None:
+                data.append(item)
+        return data
+
+    def parse_row(self, lines, form_texts, table_type):
+        """Row dict from the row's text lines (and form icon texts), or None if it can't be parsed."""
+        # Format varies slightly but usually: Rank, Team, MP, W, D, L, Goals, Pts, Form?
+        # Standings: 1. \n Team \n MP \n W \n D \n L \n GF:GA \n GD \n Pts \n ? \n Form...
+        try:
+            # Rank
+            rank = lines[0].replace('.', '')
+            
+            # Team (Lines[1], sometimes Lines[2] if promotion marker?)
+            # Usually lines[1] is Team.
+            team = lines[1]
+            
+            # MP
+            mp = lines[2]
             
-            try:
-                # Rank
-                rank = lines[0].replace('.', '')
+            if table_type == "standings":
+                # W, D, L
+                w = lines[3]
+                d = lines[4]
+                l = lines[5]
+                # Goals (28:9)
+                goals = lines[6]
+                # In debug output: 28:9 \n 19 \n 33
+                # So lines[7] is GD, lines[8] is Pts.
                 
-                # Team (Lines[1], sometimes Lines[2] if promotion marker?)
-                # Usually lines[1] is Team.
-                team = lines[1]
+                return {
+                    "rank": rank,
+                    "team_name": team,
+                    "matches_played": mp,
+                    "wins": w,
+                    "draws": d,
+                    "losses": l,
+                    "goals": goals,
+                    "goals_difference": lines[7] if len(lines)>7 else 0,
+                    "points": lines[8] if len(lines)>8 else 0
+                }
                 
-                # MP
-                mp = lines[2]
+            # Form Table
+            # Rank, Team, MP, W, D, L, Goals, Pts, FormString
+            # Flashscore shows the "Form" column as icons (form_texts)
+            w = lines[3]
+            d = lines[4]
+            l = lines[5]
+            goals = lines[6]
+            pts = lines[7] if ":" not in lines[7] else lines[8] # Careful with goals position
+            
+            # Filter out empty, newlines, or '?'
+            texts = [t.strip() for t in form_texts if t.strip() and t.strip() != '?']
+            form_str = "|".join(texts)
+            
+            item = {
+                "rank": rank,
+                "team_name": team,
+                "matches_played": mp,
+                "last_5_results": form_str, # W|W|L...
+                "goals": goals,
+                # Form table doesn't show GD, calculated from Goals (e.g. 10:2 -> +8)
+                "goals_difference": "N/A",
+                "points": pts
+            }
+            
+            # Calc GD
+            if ":" in goals:
+                gf, ga = goals.split(":")
+                item["goals_difference"] = int(gf) - int(ga)
                 
-                if table_type == "standings":
-                    # W, D, L
-                    w = lines[3]
-                    d = lines[4]
-                    l = lines[5]
-                    # Goals (28:9)
-                    goals = lines[6]
-                    # GD (19) or Pts?
-                    # In debug output: 28:9 \n 19 \n 33
-                    # So lines[7] is GD, lines[8] is Pts.
-                    # Verify length
-                    
-                    item = {
-                        "rank": rank,
-                        "team_name": team,
-                        "matches_played": mp,
-                        "wins": w,
-                        "draws": d,
-                        "losses": l,
-                        "goals": goals,
-                        "goals_difference": lines[7] if len(lines)>7 else 0,
-                        "points": lines[8] if len(lines)>8 else 0
-                    }
-                    data.append(item)
-                    
-                else:
-                    # Form Table
-                    # Rank, Team, MP, W, D, L, Goals, Pts, FormString
-                    # In form table, Flashscore shows "Form" column with icons.
-                    # Text dump of Last 5 Form usually includes the W D L chars?
-                    # Debug output showed empty form results?
-                    # Let's extract Form String explicitly via selectors
-                    
-                    # W, D, L logic is same usually
-                    w = lines[3]
-                    d = lines[4]
-                    l = lines[5]
-                    goals = lines[6]
-                    pts = lines[7] if ":" not in lines[7] else lines[8] # Careful with goals position
-                    
-                    # Explicitly get form icons
-                    form_icons = await row.query_selector_all(".tableCellFormIcon")
-                    form_str = ""
-                    if form_icons:
-                         texts = [await i.inner_text() for i in form_icons]
-                         # Filter out empty, newlines, or '?'
-                         texts = [t.strip() for t in texts if t.strip() and t.strip() != '?']
-                         form_str = "|".join(texts)
-                    
-                    item = {
-                        "rank": rank,
-                        "team_name": team,
-                        "matches_played": mp,
-                        "last_5_results": form_str, # W|W|L...
-                        "goals": goals,
-                        "goals_difference": "N/A", # Form table often doesn't show GD explicity in text dump position? 
-                        # Actually Flashscore form table: Rank, Team, MP, W, D, L, Goals, Pts, Form
-                        # It doesn't show GD usually. It shows "Goals".
-                        # User asked for "goals difference". I can calc it from Goals (e.g. 10:2 -> +8)
-                        "points": pts
-                    }
-                    
-                    # Calc GD
-                    if ":" in goals:
-                        gf, ga = goals.split(":")
-                        item["goals_difference"] = int(gf) - int(ga)
-                        
-                    data.append(item)
+            return item
 
-            except Exception as e:
-                # self.logger.warning(f"Error parsing row: {e}")
-                continue
-                
-        return data
+        except Exception as e:
+            # self.logger.warning(f"Error parsing row: {e}")
+            return None
@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from feature_store import FeatureStore
+from heuristic_adjuster import TEAM_INPUTS, apply_rules, league_draw_rate
+from predict_matches import calculate_kelly, combine_probabilities, pick_1x2, DRAW_MARGIN
+
+# Over/Under 2.5 odds columns in MatchHistory, first pair present wins
+OU_ODDS_COLUMNS = [('B365>2.5', 'B365<2.5'), ('Avg>2.5', 'Avg<2.5'), ('P>2.5', 'P<2.5')]
+
+# Models of the current worker process (loaded once by _init_worker)
+_MODELS = None
+
+
+def load_models(model_dir="models", n_jobs=None):
+    """Loads the 1X2, draw and O/U boosters plus their feature lists (same files as MatchPredictor)."""
+    models = {'draw': None, 'features_draw': []}
+    models['1x2'] = xgb.XGBClassifier()
+    models['1x2'].load_model(os.path.join(model_dir, "xgb_model_1x2.json"))
+    models['ou'] = xgb.XGBRegressor()
+    models['ou'].load_model(os.path.join(model_dir, "xgb_model_ou.json"))
+    if os.path.exists(os.path.join(model_dir, "xgb_model_draw.json")):
+        models['draw'] = xgb.XGBClassifier()
+        models['draw'].load_model(os.path.join(model_dir, "xgb_model_draw.json"))
+        with open(os.path.join(model_dir, "features_draw.json"), 'r') as f:
+            models['features_draw'] = json.load(f)
+    with open(os.path.join(model_dir, "features_1x2.json"), 'r') as f:
+        models['features_1x2'] = json.load(f)
+    with open(os.path.join(model_dir, "features_ou.json"), 'r') as f:
+        models['features_ou'] = json.load(f)
+    if n_jobs:
+        for key in ('1x2', 'ou', 'draw'):
+            if models[key] is not None:
+                models[key].set_params(n_jobs=n_jobs)
+    return models
+
+
+def _init_worker(model_dir, n_jobs):
+    global _MODELS
+    _MODELS = load_models(model_dir, n_jobs)
+
+
+def season_years(dates: pd.Series) -> np.ndarray:
+    """Vectorized team_state_store.season_year (Aug-Jul seasons)."""
+    return np.where(dates.dt.month >= 8, dates.dt.year, dates.dt.year - 1)
+
+
+class LeagueTables:
+    """
+    As-of standings and form tables of one league season, replayed from
+    results: overall/home/away tables (ranked by points, goal difference,
+    goals scored) and the last 5/10 results, i.e. what the standings spider
+    would have scraped before each matchday.
+    """
+
+    def __init__(self):
+        # team -> {'overall'/'home'/'away': [mp, w, d, l, gf, ga, pts], 'last'/'last_home'/'last_away': deque}
+        self.teams = {}
+        self._ranks = None
+        self._inputs = {}
+
+    def add_result(self, home, away, hg, ag):
+        for team, venue, gf, ga in ((home, 'home', hg, ag), (away, 'away', ag, hg)):
+            t = self.teams.get(team)
+            if t is None:
+                t = self.teams[team] = {'overall': [0] * 7, 'home': [0] * 7, 'away': [0] * 7,
+                                        'last': deque(maxlen=10), 'last_home': deque(maxlen=5),
+                                        'last_away': deque(maxlen=5)}
+            res = 'W' if gf > ga else ('D' if gf == ga else 'L')
+            for table in ('overall', venue):
+                row = t[table]
+                row[0] += 1
+                row[1 + 'WDL'.index(res)] += 1
+                row[4] += gf
+                row[5] += ga
+                row[6] += 3 if res == 'W' else (1 if res == 'D' else 0)
+            t['last'].append(res)
+            t[f'last_{venue}'].append(res)
+        self._ranks = None
+        self._inputs = {}
+
+    def ranks(self):
+        if self._ranks is None:
+            self._ranks = {}
+            for table in ('overall', 'home', 'away'):
+                rows = [(name, t[table]) for name, t in self.teams.items() if t[table][0] > 0]
+                rows.sort(key=lambda r: (-r[1][6], -(r[1][4] - r[1][5]), -r[1][4], r[0]))
+                self._ranks[table] = {name: rank for rank, (name, _) in enumerate(rows, 1)}
+        return self._ranks
+
+    def draw_rate(self):
+        if not self.teams:
+            return np.nan
+        total_draws = sum(t['overall'][2] for t in self.teams.values())
+        total_matches = sum(t['overall'][0] for t in self.teams.values())
+        return league_draw_rate(total_draws, total_matches)
+
+    def team_inputs(self, team):
+        """Heuristic inputs of a team as a tuple in TEAM_INPUTS order."""
+        if team in self._inputs:
+            return self._inputs[team]
+        nan = np.nan
+        t = self.teams.get(team)
+        ranks = self.ranks()
+        values = dict.fromkeys(TEAM_INPUTS, 0)
+        if t is None:
+            values.update(standings_rank=nan, home_table_rank=nan, away_table_rank=nan, mp=nan, gf=nan)
+        else:
+            for field, table in (('standings', 'overall'), ('home_table', 'home'), ('away_table', 'away')):
+                values[f'has_{field}'] = t[table][0] > 0
+                values[f'{field}_rank'] = ranks[table].get(team, nan)
+            forms = {'form': list(t['last'])[-5:], 'form_home': t['last_home'],
+                     'form_away': t['last_away'], 'form_10': t['last']}
+            for field, results in forms.items():
+                values[f'has_{field}'] = len(results) > 0
+                for r in 'WDL':
+                    values[f'{field}_{r}'] = sum(1 for x in results if x == r)
+            mp = t['overall'][0]
+            values['mp'] = mp if mp else nan
+            values['gf'] = t['overall'][4] if mp else nan
+        self._inputs[team] = tuple(float(values[k]) for k in TEAM_INPUTS)
+        return self._inputs[team]
+
+
+def replay_tables(shard: pd.DataFrame):
+    """
+    Replays a shard day by day: the inputs of each match come from the tables
+    as they stood before its matchday, then the day's results are added.
+    Returns (draw_rate (N,), home {key: (N,)}, away {key: (N,)}).
+    """
+    n = len(shard)
+    draw_rate = np.full(n, np.nan)
+    home = np.full((n, len(TEAM_INPUTS)), np.nan)
+    away = np.full((n, len(TEAM_INPUTS)), np.nan)
+
+    tables = {}
+    keys = list(zip(shard['league'].astype(str), shard['season']))
+    home_teams = shard['home_team'].astype(str).tolist()
+    away_teams = shard['away_team'].astype(str).tolist()
+    hg = shard['FTHG'].to_numpy(int)
+    ag = shard['FTAG'].to_numpy(int)
+    days = shard['date'].dt.normalize().to_numpy()
+    bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1], True])
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        for i in range(start, end):
+            t = tables.get(keys[i])
+            if t is None:
+                t = tables[keys[i]] = LeagueTables()
+            draw_rate[i] = t.draw_rate()
+            home[i] = t.team_inputs(home_teams[i])
+            away[i] = t.team_inputs(away_teams[i])
+        for i in range(start, end):
+            tables[keys[i]].add_result(home_teams[i], away_teams[i], hg[i], ag[i])
+
+    return draw_rate, dict(zip(TEAM_INPUTS, home.T)), dict(zip(TEAM_INPUTS, away.T))
+
+
+def score(models, df: pd.DataFrame):
+    """Scores the enriched rows with the same 2-stage combination as MatchPredictor.score_batch."""
+    df = df.copy()
+    for c in set(models['features_1x2'] + models['features_ou'] + models['features_draw']):
+        if c not in df.columns: df[c] = 0
+    probs_1x2_raw = models['1x2'].predict_proba(df[models['features_1x2']])
+    if models['draw'] is not None:
+        prob_draw_binary = models['draw'].predict_proba(df[models['features_draw']])[:, 1]
+    else:
+        prob_draw_binary = probs_1x2_raw[:, 1]
+    pred_lam = models['ou'].predict(df[models['features_ou']])
+    return combine_probabilities(probs_1x2_raw, prob_draw_binary, pred_lam)
+
+
+def run_shard(shard: pd.DataFrame, margin=DRAW_MARGIN) -> pd.DataFrame:
+    """predict -> adjust -> draw margin -> quarter Kelly -> settle for one shard (sorted by date)."""
+    probs_1x2, probs_ou = score(_MODELS, shard)
+    draw_rate, home, away = replay_tables(shard)
+
+    odds_1x2 = shard[['B365H', 'B365D', 'B365A']].to_numpy(float)
+    odds_ou = np.full((len(shard), 2), np.nan)
+    for over_col, under_col in OU_ODDS_COLUMNS:
+        if over_col in shard.columns and under_col in shard.columns:
+            odds_ou = shard[[over_col, under_col]].apply(pd.to_numeric, errors='coerce').to_numpy(float)
+            break
+    adjusted = apply_rules(probs_1x2, probs_ou, draw_rate, home, away, odds_1x2, odds_ou)
+
+    in_window = shard['in_window'].to_numpy()
+    result = np.where(shard['FTHG'] > shard['FTAG'], 0, np.where(shard['FTHG'] == shard['FTAG'], 1, 2))
+    over = ((shard['FTHG'] + shard['FTAG']) > 2.5).to_numpy().astype(int)
+
+    rows = []
+    for i in np.flatnonzero(in_window):
+        p_h, p_d, p_a = adjusted.probs_1x2[i]
+        label, conf = pick_1x2(p_h, p_d, p_a, margin)
+        pick = '1X2'.index(label)
+        odd = odds_1x2[i, pick]
+        _, stake_1x2 = calculate_kelly(odd, conf) if odd == odd else (0.0, 0.0)
+        profit_1x2 = (stake_1x2 * (odd - 1.0) if pick == result[i] else -stake_1x2) if stake_1x2 > 0 else 0.0
+
+        # O/U: index 1 is Over, odds_ou is [Over, Under]
+        pick_over = int(adjusted.probs_ou[i, 1] > adjusted.probs_ou[i, 0])
+        odd_ou = odds_ou[i, 0] if pick_over else odds_ou[i, 1]
+        _, stake_ou = calculate_kelly(odd_ou, adjusted.probs_ou[i, pick_over]) if odd_ou == odd_ou else (0.0, 0.0)
+        profit_ou = (stake_ou * (odd_ou - 1.0) if pick_over == over[i] else -stake_ou) if stake_ou > 0 else 0.0
+
+        rows.append({
+            'date': shard['date'].iat[i], 'league': str(shard['league'].iat[i]), 'season': shard['season'].iat[i],
+            'home_team': str(shard['home_team'].iat[i]), 'away_team': str(shard['away_team'].iat[i]),
+            'result': result[i], 'over': over[i],
+            'p_h': p_h, 'p_d': p_d, 'p_a': p_a, 'p_over': adjusted.probs_ou[i, 1],
+            'raw_h': probs_1x2[i, 0], 'raw_d': probs_1x2[i, 1], 'raw_a': probs_1x2[i, 2], 'raw_over': probs_ou[i, 1],
+            'pick_1x2': label, 'stake_1x2': stake_1x2, 'profit_1x2': profit_1x2,
+            'pick_ou': "Over 2.5" if pick_over else "Under 2.5", 'stake_ou': stake_ou, 'profit_ou': profit_ou,
+            'rule_flags': int(adjusted.flags[i]),
+        })
+    return pd.DataFrame(rows)
+
+
+def _log_loss(probs, target):
+    probs = np.clip(probs, 1e-15, 1.0)
+    return float(-np.mean(np.log(probs[np.arange(len(target)), target])))
+
+
+def summarize(bets: pd.DataFrame) -> pd.DataFrame:
+    """Per-league results table (plus an ALL row): accuracy, log-loss, Brier, ROI and max drawdown."""
+    def metrics(g):
+        g = g.sort_values('date', kind='stable')
+        target = g['result'].to_numpy()
+        adj = g[['p_h', 'p_d', 'p_a']].to_numpy()
+        raw = g[['raw_h', 'raw_d', 'raw_a']].to_numpy()
+        onehot = np.eye(3)[target]
+        over = g['over'].to_numpy()
+        p_ou = np.column_stack([1 - g['p_over'], g['p_over']])
+        staked = g['stake_1x2'].sum() + g['stake_ou'].sum()
+        profit = g['profit_1x2'].sum() + g['profit_ou'].sum()
+        equity = (g['profit_1x2'] + g['profit_ou']).cumsum().to_numpy()
+        drawdown = np.max(np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity])
+        return pd.Series({
+            'matches': len(g),
+            'acc_1x2': float(np.mean(g['pick_1x2'].map({'1': 0, 'X': 1, '2': 2}).to_numpy() == target)),
+            'log_loss_1x2': _log_loss(adj, target),
+            'log_loss_1x2_raw': _log_loss(raw, target),
+            'brier_1x2': float(np.mean(np.sum((adj - onehot) ** 2, axis=1))),
+            'log_loss_ou': _log_loss(p_ou, over),
+            'brier_ou': float(np.mean((g['p_over'].to_numpy() - over) ** 2)),
+            'bets_1x2': int((g['stake_1x2'] > 0).sum()),
+            'bets_ou': int((g['stake_ou'] > 0).sum()),
+            'staked': staked,
+            'profit': profit,
+            'roi': profit / staked if staked > 0 else 0.0,
+            'max_drawdown': drawdown,
+        })
+
+    per_league = [metrics(g).rename(league) for league, g in bets.groupby('league', sort=True)]
+    table = pd.DataFrame(per_league + [metrics(bets).rename('ALL')])
+    table.index.name = 'league'
+    for c in ('matches', 'bets_1x2', 'bets_ou'):
+        table[c] = table[c].astype(int)
+    return table.reset_index()
+
+
+def make_shards(df: pd.DataFrame, shard_by: str):
+    keys = {'league': ['league'], 'season': ['season'], 'league-season': ['league', 'season']}[shard_by]
+    return [g for _, g in df.groupby(keys, sort=True, observed=True)]
+
+
+def backtest(df: pd.DataFrame, start, end=None, leagues=None, shard_by='league-season', workers=None,
+             model_dir="models", margin=DRAW_MARGIN) -> pd.DataFrame:
+    """
+    Replays the enriched MatchHistory frame between `start` and `end` and
+    returns one row per settled match. Tables are replayed from the start of
+    the season containing `start`, so early-window standings are as-of too.
+
+    Note: the models are used as trained; for out-of-sample numbers, backtest
+    seasons that were held out of training.
+    """
+    start = pd.Timestamp(start)
+    df = df.dropna(subset=['date', 'FTHG', 'FTAG']).copy()
+    df['league'] = df['league'].astype(str)
+    if leagues:
+        df = df[df['league'].isin(leagues)]
+    season_start = pd.Timestamp(year=start.year if start.month >= 8 else start.year - 1, month=8, day=1)
+    df = df[df['date'] >= season_start]
+    if end is not None:
+        df = df[df['date'] <= pd.Timestamp(end)]
+    df = df.sort_values('date', kind='stable').reset_index(drop=True)
+    df['season'] = season_years(df['date'])
+    df['in_window'] = df['date'] >= start
+
+    shards = make_shards(df, shard_by)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(shards)))
+    print(f"Backtesting {int(df['in_window'].sum())} matches in {len(shards)} shards ({shard_by}) on {workers} worker(s)...")
+
+    if workers == 1:
+        _init_worker(model_dir, None)
+        results = [run_shard(s, margin) for s in shards]
+    else:
+        # One booster thread per worker: the pool provides the parallelism
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir, 1)) as pool:
+            results = list(pool.map(run_shard, shards, [margin] * len(shards)))
+
+    results = [r for r in results if not r.empty]
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True).sort_values('date', kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay predict -> adjust -> Kelly over historical seasons.")
+    parser.add_argument("--data_dir", default="data_sets/MatchHistory", help="MatchHistory CSV directory")
+    parser.add_argument("--model_dir", default="models", help="Directory with the trained models")
+    parser.add_argument("--start", default="2023-08-01", help="First match settled")
+    parser.add_argument("--end", default=None, help="Last match settled (default: latest)")
+    parser.add_argument("--leagues", nargs="*", help="Only these leagues (MatchHistory 'league' values)")
+    parser.add_argument("--shard", choices=['league-season', 'league', 'season'], default='league-season',
+                        help="Unit of work sent to each process")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--margin", type=float, default=DRAW_MARGIN, help="Draw margin of the 1X2 pick")
+    parser.add_argument("--output", default="models/backtest_results.csv", help="Per-league results table")
+    parser.add_argument("--bets_output", default=None, help="Optional per-match CSV")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = FeatureStore(args.data_dir).load()
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bets = backtest(df, args.start, args.end, args.leagues, args.shard, args.workers, args.model_dir, args.margin)
+    t_run = time.perf_counter() - t0
+    if bets.empty:
+        print("No matches in the backtest window.")
+        raise SystemExit(0)
+
+    table = summarize(bets)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+    if args.bets_output:
+        bets.to_csv(args.bets_output, index=False)
+
+    print(table.to_string(index=False, float_format="%.4f"))
+    print(f"\nSaved results table to {args.output}")
+    print(f"[*] Load {t_load:.1f}s | Backtest {t_run:.1f}s ({len(bets) / max(t_run, 1e-9):.0f} matches/s)")
@@ -0,0 +1,385 @@
+"""
+Transactional bet ledger (SQLite, WAL mode).
+
+Replaces the per-day output/bets_*.json slips, data_sets/bets.json and the
+`current_bankroll` rewrites of data_sets/betting_config.json with one
+database, data_sets/bets.db:
+
+    bets                one row per bet; UNIQUE(date, home, away, type) is the dedupe key
+    settlements         one row per settled bet (WON / LOST / VOID, profit, payout)
+    bankroll_movements  every stake / payout with the running balance after it
+
+Every write is a short BEGIN IMMEDIATE transaction, so the UI and the
+verification cron can place and settle bets concurrently (readers never block
+in WAL mode). Placing N bets or settling N bets touches N rows through the
+indexes; settlement is a set-based insert/update from a temp table of
+outcomes, and bets already settled by another writer are skipped.
+
+On first use the legacy JSON slips are imported once, and the bankroll
+opens at the config's `current_bankroll`.
+"""
+import contextlib
+import datetime
+import glob
+import json
+import math
+import os
+import sqlite3
+
+LEDGER_FILE = "data_sets/bets.db"
+SCHEMA_VERSION = 1
+# Seconds a writer waits for another writer's transaction before failing
+BUSY_TIMEOUT = 30
+DEFAULT_BANKROLL = 1000.0
+SETTLED_STATES = ('WON', 'LOST', 'VOID')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bets (
+    id INTEGER PRIMARY KEY,
+    slip_date TEXT NOT NULL,
+    date TEXT NOT NULL DEFAULT '',
+    home TEXT NOT NULL DEFAULT '',
+    away TEXT NOT NULL DEFAULT '',
+    match TEXT NOT NULL DEFAULT '',
+    match_id TEXT,
+    league TEXT,
+    type TEXT NOT NULL,
+    selection TEXT,
+    odds REAL NOT NULL DEFAULT 1.0,
+    stake REAL NOT NULL DEFAULT 0.0,
+    confidence REAL,
+    kelly TEXT,
+    ev TEXT,
+    status TEXT NOT NULL DEFAULT 'OPEN',
+    placed_at TEXT NOT NULL,
+    UNIQUE (date, home, away, type)
+);
+CREATE INDEX IF NOT EXISTS bets_open ON bets (slip_date) WHERE status = 'OPEN';
+CREATE INDEX IF NOT EXISTS bets_slip ON bets (slip_date);
+
+CREATE TABLE IF NOT EXISTS settlements (
+    bet_id INTEGER PRIMARY KEY REFERENCES bets (id) ON DELETE CASCADE,
+    status TEXT NOT NULL CHECK (status IN ('WON', 'LOST', 'VOID')),
+    profit REAL NOT NULL,
+    payout REAL NOT NULL,
+    final_score TEXT,
+    result_1x2 TEXT,
+    result_ou TEXT,
+    settled_at TEXT NOT NULL,
+    source TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bankroll_movements (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance_after REAL NOT NULL,
+    bet_id INTEGER REFERENCES bets (id) ON DELETE SET NULL,
+    note TEXT
+);
+CREATE INDEX IF NOT EXISTS movements_bet ON bankroll_movements (bet_id);
+"""
+
+BET_COLUMNS = ('slip_date', 'date', 'home', 'away', 'match', 'match_id', 'league', 'type', 'selection',
+               'odds', 'stake', 'confidence', 'kelly', 'ev', 'status', 'placed_at')
+
+
+class InsufficientFunds(ValueError):
+    pass
+
+
+def now():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _number(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if math.isnan(value) else value
+
+
+def split_match(match):
+    """'A vs B' / 'A - B' -> (A, B)."""
+    for sep in (' vs ', ' - '):
+        if match and sep in match:
+            home, away = match.split(sep, 1)
+            return home.strip(), away.strip()
+    return None, None
+
+
+def bet_row(bet, slip_date=None):
+    """Ledger row of a bet dict in any of the shapes the UI, BettingEngine or old slips used."""
+    home, away = _text(bet.get('home')), _text(bet.get('away'))
+    match = _text(bet.get('match'))
+    if not home and match:
+        home, away = split_match(match)
+    if not match and home:
+        match = f"{home} vs {away}"
+    date = _text(bet.get('date')) or ''
+    return {
+        'slip_date': slip_date or date[:10],
+        'date': date,
+        'home': home or '',
+        'away': away or '',
+        'match': match or '',
+        'match_id': _text(bet.get('match_id')),
+        'league': _text(bet.get('league')),
+        'type': _text(bet.get('type')) or '',
+        'selection': _text(bet.get('selection')),
+        'odds': _number(bet.get('odds', bet.get('odd')), 1.0),
+        'stake': _number(bet.get('stake_units', bet.get('stake')), 0.0),
+        'confidence': _number(bet.get('confidence'), None),
+        'kelly': _text(bet.get('kelly')),
+        'ev': _text(bet.get('ev')),
+        'status': 'OPEN',
+        'placed_at': now(),
+    }
+
+
+def outcome(bet_id, status, stake, odds, **details):
+    """Settlement of one bet: WON pays stake * odds, VOID returns the stake, LOST pays nothing."""
+    if status == 'WON':
+        payout = stake * odds
+    elif status == 'VOID':
+        payout = stake
+    else:
+        payout = 0.0
+    return {'bet_id': bet_id, 'status': status, 'profit': round(payout - stake, 2), 'payout': payout,
+            'final_score': details.get('final_score'), 'result_1x2': details.get('result_1x2'),
+            'result_ou': details.get('result_ou')}
+
+
+class Ledger:
+    def __init__(self, path=LEDGER_FILE, config_file=None, slips_dir=None):
+        self.path = path
+        data_dir = os.path.dirname(os.path.abspath(path))
+        # Legacy sources, imported once when the ledger is created
+        self.config_file = config_file or os.path.join(data_dir, "betting_config.json")
+        self.slips_dir = slips_dir or os.path.join(os.path.dirname(data_dir), "output")
+        self.legacy_bets_file = os.path.join(data_dir, "bets.json")
+        self._init_db()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Write transaction: takes the write lock up front so balance checks and inserts are atomic."""
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    @contextlib.contextmanager
+    def reader(self):
+        db = self.connect()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = self.connect()
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+            db.execute("PRAGMA journal_mode = WAL")
+        finally:
+            db.close()
+        with self.transaction() as db:
+            # Re-check under the write lock: another process may have just created it
+            if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    db.execute(statement)
+            self._import_legacy(db)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # --- Legacy import ---
+
+    def _load_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _import_legacy(self, db):
+        """Imports bets.json and output/bets_*.json once; the opening balance is the config's bankroll."""
+        sources = []
+        legacy = self._load_json(self.legacy_bets_file)
+        if isinstance(legacy, list):
+            sources.append((None, legacy))
+        for path in sorted(glob.glob(os.path.join(self.slips_dir, "bets_*.json"))):
+            slip = self._load_json(path)
+            if isinstance(slip, dict):
+                sources.append((slip.get('date') or os.path.basename(path)[5:15], slip.get('bets', [])))
+
+        imported = 0
+        for slip_date, bets in sources:
+            for bet in bets:
+                row = bet_row(bet, slip_date)
+                row['placed_at'] = 'imported'
+                status = next((s for s in (bet.get('result'), bet.get('status')) if s in SETTLED_STATES), None)
+                cur = db.execute(f"INSERT INTO bets ({', '.join(BET_COLUMNS)}) "
+                                 f"VALUES ({', '.join(':' + c for c in BET_COLUMNS)}) "
+                                 "ON CONFLICT (date, home, away, type) DO NOTHING RETURNING id", row)
+                inserted = cur.fetchone()
+                if inserted is None:
+                    continue
+                imported += 1
+                if status:
+                    settled = outcome(inserted[0], status, row['stake'], row['odds'], final_score=bet.get('final_score'),
+                                      result_1x2=bet.get('result_1x2'), result_ou=bet.get('result_ou'))
+                    settled['profit'] = _number(bet.get('profit', bet.get('pnl')), settled['profit'])
+                    db.execute("UPDATE bets SET status = ? WHERE id = ?", (status, inserted[0]))
+                    db.execute("INSERT INTO settlements VALUES (:bet_id, :status, :profit, :payout, :final_score, "
+                               ":result_1x2, :result_ou, 'imported', 'legacy')", settled)
+
+        config = self._load_json(self.config_file) or {}
+        opening = _number(config.get('current_bankroll', config.get('initial_bankroll')), DEFAULT_BANKROLL)
+        db.execute("INSERT INTO bankroll_movements (created_at, kind, amount, balance_after, note) "
+                   "VALUES (?, 'opening', ?, ?, ?)", (now(), opening, opening, 'opening balance'))
+        if imported:
+            print(f"[ledger] Imported {imported} bets from the JSON slips into {self.path}.")
+
+    # --- Bankroll ---
+
+    @staticmethod
+    def _balance(db):
+        row = db.execute("SELECT balance_after FROM bankroll_movements ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else 0.0
+
+    def balance(self):
+        with self.reader() as db:
+            return self._balance(db)
+
+    # --- Placing ---
+
+    def place_bets(self, bets, slip_date=None, check_funds=True):
+        """
+        Places the bets (dicts) in one transaction; bets already in the ledger
+        (same date, home, away, type) are skipped. Each placed bet's stake is
+        deducted from the bankroll. Raises InsufficientFunds (nothing placed)
+        if check_funds and the new stakes exceed the balance.
+        Returns (placed rows with their ids, balance after).
+        """
+        rows = [bet_row(bet, slip_date) for bet in bets]
+        with self.transaction() as db:
+            balance = self._balance(db)
+            placed = []
+            for row in rows:
+                inserted = db.execute(f"INSERT INTO bets ({', '.join(BET_COLUMNS)}) "
+                                      f"VALUES ({', '.join(':' + c for c in BET_COLUMNS)}) "
+                                      "ON CONFLICT (date, home, away, type) DO NOTHING RETURNING id", row).fetchone()
+                if inserted is not None:
+                    placed.append({**row, 'id': inserted[0]})
+
+            total_stake = sum(row['stake'] for row in placed)
+            if check_funds and total_stake > balance:
+                raise InsufficientFunds(f"Insufficient funds. Total stake ({total_stake:.2f}) "
+                                        f"exceeds bankroll ({balance:.2f}).")
+            movements = []
+            for row in placed:
+                balance -= row['stake']
+                movements.append((row['placed_at'], -row['stake'], balance, row['id'], row['match']))
+            db.executemany("INSERT INTO bankroll_movements (created_at, kind, amount, balance_after, bet_id, note) "
+                           "VALUES (?, 'stake', ?, ?, ?, ?)", movements)
+        return placed, balance
+
+    # --- Settling ---
+
+    def open_bets(self, slip_date=None, day=None):
+        """OPEN bets, optionally of one slip and/or one match day (YYYY-MM-DD)."""
+        query, params = "SELECT * FROM bets WHERE status = 'OPEN'", []
+        if slip_date:
+            query += " AND slip_date = ?"
+            params.append(slip_date)
+        if day:
+            query += " AND (date = '' OR substr(date, 1, 10) = ?)"
+            params.append(day)
+        with self.reader() as db:
+            return [dict(row) for row in db.execute(query + " ORDER BY id", params)]
+
+    def settle(self, outcomes, source=None):
+        """
+        Settles bets from outcome() dicts in one set-based transaction:
+        settlement rows, bet statuses and payout movements are written for
+        the bets that are still OPEN (others are ignored).
+        Returns ({slip_date: (bets settled, pnl)}, balance after).
+        """
+        with self.transaction() as db:
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS outcome (bet_id INTEGER PRIMARY KEY, status TEXT, "
+                       "profit REAL, payout REAL, final_score TEXT, result_1x2 TEXT, result_ou TEXT)")
+            db.execute("DELETE FROM temp.outcome")
+            db.executemany("INSERT OR REPLACE INTO temp.outcome VALUES (:bet_id, :status, :profit, :payout, "
+                           ":final_score, :result_1x2, :result_ou)", outcomes)
+            # Another writer may have settled some of them since they were read
+            db.execute("DELETE FROM temp.outcome WHERE NOT EXISTS "
+                       "(SELECT 1 FROM bets WHERE bets.id = outcome.bet_id AND bets.status = 'OPEN')")
+
+            settled_at = now()
+            db.execute("INSERT INTO settlements SELECT bet_id, status, profit, payout, final_score, result_1x2, "
+                       "result_ou, ?, ? FROM temp.outcome", (settled_at, source))
+            db.execute("UPDATE bets SET status = o.status FROM temp.outcome AS o WHERE bets.id = o.bet_id")
+            db.execute("INSERT INTO bankroll_movements (created_at, kind, amount, balance_after, bet_id, note) "
+                       "SELECT ?, 'payout', payout, ? + SUM(payout) OVER (ORDER BY bet_id), bet_id, status "
+                       "FROM temp.outcome WHERE payout > 0 ORDER BY bet_id", (settled_at, self._balance(db)))
+            summary = {row['slip_date']: (row['n'], row['pnl']) for row in db.execute(
+                "SELECT b.slip_date, COUNT(*) AS n, SUM(o.profit) AS pnl FROM temp.outcome o "
+                "JOIN bets b ON b.id = o.bet_id GROUP BY b.slip_date")}
+            balance = self._balance(db)
+        return summary, balance
+
+    # --- Views ---
+
+    def slips(self):
+        """Bets grouped per slip date (newest first) in the shape betting.html renders."""
+        with self.reader() as db:
+            rows = db.execute("SELECT b.*, s.status AS result, s.profit, s.payout FROM bets b "
+                              "LEFT JOIN settlements s ON s.bet_id = b.id "
+                              "ORDER BY b.slip_date DESC, b.id").fetchall()
+        slips = {}
+        for row in rows:
+            slip = slips.setdefault(row['slip_date'], {'date': row['slip_date'], 'bets': [], 'total_stake': 0.0,
+                                                       'total_return': 0.0, 'pnl': 0.0, 'status': 'CLOSED'})
+            bet = {'id': row['id'], 'date': row['date'], 'match': row['match'], 'type': row['type'],
+                   'selection': row['selection'], 'odds': row['odds'], 'stake_units': row['stake'],
+                   'status': row['status'], 'result': row['result']}
+            slip['total_stake'] += row['stake']
+            if row['result']:
+                bet['pnl'] = row['profit']
+                slip['pnl'] += row['profit']
+                slip['total_return'] += row['payout']
+            else:
+                slip['status'] = 'OPEN'
+            slip['bets'].append(bet)
+        return list(slips.values())
+
+    def delete_slip(self, slip_date):
+        """Deletes a slip's bets and settlements; bankroll movements stay (unlinked) in the history."""
+        with self.transaction() as db:
+            return db.execute("DELETE FROM bets WHERE slip_date = ?", (slip_date,)).rowcount
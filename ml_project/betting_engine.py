@@ -3,17 +3,17 @@ import os
 import datetime
 import pandas as pd
 
+from bet_ledger import LEDGER_FILE, Ledger, outcome
+
 class BettingEngine:
-    def __init__(self, bets_file="data_sets/bets.json", config_file="data_sets/betting_config.json"):
-        self.bets_file = bets_file
+    def __init__(self, ledger_file=LEDGER_FILE, config_file="data_sets/betting_config.json"):
         self.config_file = config_file
         self.ensure_files()
         self.load_data()
+        # Bets and bankroll live in the ledger; the config only holds the staking settings
+        self.ledger = Ledger(ledger_file, config_file=config_file)
         
     def ensure_files(self):
-        if not os.path.exists(self.bets_file):
-            with open(self.bets_file, 'w') as f:
-                json.dump([], f)
         if not os.path.exists(self.config_file):
              # Default config
              config = {
@@ -27,17 +27,9 @@ class BettingEngine:
                  json.dump(config, f)
 
     def load_data(self):
-        with open(self.bets_file, 'r') as f:
-            self.bets = json.load(f)
         with open(self.config_file, 'r') as f:
             self.config = json.load(f)
 
-    def save_data(self):
-        with open(self.bets_file, 'w') as f:
-            json.dump(self.bets, f, indent=4)
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=4)
-
     def place_bets_from_predictions(self, predictions_csv):
         """
         Reads a predictions CSV and places bets on matches meeting criteria.
@@ -47,14 +39,9 @@ class BettingEngine:
             return []
         
         df = pd.read_csv(predictions_csv)
-        placed = []
-        
-        # Avoid duplicate bets? Check if (Date, Home, Away, Type) exists.
-        existing_keys = set()
-        for b in self.bets:
-            key = f"{b['date']}_{b['home']}_{b['away']}_{b['type']}"
-            existing_keys.add(key)
+        candidates = []
         
+        # Duplicates of (Date, Home, Away, Type) are skipped by the ledger's unique key
         base_unit = self.config.get('base_unit', 10)
         thresh_1x2 = self.config.get('confidence_threshold_1x2', 0.60)
         thresh_ou = self.config.get('confidence_threshold_ou', 0.60)
@@ -68,67 +55,47 @@ class BettingEngine:
             conf_1x2 = float(row['Conf 1X2'])
             if conf_1x2 >= thresh_1x2:
                 bet_type = "1X2"
-                key = f"{date}_{home}_{away}_{bet_type}"
-                if key not in existing_keys:
-                    selection = row['Prediction 1X2']
-                    odd = float(row['Prediction 1X2 Odd'])
-                    if odd > 1.0: # Valid odd
-                        bet = {
-                            "id": len(self.bets) + len(placed) + 1,
-                            "date": date,
-                            "home": home,
-                            "away": away,
-                            "type": bet_type,
-                            "selection": selection,
-                            "odd": odd,
-                            "stake": base_unit,
-                            "status": "OPEN", # OPEN, WON, LOST, VOID
-                            "profit": 0.0,
-                            "confidence": conf_1x2
-                        }
-                        placed.append(bet)
-                        existing_keys.add(key)
-                        
-            # O/U Bet
-            conf_ou = float(row['Conf O/U'])
-            if conf_ou >= thresh_ou:
-                bet_type = "OU2.5"
-                key = f"{date}_{home}_{away}_{bet_type}"
-                if key not in existing_keys:
-                    selection = row['Prediction O/U']
-                    # We usually don't have O/U odds in prediction output unless scraped (Prediction 1X2 Odd is there, but OU odd?)
-                    # Scraper 'output.json' usually has O/U odds?
-                    # My predict_matches.py doesn't currently output O/U odds properly!
-                    # It only outputs `Prediction 1X2 Odd`.
-                    # I need to fix predict_matches.py to output O/U odds if I want to track P/L accurately.
-                    # For now, let's assume 1.90 generic or skip O/U tracking p/l?
-                    # User asked for "odd".
-                    odd = 1.90 # Placeholder if missing
-                    
-                    bet = {
-                        "id": len(self.bets) + len(placed) + 1,
+                selection = row['Prediction 1X2']
+                odd = float(row['Prediction 1X2 Odd'])
+                if odd > 1.0: # Valid odd
+                    candidates.append({
                         "date": date,
                         "home": home,
                         "away": away,
                         "type": bet_type,
                         "selection": selection,
-                        "odd": odd, 
+                        "odd": odd,
                         "stake": base_unit,
-                        "status": "OPEN",
-                        "profit": 0.0,
-                        "confidence": conf_ou
-                    }
-                    placed.append(bet)
-                    # existing_keys.add(key) # handled by append
+                        "confidence": conf_1x2
+                    })
+                        
+            # O/U Bet
+            conf_ou = float(row['Conf O/U'])
+            if conf_ou >= thresh_ou:
+                bet_type = "OU2.5"
+                selection = row['Prediction O/U']
+                # We usually don't have O/U odds in prediction output unless scraped (Prediction 1X2 Odd is there, but OU odd?)
+                # Scraper 'output.json' usually has O/U odds?
+                # My predict_matches.py doesn't currently output O/U odds properly!
+                # It only outputs `Prediction 1X2 Odd`.
+                # I need to fix predict_matches.py to output O/U odds if I want to track P/L accurately.
+                # For now, let's assume 1.90 generic or skip O/U tracking p/l?
+                # User asked for "odd".
+                odd = 1.90 # Placeholder if missing
+                
+                candidates.append({
+                    "date": date,
+                    "home": home,
+                    "away": away,
+                    "type": bet_type,
+                    "selection": selection,
+                    "odd": odd, 
+                    "stake": base_unit,
+                    "confidence": conf_ou
+                })
 
-        # Update balance (deduct stake?)
-        # Paper trading: usually we deduct stake.
-        total_stake = sum(b['stake'] for b in placed)
-        self.config['current_bankroll'] -= total_stake
-        
-        self.bets.extend(placed)
-        self.save_data()
-        
+        # Paper trading: the ledger deducts each placed stake from the bankroll
+        placed, _ = self.ledger.place_bets(candidates, check_funds=False)
         return placed
 
     def resolve_bets(self, history_loader):
@@ -153,12 +120,9 @@ class BettingEngine:
             key = f"{row['date_str']}_{row['home_team']}_{row['away_team']}"
             lookup[key] = row
             
-        settled_count = 0
+        outcomes = []
         
-        for bet in self.bets:
-            if bet['status'] != 'OPEN':
-                continue
-                
+        for bet in self.ledger.open_bets():
             key = f"{bet['date']}_{bet['home']}_{bet['away']}"
             if key in lookup:
                 row = lookup[key]
@@ -176,20 +140,11 @@ class BettingEngine:
                     if bet['selection'] == 'Over 2.5' and goals > 2.5: won = True
                     elif bet['selection'] == 'Under 2.5' and goals <= 2.5: won = True
                     
-                # Settle
-                if won:
-                    bet['status'] = 'WON'
-                    profit = (bet['stake'] * bet['odd']) - bet['stake']
-                    bet['profit'] = profit
-                    self.config['current_bankroll'] += (bet['stake'] + profit)
-                else:
-                    bet['status'] = 'LOST'
-                    bet['profit'] = -bet['stake']
-                    # Stake already deducted from bankroll on place
-                    
-                settled_count += 1
+                # Settle (stake already deducted from bankroll on place; WON pays stake * odd)
+                outcomes.append(outcome(bet['id'], 'WON' if won else 'LOST', bet['stake'], bet['odds'],
+                                        final_score=f"{fthg}-{ftag}"))
         
-        if settled_count > 0:
-            self.save_data()
-            
-        return settled_count
+        if not outcomes:
+            return 0
+        summary, _ = self.ledger.settle(outcomes, source='history')
+        return sum(n for n, _ in summary.values())
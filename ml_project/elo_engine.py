@@ -1,3 +1,5 @@
+import itertools
+
 import pandas as pd
 import numpy as np
 
@@ -91,3 +93,259 @@ class EloTracker:
         df['A_elo'] = a_elos
         
         return df
+
+
+def goal_diff_multiplier(goal_diff):
+    """Vectorized G factor (same table as EloTracker.update_ratings)."""
+    abs_gd = np.abs(np.asarray(goal_diff, dtype=float))
+    return np.where(abs_gd <= 1, 1.0, np.where(abs_gd == 2, 1.5, (11 + abs_gd) / 8))
+
+
+def _flat_multiplier(goal_diff):
+    return np.ones(len(goal_diff))
+
+
+def _log_multiplier(goal_diff):
+    abs_gd = np.abs(np.asarray(goal_diff, dtype=float))
+    return np.where(abs_gd <= 1, 1.0, 1 + np.log2(np.maximum(abs_gd, 1)))
+
+
+# Goal-difference multiplier variants for sweep_elo ('wfe' is the EloTracker table)
+GOAL_DIFF_VARIANTS = {
+    'wfe': goal_diff_multiplier,
+    'flat': _flat_multiplier,
+    'log': _log_multiplier,
+}
+
+
+def _elo_pass(home_idx, away_idx, mult, result, ratings, k_factor, start, stop, h_out, a_out):
+    """
+    Sequential Elo update over rows [start, stop). Plain lists and scalar math
+    only, so the loop stays tight (and can be jitted as-is).
+    """
+    for i in range(start, stop):
+        hi = home_idx[i]
+        ai = away_idx[i]
+        r_home = ratings[hi]
+        r_away = ratings[ai]
+        h_out[i] = r_home
+        a_out[i] = r_away
+        we_home = 1 / (1 + 10 ** ((r_away - r_home) / 400))
+        p_exchange = k_factor * mult[i] * (result[i] - we_home)
+        ratings[hi] = r_home + p_exchange
+        ratings[ai] = r_away - p_exchange
+
+
+class ArrayEloTracker:
+    """
+    Array-backed drop-in for EloTracker.
+
+    Teams are mapped to integer ids and ratings live in a flat array; the G
+    multipliers and results are computed vectorially and only the sequential
+    rating exchange runs in a loop. Produces the same H_elo/A_elo values and
+    final ratings as EloTracker.
+
+    After process_history, ratings can be served for any as-of date
+    (`rating_as_of`) or snapshotted at given dates (`checkpoints`) without
+    replaying history.
+    """
+
+    def __init__(self, k_factor=20, start_rating=1500, ratings=None):
+        self.k_factor = k_factor
+        self.start_rating = start_rating
+        self.teams = []       # id -> team
+        self.team_ids = {}    # team -> id
+        self._ratings = []    # id -> rating
+        self._history = None
+        self._snapshots = {}
+        for team, rating in (ratings or {}).items():
+            self._team_id(team, rating)
+
+    def _team_id(self, team, rating=None):
+        idx = self.team_ids.get(team)
+        if idx is None:
+            idx = len(self.teams)
+            self.team_ids[team] = idx
+            self.teams.append(team)
+            self._ratings.append(self.start_rating if rating is None else rating)
+        return idx
+
+    @property
+    def ratings(self):
+        """team -> rating, same shape as EloTracker.ratings."""
+        return dict(zip(self.teams, self._ratings))
+
+    def get_rating(self, team):
+        idx = self.team_ids.get(team)
+        return self.start_rating if idx is None else self._ratings[idx]
+
+    def _encode(self, teams):
+        codes, uniques = pd.factorize(np.asarray(teams, dtype=object))
+        mapping = np.array([self._team_id(t) for t in uniques], dtype=np.int64)
+        return mapping[codes]
+
+    def _run(self, home, away, fthg, ftag, dates=None, checkpoint_dates=None):
+        """Replays matches in the given order; returns pre-match (home, away) rating arrays."""
+        home_idx = self._encode(home)
+        away_idx = self._encode(away)
+        fthg = np.asarray(fthg, dtype=float)
+        ftag = np.asarray(ftag, dtype=float)
+        result = np.where(fthg > ftag, 1.0, np.where(fthg == ftag, 0.5, 0.0))
+        mult = goal_diff_multiplier(fthg - ftag)
+
+        n = len(home_idx)
+        h_out = [0.0] * n
+        a_out = [0.0] * n
+        home_list, away_list = home_idx.tolist(), away_idx.tolist()
+        mult_list, result_list = mult.tolist(), result.tolist()
+
+        bounds = []
+        if checkpoint_dates is not None and dates is not None:
+            cp = pd.to_datetime(pd.Series(checkpoint_dates)).sort_values().to_numpy()
+            bounds = list(zip(cp, np.searchsorted(dates, cp, side='left')))
+
+        self._snapshots = {}
+        pos = 0
+        for cp_date, stop in bounds:
+            _elo_pass(home_list, away_list, mult_list, result_list, self._ratings,
+                      self.k_factor, pos, stop, h_out, a_out)
+            pos = max(pos, stop)
+            self._snapshots[pd.Timestamp(cp_date)] = np.array(self._ratings)
+        _elo_pass(home_list, away_list, mult_list, result_list, self._ratings,
+                  self.k_factor, pos, n, h_out, a_out)
+
+        h_elo = np.array(h_out)
+        a_elo = np.array(a_out)
+        self._history = {'dates': dates, 'home': home_idx, 'away': away_idx,
+                         'h_elo': h_elo, 'a_elo': a_elo, 'by_team': {}}
+        return h_elo, a_elo
+
+    def process_history(self, df: pd.DataFrame, checkpoint_dates=None) -> pd.DataFrame:
+        """
+        Same contract as EloTracker.process_history (df sorted by date; adds
+        pre-match 'H_elo'/'A_elo'). If `checkpoint_dates` is given, the ratings
+        of all teams as of each date (before that day's matches) are kept and
+        available via `checkpoints()`.
+        """
+        print("Calculating ELO ratings...")
+        dates = df['date'].to_numpy() if 'date' in df.columns else None
+        h_elo, a_elo = self._run(df['home_team'], df['away_team'], df['FTHG'], df['FTAG'],
+                                 dates, checkpoint_dates)
+        df = df.copy()
+        df['H_elo'] = h_elo
+        df['A_elo'] = a_elo
+        return df
+
+    def rate(self, df: pd.DataFrame, checkpoint_dates=None):
+        """
+        Pre-match (H_elo, A_elo) arrays aligned to the rows of `df`, so they can
+        be attached positionally (no merge on date/team). Matches are replayed
+        in date order (stable, NaT last) whatever the order of `df`.
+        """
+        order = np.argsort(df['date'].to_numpy(), kind='stable')
+        h_sorted, a_sorted = self._run(df['home_team'].to_numpy()[order], df['away_team'].to_numpy()[order],
+                                       df['FTHG'].to_numpy()[order], df['FTAG'].to_numpy()[order],
+                                       df['date'].to_numpy()[order], checkpoint_dates)
+        h_elo = np.empty(len(df))
+        a_elo = np.empty(len(df))
+        h_elo[order] = h_sorted
+        a_elo[order] = a_sorted
+        return h_elo, a_elo
+
+    def checkpoints(self) -> pd.DataFrame:
+        """Ratings snapshots from the last process_history: one row per checkpoint date, one column per team."""
+        rows = {d: np.pad(r, (0, len(self.teams) - len(r)), constant_values=self.start_rating)
+                for d, r in self._snapshots.items()}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=self.teams)
+
+    def rating_as_of(self, team, date):
+        """
+        Rating of `team` before any match on `date`, from the last processed
+        history (rating before that history for earlier dates).
+        """
+        idx = self.team_ids.get(team)
+        if idx is None:
+            return self.start_rating
+        hist = self._history
+        if hist is None or hist['dates'] is None:
+            return self._ratings[idx]
+
+        cached = hist['by_team'].get(idx)
+        if cached is None:
+            is_home = hist['home'] == idx
+            rows = np.flatnonzero(is_home | (hist['away'] == idx))
+            pre = np.where(is_home[rows], hist['h_elo'][rows], hist['a_elo'][rows])
+            # Rating after a match = rating before the team's next match (or the final rating)
+            post = np.append(pre[1:], self._ratings[idx])
+            cached = (hist['dates'][rows], pre, post)
+            hist['by_team'][idx] = cached
+
+        team_dates, pre, post = cached
+        if len(team_dates) == 0:
+            return self._ratings[idx]
+        k = np.searchsorted(team_dates, np.datetime64(pd.Timestamp(date)), side='left')
+        return float(pre[0]) if k == 0 else float(post[k - 1])
+
+
+def sweep_elo(df: pd.DataFrame, k_factors=(10, 15, 20, 25, 30, 40), home_advantages=(0, 25, 50, 75, 100),
+              multipliers=('wfe', 'flat', 'log'), start_rating=1500, eval_since=None) -> pd.DataFrame:
+    """
+    Evaluates a grid of Elo configurations in a single chronological pass.
+
+    Ratings are a (teams x configs) matrix, so every match updates all
+    configurations at once. Each configuration's pre-match expected score
+    (with its home advantage added to the home rating) is scored against the
+    actual result (home win/draw/away win, i.e. FTR H/D/A -> 1/0.5/0) with log-loss and Brier score.
+    Matches before `eval_since` only warm up the ratings. Rows without a
+    final score are skipped.
+
+    Returns one row per configuration, best log-loss first.
+    """
+    configs = list(itertools.product(k_factors, home_advantages, multipliers))
+    k = np.array([c[0] for c in configs], dtype=float)
+    hfa = np.array([c[1] for c in configs], dtype=float)
+    variant_idx = np.array([multipliers.index(c[2]) for c in configs])
+
+    df = df.dropna(subset=['FTHG', 'FTAG'])
+    fthg = df['FTHG'].to_numpy(dtype=float)
+    ftag = df['FTAG'].to_numpy(dtype=float)
+    result = np.where(fthg > ftag, 1.0, np.where(fthg == ftag, 0.5, 0.0))
+    # (matches x variants) G table; expanded to configs row by row to keep memory flat
+    variant_table = np.stack([GOAL_DIFF_VARIANTS[v](fthg - ftag) for v in multipliers], axis=1)
+
+    codes, teams = pd.factorize(pd.concat([df['home_team'], df['away_team']], ignore_index=True))
+    home_idx, away_idx = codes[:len(df)], codes[len(df):]
+    if eval_since is not None:
+        evaluate = (df['date'] >= pd.Timestamp(eval_since)).to_numpy()
+    else:
+        evaluate = np.ones(len(df), dtype=bool)
+
+    ratings = np.full((len(teams), len(configs)), float(start_rating))
+    log_loss = np.zeros(len(configs))
+    brier = np.zeros(len(configs))
+    eps = 1e-15
+
+    print(f"Sweeping {len(configs)} Elo configurations over {len(df)} matches...")
+    for i in range(len(df)):
+        r_home = ratings[home_idx[i]]
+        r_away = ratings[away_idx[i]]
+        we_home = 1 / (1 + 10 ** ((r_away - r_home - hfa) / 400))
+        res = result[i]
+        if evaluate[i]:
+            p = np.clip(we_home, eps, 1 - eps)
+            log_loss -= res * np.log(p) + (1 - res) * np.log(1 - p)
+            brier += (we_home - res) ** 2
+        p_exchange = k * variant_table[i, variant_idx] * (res - we_home)
+        ratings[home_idx[i]] = r_home + p_exchange
+        ratings[away_idx[i]] = r_away - p_exchange
+
+    n_eval = max(int(evaluate.sum()), 1)
+    report = pd.DataFrame({
+        'k_factor': k,
+        'home_advantage': hfa,
+        'multiplier': [c[2] for c in configs],
+        'log_loss': log_loss / n_eval,
+        'brier': brier / n_eval,
+    })
+    report['n_matches'] = int(evaluate.sum())
+    return report.sort_values(['log_loss', 'brier'], kind='stable').reset_index(drop=True)
@@ -1,6 +1,25 @@
+import atexit
 import json
 import os
-from rapidfuzz import process, fuzz
+import weakref
+from collections import defaultdict
+
+from rapidfuzz import process, fuzz, utils
+
+# Fuzzy matches below this token_set_ratio are rejected
+SCORE_CUTOFF = 80
+# Tokens shared by more names than this ("fc", "city", ...) are too generic to block on
+MAX_BUCKET_SIZE = 200
+
+# Resolvers whose buffered mappings are written at exit (one handler for all instances)
+_RESOLVERS = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_resolvers():
+    for resolver in list(_RESOLVERS):
+        resolver.flush()
+
 
 class EntityResolver:
     def __init__(self, elo_file="data_sets/elo_ratings.json", mapping_file="data_sets/team_mappings.json"):
@@ -8,24 +27,125 @@ class EntityResolver:
         self.mapping_file = mapping_file
         self.elo_data = {}
         self.mappings = {}
+        self._dirty = False
+        self._index = None
         self.load_data()
-        
+        # New mappings are buffered in memory and written once per run
+        _RESOLVERS.add(self)
+
     def load_data(self):
         if os.path.exists(self.elo_file):
             with open(self.elo_file, 'r') as f:
                 self.elo_data = json.load(f)
         else:
             print("Warning: ELO file not found. Run elo_scraper.py first.")
-            
+
         if os.path.exists(self.mapping_file):
             with open(self.mapping_file, 'r') as f:
                 self.mappings = json.load(f)
-                
+        self._index = None
+
     def save_mappings(self):
         os.makedirs(os.path.dirname(self.mapping_file), exist_ok=True)
-        with open(self.mapping_file, 'w') as f:
+        tmp_path = self.mapping_file + ".tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(self.mappings, f, indent=4)
-            
+        os.replace(tmp_path, self.mapping_file)
+        self._dirty = False
+
+    def flush(self):
+        """Writes buffered mappings (no-op if nothing new was resolved)."""
+        if self._dirty:
+            self.save_mappings()
+
+    def __del__(self):
+        # A resolver dropped before exit (e.g. a reloaded adjuster) still saves its mappings
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    # --- Index ---
+
+    @staticmethod
+    def _tokens(name):
+        return set(utils.default_process(name).split())
+
+    def _build_index(self):
+        """Known names plus an inverted index normalized token -> name ids (blocking buckets)."""
+        choices = list(self.elo_data.keys())
+        buckets = defaultdict(list)
+        for i, name in enumerate(choices):
+            for token in self._tokens(name):
+                buckets[token].append(i)
+        self._index = {'choices': choices, 'buckets': buckets}
+        return self._index
+
+    def _candidates(self, team_name, index):
+        """Ids of known names sharing a (non-generic) normalized token with `team_name`."""
+        buckets = index['buckets']
+        hits = [buckets[t] for t in self._tokens(team_name) if t in buckets]
+        specific = [b for b in hits if len(b) <= MAX_BUCKET_SIZE]
+        ids = set()
+        for bucket in (specific or hits):
+            ids.update(bucket)
+        return sorted(ids)
+
+    def _fuzzy_match(self, names):
+        """
+        Best known name (token_set_ratio >= SCORE_CUTOFF) for each of `names`,
+        or None; close to process.extractOne over all known names, not identical.
+
+        All names are scored against all known names in one batched cdist call
+        with token_sort_ratio, which equals token_set_ratio when two names share
+        no token and is much cheaper. Only the blocking candidates (names
+        sharing a normalized token) are re-scored with token_set_ratio. Names
+        that share only a generic token (bucket over MAX_BUCKET_SIZE, skipped
+        when a more specific bucket exists), or only differ from a token in
+        case/punctuation, keep their lower token_sort_ratio score, so a
+        different name can win in those edge cases.
+        """
+        index = self._index or self._build_index()
+        choices = index['choices']
+        if not choices:
+            return {name: None for name in names}
+
+        scores = process.cdist(names, choices, scorer=fuzz.token_sort_ratio, workers=-1)
+        results = {}
+        for row, name in enumerate(names):
+            ids = self._candidates(name, index)
+            if ids:
+                scores[row, ids] = [fuzz.token_set_ratio(name, choices[i]) for i in ids]
+            best = int(scores[row].argmax())
+            results[name] = choices[best] if scores[row, best] >= SCORE_CUTOFF else None
+        return results
+
+    # --- Resolution ---
+
+    def resolve_many(self, team_names):
+        """
+        Batch version of get_canonical_name: resolves all names at once and
+        returns {name: canonical name or None}.
+        """
+        resolved = {}
+        pending = []
+        for name in dict.fromkeys(team_names):
+            if not name:
+                resolved[name] = None
+            elif name in self.elo_data:
+                resolved[name] = name
+            elif name in self.mappings:
+                resolved[name] = self.mappings[name]
+            else:
+                pending.append(name)
+
+        if pending:
+            matches = self._fuzzy_match(pending)
+            self.mappings.update(matches)
+            self._dirty = True
+            resolved.update(matches)
+        return resolved
+
     def get_canonical_name(self, team_name):
         """
         Resolves the scraper team name to the canonical name in our database.
@@ -33,33 +153,7 @@ class EntityResolver:
         """
         if not team_name:
             return None
-            
-        # 1. Direct key match
-        if team_name in self.elo_data:
-            return team_name
-            
-        # 2. Checked Cached Mapping
-        if team_name in self.mappings:
-            mapped_name = self.mappings[team_name]
-            # Verify it still exists in data? (Optional but good safety)
-            return mapped_name
-                
-        # 3. Fuzzy Match
-        choices = list(self.elo_data.keys())
-        if not choices:
-            return None
-            
-        match = process.extractOne(team_name, choices, scorer=fuzz.token_set_ratio)
-        
-        if match and match[1] >= 80:
-            best_match = match[0]
-            self.mappings[team_name] = best_match
-            self.save_mappings()
-            return best_match
-        else:
-            self.mappings[team_name] = None
-            self.save_mappings()
-            return None
+        return self.resolve_many([team_name])[team_name]
 
     def get_elo(self, team_name):
         canon = self.get_canonical_name(team_name)
@@ -74,3 +168,4 @@ if __name__ == "__main__":
     for t in test_teams:
         elo = resolver.get_elo(t)
         print(f"{t}: {elo}")
+    resolver.flush()
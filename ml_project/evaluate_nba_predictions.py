@@ -2,7 +2,7 @@ import pandas as pd
 import json
 import os
 import argparse
-from rapidfuzz import process, fuzz
+from match_matcher import match_records
 
 ANALYTICS_FILE = "data_sets/NBA/nba_analytics.json"
 
@@ -40,14 +40,15 @@ def evaluate_nba(date_str):
     df = pd.read_csv(preds_file)
     results = load_json(results_file)
     
-    # Map Results by Home Team
-    results_map = {}
-    result_keys = []
-    
-    for r in results:
-        h = r['home_team']
-        results_map[normalize(h)] = r
-        result_keys.append(normalize(h))
+    # Match predictions to results (match_id first, then one-to-one fuzzy names;
+    # lower threshold for "Knicks" vs "New York Knicks")
+    matches = match_records(
+        [{'home': row['Home Team'], 'away': row.get('Away Team'),
+          'match_id': row.get('match_id') if pd.notna(row.get('match_id')) else None}
+         for _, row in df.iterrows()],
+        [{'home': r.get('home_team'), 'away': r.get('away_team'), 'match_id': r.get('match_id')}
+         for r in results],
+        min_score=70, use_dates=False)
         
     correct_moneyline = 0
     correct_total = 0
@@ -55,7 +56,7 @@ def evaluate_nba(date_str):
     
     verification_rows = []
     
-    for _, row in df.iterrows():
+    for pos, (_, row) in enumerate(df.iterrows()):
         home = row['Home Team']
         away = row['Away Team']
         
@@ -64,18 +65,11 @@ def evaluate_nba(date_str):
         market_total = float(row.get('Total Line', 0)) if row.get('Total Line') else 0
         
         # Match Result
-        norm_h = normalize(home)
-        match_res = None
-        
-        if norm_h in results_map:
-            match_res = results_map[norm_h]
-        else:
-            m = process.extractOne(norm_h, result_keys, scorer=fuzz.ratio)
-            if m and m[1] >= 70: # Lower threshold for "Knicks" vs "New York Knicks"
-                match_res = results_map[m[0]]
-            else:
-                print(f"Could not find result for {home}")
-                continue
+        match = matches.get(pos)
+        if not match:
+            print(f"Could not find result for {home}")
+            continue
+        match_res = results[match[0]]
                 
         h_score = match_res['home_score']
         a_score = match_res['away_score']
@@ -3,7 +3,7 @@ import json
 import os
 import argparse
 import datetime
-from rapidfuzz import process, fuzz
+from match_matcher import match_records
 
 class LeagueStatsManager:
     def __init__(self, stats_file="data_sets/league_analytics.json", check_file="data_sets/league_analytics_check.json"):
@@ -100,23 +100,26 @@ class Evaluator:
         correct_1x2 = 0
         correct_ou = 0
         
-        # Create a lookup for results based on home team
-        # Since names might differ slightly, we'll iterate predictions and fuzzy match against results
-        
-        # Pre-process results for faster lookup
-        results_map = {} # Normalized Home Team -> Result Object
-        result_teams = []
-        
-        for res in self.results_data:
-            h_team = res.get('home_team')
-            if h_team:
-                results_map[h_team] = res
-                result_teams.append(h_team)
+        # Match predictions to results in one pass: match_id first, then a
+        # one-to-one assignment on fuzzy home/away names
+        pred_records = [{
+            'home': row['Home Team'],
+            'away': row.get('Away Team'),
+            'date': row.get('Date'),
+            'match_id': row.get('match_id') if pd.notna(row.get('match_id')) else None,
+        } for _, row in self.preds_df.iterrows()]
+        result_records = [{
+            'home': r.get('home_team'),
+            'away': r.get('away_team'),
+            'date': r.get('start_time'),
+            'match_id': r.get('match_id'),
+        } for r in self.results_data]
+        matches = match_records(pred_records, result_records, min_score=80)
 
         details = []
         dates_in_file = []
 
-        for _, row in self.preds_df.iterrows():
+        for pos, (_, row) in enumerate(self.preds_df.iterrows()):
             pred_home = row['Home Team']
             pred_league = row.get('League', 'Unknown')
             pred_1x2 = str(row['Prediction 1X2']).strip() # Home, Draw, Away OR 1, X, 2
@@ -128,25 +131,8 @@ class Evaluator:
                 
             pred_ou = str(row['Prediction O/U']).strip()   # Over 2.5, Under 2.5
             
-            # Match Logic: ID First, Name Second
-            match_id = str(row.get('match_id', '')).strip()
-            
-            # 1. Try Match ID (Exact)
-            actual_data = None
-            
-            # Map by ID if we haven't already
-            if not hasattr(self, 'results_by_id'):
-                self.results_by_id = {r.get('match_id'): r for r in self.results_data if r.get('match_id')}
-
-            if match_id and match_id in self.results_by_id:
-                actual_data = self.results_by_id[match_id]
-            
-            # 2. Fallback to Fuzzy Name Match
-            if not actual_data:
-                match = process.extractOne(pred_home, result_teams, scorer=fuzz.ratio)
-                if match and match[1] > 80:
-                    matched_team_name = match[0]
-                    actual_data = results_map[matched_team_name]
+            match = matches.get(pos)
+            actual_data = self.results_data[match[0]] if match else None
             
             if actual_data:
                 # Check if scores exist
@@ -209,11 +195,7 @@ class Evaluator:
                     'Conf O/U': row.get('Conf O/U', '')
                 })
             else:
-                if match:
-                    print(f"Missed: {pred_home} (Best: {match[0]} Score: {match[1]})")
-                else:
-                    print(f"Missed: {pred_home} (No match found)")
-                pass
+                print(f"Missed: {pred_home} (No match found)")
 
         # Save cumulative stats
         self.stats_manager.save_stats()
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from elo_engine import EloTracker
+from rolling_engine import RollingFormEngine
 import warnings
 
 from rapidfuzz import process, fuzz
@@ -9,8 +10,14 @@ from rapidfuzz import process, fuzz
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 class FeatureEngineer:
-    def __init__(self):
-        pass
+    def __init__(self, engine: str = "vectorized"):
+        """
+        engine: 'vectorized' (RollingFormEngine, default) or 'legacy' (iterrows reference
+        implementation, kept for equivalence checks and benchmarks).
+        """
+        if engine not in ("vectorized", "legacy"):
+            raise ValueError(f"Unknown rolling engine: {engine}")
+        self.engine = engine
 
     def calculate_features_from_h2h(self, last_matches: list, target_team: str, window: int = 5, venue_filter: str = None) -> dict:
         """
@@ -114,7 +121,8 @@ class FeatureEngineer:
 
     def add_league_encoding(self, df: pd.DataFrame) -> pd.DataFrame:
         if 'league' in df.columns:
-            df['league_cat'] = df['league'].astype('category')
+            # league may already be categorical (DataLoader); keep only the leagues present
+            df['league_cat'] = df['league'].astype('category').cat.remove_unused_categories()
         return df
 
     def add_implied_probabilities(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -132,7 +140,7 @@ class FeatureEngineer:
         for both Home and Away teams based on their last `window` games.
         ALSO adds PPG (season-to-date) and Relative Strength features.
         """
-        df = df.sort_values('date').copy()
+        df = df.sort_values('date', kind='stable').copy()
         
         # 0. Implied Probabilities
         df = self.add_implied_probabilities(df)
@@ -162,6 +170,19 @@ class FeatureEngineer:
         return df
 
     def _calculate_specific_home_away(self, df):
+        if self.engine == "legacy":
+            return self._calculate_specific_home_away_legacy(df)
+
+        engine = RollingFormEngine(df)
+        h_spec = engine.venue_form(is_home=True, window=5)
+        a_spec = engine.venue_form(is_home=False, window=5)
+        for stat in ['pts', 'gf', 'ga', 'sf', 'sa']:
+            df[f'H_home_{stat}'] = h_spec[stat]
+        for stat in ['pts', 'gf', 'ga', 'sf', 'sa']:
+            df[f'A_away_{stat}'] = a_spec[stat]
+        return df
+
+    def _calculate_specific_home_away_legacy(self, df):
         # Re-implementation of specific form logic
         teams = pd.concat([df['home_team'], df['away_team']]).unique()
         
@@ -172,8 +193,8 @@ class FeatureEngineer:
         team_away_matches = {}
         
         for team in teams:
-            team_home_matches[team] = df[df['home_team'] == team].sort_values('date')
-            team_away_matches[team] = df[df['away_team'] == team].sort_values('date')
+            team_home_matches[team] = df[df['home_team'] == team].sort_values('date', kind='stable')
+            team_away_matches[team] = df[df['away_team'] == team].sort_values('date', kind='stable')
             
         for idx, row in df.iterrows():
             date = row['date']
@@ -205,6 +226,20 @@ class FeatureEngineer:
 
     def _calculate_rolling(self, df, window, suffix):
         """Helper to calculate rolling stats for a specific window."""
+        if self.engine == "legacy":
+            return self._calculate_rolling_legacy(df, window, suffix)
+
+        engine = RollingFormEngine(df)
+        h_form, a_form = engine.overall_form(window=window)
+        stats = ['pts', 'gf', 'ga', 'ou', 'str', 'sf', 'sa', 'cf', 'ca']
+        for stat in stats:
+            df[f'H_form_{stat}{suffix}'] = h_form[stat]
+        for stat in stats:
+            df[f'A_form_{stat}{suffix}'] = a_form[stat]
+        return df
+
+    def _calculate_rolling_legacy(self, df, window, suffix):
+        """Reference iterrows implementation of _calculate_rolling (slow, O(N*T))."""
         teams = pd.concat([df['home_team'], df['away_team']]).unique()
         
         # Dictionaries to store results
@@ -217,7 +252,7 @@ class FeatureEngineer:
         team_matches = {}
         for team in teams:
             # Get all matches for team
-            tm = df[(df['home_team'] == team) | (df['away_team'] == team)].sort_values('date')
+            tm = df[(df['home_team'] == team) | (df['away_team'] == team)].sort_values('date', kind='stable')
             team_matches[team] = tm
             
         # Iterate through main DF to assign rolling stats
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from elo_engine import ArrayEloTracker
+from feature_engineering import FeatureEngineer
+from history_cache import compact_frame
+
+# Bump whenever the Elo engine or FeatureEngineer output changes so stale stores are rebuilt
+FEATURE_VERSION = 2
+
+
+class FeatureStore:
+    """
+    Versioned on-disk store of the enriched per-match frame (raw columns +
+    Elo + rolling features) shared by train_model and tune_model.
+
+    The store is keyed by a hash of the MatchHistory rows, FEATURE_VERSION and
+    the feature buffer start date. When MatchHistory only gained newer matches,
+    Elo is continued from the saved ratings and rolling features are computed
+    for the new tail only (using the last home/away games of the teams involved
+    as context), instead of replaying the whole history.
+    """
+
+    FRAME = "enriched.parquet"
+    META = "meta.json"
+
+    def __init__(self, history_dir="data_sets/MatchHistory", store_dir="data_sets/feature_store",
+                 buffer_start="2019-01-01", streaming=False):
+        self.history_dir = history_dir
+        self.store_dir = store_dir
+        # Rolling features are computed from this date on (earlier rows only feed Elo)
+        self.buffer_start = pd.Timestamp(buffer_start)
+        # Build season by season to bound peak memory (same output)
+        self.streaming = streaming
+        self.elo_ratings = {}
+
+    # --- Hashing ---
+
+    @staticmethod
+    def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    @staticmethod
+    def _digest(row_hashes: np.ndarray) -> str:
+        return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+    # --- Persistence ---
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.store_dir, self.META), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, enriched: pd.DataFrame, meta: dict):
+        os.makedirs(self.store_dir, exist_ok=True)
+        frame_path = os.path.join(self.store_dir, self.FRAME)
+        meta_path = os.path.join(self.store_dir, self.META)
+        try:
+            self._write_parquet(enriched, frame_path + ".tmp")
+            os.replace(frame_path + ".tmp", frame_path)
+        except Exception as e:
+            print(f"Warning: Could not persist feature store: {e}")
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            return
+        with open(meta_path + ".tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @staticmethod
+    def _write_parquet(df: pd.DataFrame, path: str, batch_rows=100000):
+        """Writes `df` in row groups so only one batch is converted to Arrow at a time."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        with pq.ParquetWriter(path, schema) as writer:
+            for start in range(0, max(len(df), 1), batch_rows):
+                batch = df.iloc[start:start + batch_rows]
+                writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+    # --- Build ---
+
+    @staticmethod
+    def _finalize(enriched: pd.DataFrame) -> pd.DataFrame:
+        enriched.reset_index(drop=True, inplace=True)
+        enriched = compact_frame(enriched)
+        if 'league_cat' in enriched.columns:
+            enriched['league_cat'] = enriched['league_cat'].astype('category').cat.remove_unused_categories()
+        return enriched
+
+    @staticmethod
+    def _context(enriched: pd.DataFrame, teams) -> pd.DataFrame:
+        """
+        The last 5 home and 5 away games of `teams` (this also covers their last
+        5 overall games), i.e. everything rolling features of a later match need.
+        """
+        home_ctx = enriched[enriched['home_team'].isin(teams)].groupby('home_team', observed=True).tail(5)
+        away_ctx = enriched[enriched['away_team'].isin(teams)].groupby('away_team', observed=True).tail(5)
+        return enriched.loc[home_ctx.index.union(away_ctx.index)]
+
+    def _extend(self, context, elo_tracker, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Elo + rolling features for `chunk` (matches strictly newer than
+        `context`). Elo continues from `elo_tracker` and is attached by
+        position; rolling features only look back into `context`.
+        """
+        h_elo, a_elo = elo_tracker.rate(chunk)
+        in_buffer = (chunk['date'] >= self.buffer_start).to_numpy()
+        df_fe = chunk[in_buffer].copy()
+        df_fe['H_elo'] = h_elo[in_buffer]
+        df_fe['A_elo'] = a_elo[in_buffer]
+        if df_fe.empty:
+            return df_fe
+
+        fe = FeatureEngineer()
+        if context is None or context.empty:
+            return fe.add_rolling_features(df_fe)
+
+        context = self._context(context, set(df_fe['home_team']).union(df_fe['away_team']))
+        work = pd.concat([context, df_fe], ignore_index=True)
+        work['_is_new'] = np.r_[np.zeros(len(context), dtype=bool), np.ones(len(df_fe), dtype=bool)]
+        work = fe.add_rolling_features(work)
+        new_rows = work[work['_is_new']].drop(columns=['_is_new'])
+        return new_rows[[c for c in context.columns if c in new_rows.columns] +
+                        [c for c in new_rows.columns if c not in context.columns]]
+
+    def _build_full(self, raw: pd.DataFrame):
+        print("Feature store: full rebuild (Elo + rolling features)...")
+        elo_tracker = ArrayEloTracker()
+        enriched = self._extend(None, elo_tracker, raw)
+        return self._finalize(enriched), elo_tracker.ratings
+
+    def _build_streaming(self, raw: pd.DataFrame):
+        """
+        Same result as _build_full, but one season (Aug-Jul) at a time: the
+        working set of Elo/feature computation is bounded by the largest season
+        instead of the whole history. Only the finished (compacted) seasons and
+        a small context of each team's latest games are kept in between.
+        """
+        print("Feature store: streaming rebuild by season...")
+        elo_tracker = ArrayEloTracker()
+        dates = raw['date']
+        season = np.where(dates.dt.month >= 8, dates.dt.year, dates.dt.year - 1)
+        season = pd.Series(season, index=raw.index).where(dates.notna())
+
+        chunks = []
+        context = None
+        for year in season.dropna().unique():
+            new_rows = self._extend(context, elo_tracker, raw[season == year])
+            if new_rows.empty:
+                continue
+            new_rows = new_rows.reset_index(drop=True)
+            pool = new_rows if context is None else pd.concat([context, new_rows], ignore_index=True)
+            context = self._context(pool, set(pool['home_team']).union(pool['away_team'])).reset_index(drop=True)
+            chunks.append(new_rows)
+            print(f"  Season {int(year)}/{int(year) + 1}: {len(new_rows)} rows")
+
+        # Undated rows still move the ratings (they sort last), like in the full build
+        undated = raw[season.isna()]
+        if not undated.empty:
+            elo_tracker.rate(undated)
+
+        # Chunks share raw's team/league categories, so this concat stays compact
+        enriched = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=raw.columns)
+        del chunks
+        return self._finalize(enriched), elo_tracker.ratings
+
+    def _build_tail(self, enriched_old: pd.DataFrame, ratings: dict, tail: pd.DataFrame):
+        print(f"Feature store: appending {len(tail)} new matches...")
+        elo_tracker = ArrayEloTracker(ratings=ratings)
+        new_rows = self._extend(enriched_old, elo_tracker, tail)
+        if new_rows.empty:
+            return enriched_old, elo_tracker.ratings
+        enriched = pd.concat([enriched_old, new_rows], ignore_index=True)
+        return self._finalize(enriched), elo_tracker.ratings
+
+    def load(self) -> pd.DataFrame:
+        """
+        Returns the enriched frame (rows since buffer_start), rebuilding or
+        extending the on-disk store as needed. Final Elo ratings are left in
+        self.elo_ratings.
+        """
+        raw = DataLoader(self.history_dir).load_historical_data()
+        row_hashes = self._row_hashes(raw)
+        data_hash = self._digest(row_hashes)
+
+        meta = self._read_meta()
+        frame_path = os.path.join(self.store_dir, self.FRAME)
+        compatible = (meta.get('version') == FEATURE_VERSION and
+                      meta.get('buffer_start') == self.buffer_start.isoformat() and
+                      os.path.exists(frame_path))
+
+        if compatible and meta.get('data_hash') == data_hash:
+            print(f"Feature store up to date ({self.store_dir}).")
+            self.elo_ratings = meta['elo_ratings']
+            return pd.read_parquet(frame_path)
+
+        enriched = None
+        if compatible and not raw['date'].isna().any():
+            # Incremental only if the previously stored rows are untouched and
+            # every new match is strictly newer than the stored history.
+            n_prev = meta['n_rows']
+            max_date = pd.Timestamp(meta['max_date'])
+            if (len(raw) > n_prev and (raw['date'].iloc[:n_prev] <= max_date).all() and
+                    (raw['date'].iloc[n_prev:] > max_date).all() and
+                    self._digest(row_hashes[:n_prev]) == meta['data_hash']):
+                enriched_old = pd.read_parquet(frame_path)
+                enriched, ratings = self._build_tail(enriched_old, meta['elo_ratings'], raw.iloc[n_prev:])
+
+        if enriched is None:
+            build = self._build_streaming if self.streaming else self._build_full
+            enriched, ratings = build(raw)
+
+        self.elo_ratings = {team: float(r) for team, r in ratings.items()}
+        self._save(enriched, {
+            'version': FEATURE_VERSION,
+            'buffer_start': self.buffer_start.isoformat(),
+            'data_hash': data_hash,
+            'n_rows': len(raw),
+            'max_date': raw['date'].max().isoformat(),
+            'elo_ratings': self.elo_ratings,
+        })
+        return enriched
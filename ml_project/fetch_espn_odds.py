@@ -3,6 +3,12 @@ from playwright.async_api import async_playwright
 import json
 import datetime
 import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT) # Enable importing flashscore_scraper
+from flashscore_scraper import settings as scraper_settings
+from flashscore_scraper.resource_filter import ResourceFilter
 
 OUTPUT_FILE = "output_basketball/espn_odds.json"
 
@@ -10,6 +16,10 @@ async def fetch_espn_odds():
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
+        # Same asset/tracker blocking as the spiders (RESOURCE_FILTER_* in flashscore_scraper/settings.py)
+        resource_filter = ResourceFilter.from_settings(scraper_settings, "espn_odds")
+        if scraper_settings.RESOURCE_FILTER_ENABLED:
+            await page.route("**", resource_filter.route)
         
         # Calculate Tomorrow's Date
         tomorrow = datetime.date.today() + datetime.timedelta(days=1)
@@ -186,6 +196,7 @@ async def fetch_espn_odds():
             json.dump(games, f, indent=2)
             
         print(f"Saved to {OUTPUT_FILE}")
+        print(resource_filter.summary())
         await browser.close()
 
 if __name__ == "__main__":
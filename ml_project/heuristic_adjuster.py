@@ -1,36 +1,124 @@
+import glob
+import hashlib
 import json
 import os
+from difflib import SequenceMatcher
+import numpy as np
 import pandas as pd
 from entity_resolver import EntityResolver
 
+# Bump when the packed index layout changes so old index files are rebuilt
+INDEX_VERSION = 2
+
+# Packed record field -> standings/form table it comes from
+TABLES = {
+    'standings': "standings_overall.json",
+    'form': "last_5_matches_overall.json",
+    'home_table': "standings_home.json",
+    'away_table': "standings_away.json",
+    'form_home': "last_5_matches_home.json",
+    'form_away': "last_5_matches_away.json",
+    'form_10': "last_10_matches_overall.json",
+}
+
+# Numeric per-team inputs of the rules (HeuristicAdjuster._team_inputs / apply_rules)
+TEAM_INPUTS = (
+    ['has_standings', 'standings_rank', 'has_home_table', 'home_table_rank', 'has_away_table', 'away_table_rank']
+    + [k for field in ('form', 'form_home', 'form_away', 'form_10') for k in (f'has_{field}', f'{field}_W', f'{field}_D', f'{field}_L')]
+    + ['mp', 'gf']
+)
+
+def league_draw_rate(total_draws, total_matches):
+    """League draw rate from summed standings draws / matches played (both counted once per team)."""
+    draw_rate = (total_draws / total_matches) if total_matches > 0 else 0.26 # Default ~26%
+    
+    # Clip outlier rates (e.g. if early season)
+    if draw_rate < 0.10: draw_rate = 0.15
+    if draw_rate > 0.40: draw_rate = 0.35
+    return draw_rate
+
 class HeuristicAdjuster:
-    def __init__(self, data_dir="data_sets/standings"):
+    def __init__(self, data_dir="data_sets/standings", index_file="data_sets/heuristic_index.json"):
         self.data_dir = data_dir
+        self.index_file = index_file
         self.resolver = EntityResolver()
         
-        # Load Data
-        self.standings = self._load_json("standings_overall.json")
-        self.form_overall = self._load_json("last_5_matches_overall.json")
-        self.standings_home = self._load_json("standings_home.json")
-        self.standings_away = self._load_json("standings_away.json")
-        self.form_home = self._load_json("last_5_matches_home.json")
-        self.form_away = self._load_json("last_5_matches_away.json")
-        
-        # Load Last 10 Data
-        self.form_overall_10 = self._load_json("last_10_matches_overall.json")
+        # Index: leagues = { "Country|League": { "draw_rate": ..., "teams": { "TeamName": {table: entry} } } }
+        # tables = { table: { "Country|League": [team names in table order] } } (per-table lookups)
+        index = self._load_index()
+        self.leagues = index['leagues']
+        self.tables = index['tables']
         
-        # Create lookups based on "Country: League" keys for faster access
-        self.standings_lookup = self._build_lookup(self.standings)
-        self.form_lookup = self._build_lookup(self.form_overall)
-        self.home_table_lookup = self._build_lookup(self.standings_home)
-        self.away_table_lookup = self._build_lookup(self.standings_away)
-        self.form_home_lookup = self._build_lookup(self.form_home)
-        self.form_away_lookup = self._build_lookup(self.form_away)
-        
-        self.form_lookup_10 = self._build_lookup(self.form_overall_10)
-        
-        # Calibration Data
-        self.league_stats = self._calculate_league_stats(self.standings)
+        # Per-run memo of scraper names -> index keys (each match resolves once)
+        self._league_keys = {}
+        self._team_keys = {}
+        self._team_inputs_memo = {}
+
+    # --- Index ---
+
+    def _fingerprint(self):
+        files = {}
+        for path in sorted(glob.glob(os.path.join(self.data_dir, "*.json"))):
+            st = os.stat(path)
+            files[os.path.basename(path)] = [st.st_size, st.st_mtime_ns]
+        payload = json.dumps({'version': INDEX_VERSION, 'data_dir': self.data_dir, 'files': files}, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _load_index(self):
+        """Loads the persisted index, rebuilding it when the standings JSONs changed."""
+        fingerprint = self._fingerprint()
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    payload = json.load(f)
+                if payload.get('fingerprint') == fingerprint:
+                    return payload['index']
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                print(f"Warning: Could not read heuristic index {self.index_file}: {e}")
+
+        index = self._build_index()
+        leagues = index['leagues']
+        print(f"Built heuristic index: {len(leagues)} leagues, {sum(len(l['teams']) for l in leagues.values())} teams.")
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+            tmp_path = self.index_file + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'fingerprint': fingerprint, 'index': index}, f)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            print(f"Warning: Could not save heuristic index {self.index_file}: {e}")
+        return index
+
+    def _build_index(self):
+        """
+        Packs every standings/form table into one record per (league, team),
+        plus the league calibration stats and, per table, its leagues and team
+        names in file order (so each table is still matched on its own).
+        """
+        leagues = {}
+        tables = {}
+        for field, filename in TABLES.items():
+            table = tables[field] = {}
+            for entry in self._load_json(filename):
+                key = self._league_key(entry)
+                league = leagues.setdefault(key, {'draw_rate': None, 'teams': {}})
+                names = table.setdefault(key, {})
+                team = entry.get('team_name')
+                if team:
+                    league['teams'].setdefault(team, {})[field] = entry
+                    names[team] = None
+            for key in table:
+                table[key] = list(table[key])
+
+        for key, stat in self._calculate_league_stats(self._load_json(TABLES['standings'])).items():
+            leagues[key]['draw_rate'] = stat['draw_rate']
+        return {'leagues': leagues, 'tables': tables}
+
+    @staticmethod
+    def _league_key(entry):
+        c = entry.get('country', '').upper()
+        l = entry.get('league', '')
+        return f"{c}|{l}"
 
     def _calculate_league_stats(self, standings_data):
         """
@@ -66,14 +154,8 @@ class HeuristicAdjuster:
                     total_matches += mp
                 except: pass
                 
-            draw_rate = (total_draws / total_matches) if total_matches > 0 else 0.26 # Default ~26%
-            
-            # Clip outlier rates (e.g. if early season)
-            if draw_rate < 0.10: draw_rate = 0.15
-            if draw_rate > 0.40: draw_rate = 0.35
-            
             stats[key] = {
-                'draw_rate': draw_rate
+                'draw_rate': league_draw_rate(total_draws, total_matches)
             }
             
         return stats
@@ -85,83 +167,123 @@ class HeuristicAdjuster:
                 return json.load(f)
         return []
 
-    def _build_lookup(self, data):
+    def resolve_league(self, league_name, table='standings'):
         """
-        Builds a dict: { "Country|League": { "TeamName": {stats...} } }
+        Key of a scraper league ("ENGLAND: Premier League" -> "ENGLAND|Premier League")
+        among the leagues of one table: the exact key, else the first key of that
+        table containing both country and league. The default (standings) is the
+        set of leagues with a calibration draw rate.
         """
-        lookup = {}
-        for entry in data:
-            c = entry.get('country', '').upper()
-            l = entry.get('league', '')
-            key = f"{c}|{l}"
-            
-            if key not in lookup:
-                lookup[key] = {}
-            
-            team = entry.get('team_name')
-            if team:
-                # Normalize team name for lookup key?
-                # Using resolver might be overkill here, we'll fuzzy match at query time
-                # Store by raw name for iteration
-                lookup[key][team] = entry
-        return lookup
-
-    def find_team_stats(self, lookup, country, league_name, team_name):
-        """
-        Finds stats for a team in a specific league lookup.
-        Tries exact match first, then fuzzy via EntityResolver logic if needed.
-        """
-        # 1. Construct Key
-        # Scraper league: "ENGLAND: Premier League" -> Country="ENGLAND", League="Premier League"
-        # Adjuster lookup key: "ENGLAND|Premier League"
-        
-        # Normalize League Name input
+        memo_key = (league_name, table)
+        if memo_key in self._league_keys:
+            return self._league_keys[memo_key]
+
+        found_key = None
+        keys = self.tables.get(table, {})
         if ":" in league_name:
             parts = league_name.split(":")
             c_in = parts[0].strip().upper()
             l_in = parts[1].strip()
-        else:
-            # Maybe just league name? heuristic check
-            # For now assume scraper provides full string
-            return None 
-
-        key = f"{c_in}|{l_in}"
-        
-        league_data = lookup.get(key)
-        if not league_data:
-            # Try fuzzy league matching?
-            # Flashscore names should allow exact match if sourced from same place
-            # But "Premier League" vs "Premier League" might differ by spaces
-            # Try to find partial match
-            found_key = None
-            for k in lookup.keys():
-                if c_in in k and l_in in k:
-                    found_key = k
-                    break
-            if found_key:
-                league_data = lookup[found_key]
+            key = f"{c_in}|{l_in}"
+            if key in keys:
+                found_key = key
             else:
-                return None
+                # "Premier League" vs "Premier League" might differ by spaces
+                for k in keys:
+                    if c_in in k and l_in in k:
+                        found_key = k
+                        break
 
-        # 2. Find Team
-        if team_name in league_data:
-            return league_data[team_name]
-        
-        # Fuzzy Match Team
+        self._league_keys[memo_key] = found_key
+        return found_key
+
+    def _table_team(self, league_name, team_name, table):
+        """Team name in one table's league: exact, else the closest name in that table (ratio > 0.8)."""
+        key = self.resolve_league(league_name, table)
+        if key is None:
+            return None, None
+        names = self.tables[table][key]
+        if team_name in self.leagues[key]['teams'] and table in self.leagues[key]['teams'][team_name]:
+            return key, team_name
         best_match = None
         best_score = 0
-        from difflib import SequenceMatcher
-        
-        for t_key in league_data.keys():
+        for t_key in names:
             ratio = SequenceMatcher(None, team_name.lower(), t_key.lower()).ratio()
             if ratio > 0.8 and ratio > best_score:
                 best_score = ratio
                 best_match = t_key
-        
-        if best_match:
-            return league_data[best_match]
-            
-        return None
+        return key, best_match
+
+    def team_record(self, league_name, team_name):
+        """
+        Record {table: entry} of a team (keys as in TABLES), or None.
+        Every table is matched separately, as the per-table lookups did: its
+        own league key, then the exact team name or that table's closest name,
+        so a team missing from one table can pick up a similar name there.
+        """
+        memo_key = (league_name, team_name)
+        if memo_key not in self._team_keys:
+            rec = {}
+            for table in TABLES:
+                key, name = self._table_team(league_name, team_name, table)
+                if name is not None:
+                    rec[table] = self.leagues[key]['teams'][name][table]
+            self._team_keys[memo_key] = rec or None
+        return self._team_keys[memo_key]
+
+    # --- Team inputs ---
+
+    @staticmethod
+    def _int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _team_inputs(self, league_name, team_name):
+        """
+        Numeric heuristic inputs of one team (memoized): table presence, ranks,
+        W/D/L counts of every form table and goals/matches played.
+        """
+        key = (league_name, team_name)
+        if key in self._team_inputs_memo:
+            return self._team_inputs_memo[key]
+
+        rec = self.team_record(league_name, team_name) or {}
+        nan = np.nan
+        inputs = {}
+        for field in ('standings', 'home_table', 'away_table'):
+            entry = rec.get(field)
+            rank = self._int(entry.get('rank')) if entry else None
+            inputs[f'has_{field}'] = bool(entry)
+            inputs[f'{field}_rank'] = nan if rank is None else rank
+        for field in ('form', 'form_home', 'form_away', 'form_10'):
+            entry = rec.get(field)
+            res = (entry.get('last_5_results', '') or '') if entry else ''
+            inputs[f'has_{field}'] = bool(entry)
+            for r in 'WDL':
+                inputs[f'{field}_{r}'] = res.count(r)
+
+        s = rec.get('standings') or {}
+        mp = self._int(s.get('matches_played'))
+        try:
+            gf = int(s['goals'].split(':')[0])
+        except (KeyError, AttributeError, TypeError, ValueError):
+            gf = None
+        inputs['mp'] = nan if not mp else mp  # 0 matches played -> no average
+        inputs['gf'] = nan if gf is None else gf
+
+        self._team_inputs_memo[key] = inputs
+        return inputs
+
+    @staticmethod
+    def _odds(odds, keys):
+        try:
+            return [float(odds.get(k, 0.0)) for k in keys]
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    # --- Adjustment ---
 
     def adjust_probabilities(self, match_info, probs_1x2, probs_ou):
         """
@@ -171,330 +293,284 @@ class HeuristicAdjuster:
         
         Returns: (adj_1x2, adj_ou, logs)
         """
-        logs = []
-        league = match_info.get('League', '')
-        home = match_info.get('Home Team', '')
-        away = match_info.get('Away Team', '')
-        
-        # Copy to avoid mutation
-        adj_1x2 = list(probs_1x2)
-        adj_ou = list(probs_ou)
-        
-        # --- CALIBRATION (Step 3: League-Aware Shrinkage) ---
-        # Apply before heuristics
-        if ":" in league:
-            try:
-                parts = league.split(":")
-                c_in = parts[0].strip().upper()
-                l_in = parts[1].strip()
-                key = f"{c_in}|{l_in}"
-                
-                league_stat = self.league_stats.get(key)
-                if not league_stat:
-                    # Fuzzy find key
-                    for k in self.league_stats.keys():
-                        if c_in in k and l_in in k:
-                            league_stat = self.league_stats[k]
-                            break
-                            
-                if league_stat:
-                    target_draw = league_stat.get('draw_rate', 0.26)
-                    current_draw = adj_1x2[1]
-                    
-                    # Soft Normalization (Alpha = 0.15)
-                    # Moves current draw prob 15% towards the league average
-                    alpha = 0.15
-                    new_draw = (1 - alpha) * current_draw + alpha * target_draw
-                    
-                    # Adjust H/A proportionally
-                    prob_not_draw = 1.0 - new_draw
-                    old_not_draw = 1.0 - current_draw
-                    if old_not_draw < 0.001: old_not_draw = 1.0 # Safety
-                    
-                    ratio = prob_not_draw / old_not_draw
-                    
-                    adj_1x2[0] *= ratio
-                    adj_1x2[1] = new_draw
-                    adj_1x2[2] *= ratio
-                    
-                    # Re-normalize just in case
-                    scaler = sum(adj_1x2)
-                    adj_1x2 = [x/scaler for x in adj_1x2]
-                    
-                    logs.append(f"Calibration: Draw {current_draw:.2f}->{new_draw:.2f} (Target {target_draw:.2f})")
-            except Exception as e:
-                # logs.append(f"Calib Error: {e}") 
-                pass
-        
-        # --- NEW: SOFT CAP ON DRAW PROBABILITY ---
-        # p_draw = min(p_draw, league_draw_cap) where cap = historical + 5%
-        if ":" in league:
-             try:
-                parts = league.split(":")
-                c_in = parts[0].strip().upper()
-                l_in = parts[1].strip()
-                key = f"{c_in}|{l_in}"
-                
-                league_stat = self.league_stats.get(key)
-                if not league_stat:
-                    for k in self.league_stats.keys():
-                        if c_in in k and l_in in k:
-                            league_stat = self.league_stats[k]
-                            break
-                            
-                if league_stat:
-                    base_draw_rate = league_stat.get('draw_rate', 0.26)
-                    draw_cap = base_draw_rate + 0.05
-                    
-                    if adj_1x2[1] > draw_cap:
-                        old_draw = adj_1x2[1]
-                        diff = old_draw - draw_cap
-                        
-                        adj_1x2[1] = draw_cap
-                        # Distribute the shaved probability to Home/Away proportionally
-                        # or evenly? Proportionally is safer.
-                        prob_not_draw = adj_1x2[0] + adj_1x2[2]
-                        if prob_not_draw > 0:
-                             ratio_h = adj_1x2[0] / prob_not_draw
-                             ratio_a = adj_1x2[2] / prob_not_draw
-                             adj_1x2[0] += diff * ratio_h
-                             adj_1x2[2] += diff * ratio_a
-                        else:
-                             # Edge case, split even
-                             adj_1x2[0] += diff / 2
-                             adj_1x2[2] += diff / 2
-                             
-                        logs.append(f"Draw Cap: {old_draw:.2f}->{draw_cap:.2f} (Base {base_draw_rate:.2f})")
-             except: pass
-
-
-        # Get Stats
-        s_home = self.find_team_stats(self.standings_lookup, "", league, home)
-        s_away = self.find_team_stats(self.standings_lookup, "", league, away)
-        
-        f_home = self.find_team_stats(self.form_lookup, "", league, home)
-        f_away = self.find_team_stats(self.form_lookup, "", league, away)
-        
-        # Specific Stats
-        s_home_spec = self.find_team_stats(self.home_table_lookup, "", league, home)
-        s_away_spec = self.find_team_stats(self.away_table_lookup, "", league, away)
-        
-        f_home_spec = self.find_team_stats(self.form_home_lookup, "", league, home)
-        f_away_spec = self.find_team_stats(self.form_away_lookup, "", league, away)
-        
-        if not s_home or not s_away:
-            # We can continue if specific stats exist? Usually implying missing league data
-            return adj_1x2, adj_ou, logs + ["No Standings Data"]
+        batch = self.adjust_batch([probs_1x2], [probs_ou], pd.DataFrame([match_info]))
+        return batch.probs_1x2[0].tolist(), batch.probs_ou[0].tolist(), batch.logs(0)
 
-        # --- HEURISTIC 1: Standings Differential (Overall) ---
-        try:
-            h_rank = int(s_home['rank'])
-            a_rank = int(s_away['rank'])
-            
-            diff = a_rank - h_rank 
-            
-            if diff >= 5:
-                # Home is better
-                boost = 0.02 * (diff / 5)
-                boost = min(boost, 0.10)
-                adj_1x2[0] += boost
-                logs.append(f"Rank Boost Home (+{boost:.2f}): H#{h_rank} vs A#{a_rank}")
-                
-            elif diff <= -5:
-                # Away is better
-                boost = 0.02 * (abs(diff) / 5)
-                boost = min(boost, 0.10)
-                adj_1x2[2] += boost
-                logs.append(f"Rank Boost Away (+{boost:.2f}): H#{h_rank} vs A#{a_rank}")
-        except: pass
-
-        # --- HEURISTIC 2: Standings Differential (Specific: Home Table vs Away Table) ---
-        if s_home_spec and s_away_spec:
-            try:
-                h_rank_spec = int(s_home_spec['rank'])
-                a_rank_spec = int(s_away_spec['rank'])
-                
-                # Note: Home Table rank 1 means best home team. Away Table rank 1 means best away team.
-                # Direct comparison: Rank 1 Home vs Rank 10 Away = Mismatch favoring Home.
-                
-                diff_spec = a_rank_spec - h_rank_spec
-                
-                if diff_spec >= 5:
-                    boost = 0.03 * (diff_spec / 5) # Slightly higher weight for specific mismatch?
-                    boost = min(boost, 0.10)
-                    adj_1x2[0] += boost
-                    logs.append(f"Spec Rank Boost Home (+{boost:.2f}): H_home#{h_rank_spec} vs A_away#{a_rank_spec}")
-                    
-                elif diff_spec <= -5:
-                    boost = 0.03 * (abs(diff_spec) / 5)
-                    boost = min(boost, 0.10)
-                    adj_1x2[2] += boost
-                    logs.append(f"Spec Rank Boost Away (+{boost:.2f}): H_home#{h_rank_spec} vs A_away#{a_rank_spec}")
-            except: pass
-
-        # --- HEURISTIC 3: Form Momentum (Overall) ---
-        if f_home:
-            res = f_home.get('last_5_results', '')
-            wins = res.count('W')
-            if wins >= 4:
-                adj_1x2[0] += 0.05
-                logs.append(f"Form Boost Home (Wins={wins})")
-        
-        if f_away:
-            res = f_away.get('last_5_results', '')
-            losses = res.count('L')
-            if losses >= 4:
-                adj_1x2[0] += 0.05 
-                logs.append(f"Form Fade Away (Losses={losses})")
-
-        # --- HEURISTIC 4: Form Momentum (Specific) ---
-        # Home Team's form AT HOME
-        if f_home_spec:
-            res = f_home_spec.get('last_5_results', '')
-            wins = res.count('W')
-            if wins >= 4:
-                adj_1x2[0] += 0.06 # Stronger signal
-                logs.append(f"Spec Form Home Boost (Wins={wins})")
-                
-        # Away Team's form AWAY
-        if f_away_spec:
-            res = f_away_spec.get('last_5_results', '')
-            losses = res.count('L')
-            if losses >= 4:
-                adj_1x2[0] += 0.06
-                logs.append(f"Spec Form Away Fade (Losses={losses})")
-            elif res.count('W') >= 4:
-                adj_1x2[2] += 0.06
-                logs.append(f"Spec Form Away Boost (Wins={res.count('W')})")
-
-
-        # --- HEURISTIC 6: Form Trend Analysis (Last 5 vs Last 10) ---
-        # Logic: Compare Win Rate/Points Rate of Last 5 vs Last 10
-        # If L5 > L10 significantly -> Heating Up -> Boost
-        # If L5 < L10 significantly -> Cooling Down -> Dampen
+    def adjust_batch(self, probs_1x2, probs_ou, matches):
+        """
+        Applies every heuristic rule to N matches at once.
+        probs_1x2: (N, 3) [Home, Draw, Away]; probs_ou: (N, 2) [Under, Over]
+        matches: frame (or list of dicts) with 'League', 'Home Team', 'Away Team' and optional 'Odds' dicts.
         
-        def calculate_win_rate(form_entry):
-            if not form_entry: return 0.0
-            res = form_entry.get('last_5_results', '') # string like W|W|L...
-            games = len(res.split('|')) if '|' in res else len(res) # Handle both delimiter styles if present
-            # Our scraper puts "|" delimiter? let's check scraper. YES: "|".join(texts)
-            # But wait, existing code splits or counts chars directly?
-            # existing code: res.count('W'). If delimiter is |, 'W' count works.
-            # But games count: 'W|W|L'. len is 5. 
-            # If string is 'W|W' len is 3. 
-            # Safest is count W, D, L.
-            w = res.count('W')
-            d = res.count('D')
-            l = res.count('L')
-            total = w + d + l
-            return (w / total) if total > 0 else 0.0
-
-        # Home Trend
-        f_home_10 = self.find_team_stats(self.form_lookup_10, "", league, home)
-        if f_home and f_home_10:
-            wr_5 = calculate_win_rate(f_home)
-            wr_10 = calculate_win_rate(f_home_10)
-            
-            # Heating Up: Significant improvement (e.g. 80% vs 40%)
-            if wr_5 >= (wr_10 + 0.3): 
-                adj_1x2[0] += 0.04
-                logs.append(f"Home Heating Up (L5:{wr_5:.1%} vs L10:{wr_10:.1%})")
-            
-            # Cooling Down: Significant drop (e.g. 20% vs 60%)
-            elif wr_5 <= (wr_10 - 0.3):
-                adj_1x2[0] -= 0.03
-                logs.append(f"Home Cooling Down (L5:{wr_5:.1%} vs L10:{wr_10:.1%})")
-
-            # Consistency Reward: High Performance in both short and medium term
-            # e.g., >70% win rate in both
-            elif wr_5 >= 0.70 and wr_10 >= 0.60:
-                adj_1x2[0] += 0.03
-                logs.append(f"Home Consistent Form (L5:{wr_5:.1%} & L10:{wr_10:.1%})")
-                
-        # Away Trend
-        f_away_10 = self.find_team_stats(self.form_lookup_10, "", league, away)
-        if f_away and f_away_10:
-            wr_5 = calculate_win_rate(f_away)
-            wr_10 = calculate_win_rate(f_away_10)
-            
-            if wr_5 >= (wr_10 + 0.3):
-                adj_1x2[2] += 0.04
-                logs.append(f"Away Heating Up (L5:{wr_5:.1%} vs L10:{wr_10:.1%})")
-            elif wr_5 <= (wr_10 - 0.3):
-                adj_1x2[2] -= 0.03
-                logs.append(f"Away Cooling Down (L5:{wr_5:.1%} vs L10:{wr_10:.1%})")
-            elif wr_5 >= 0.70 and wr_10 >= 0.60:
-                adj_1x2[2] += 0.03
-                logs.append(f"Away Consistent Form (L5:{wr_5:.1%} & L10:{wr_10:.1%})")
-
-
-        # Re-normalize 1x2 (Once at the end logic-wise, but we do it incrementally usually. Let's do it now)
-        total = sum(adj_1x2)
-        adj_1x2 = [x/total for x in adj_1x2]
-
-        # --- HEURISTIC 5: High Scoring Teams (O/U) ---
-        try:
-            h_mp = int(s_home['matches_played'])
-            a_mp = int(s_away['matches_played'])
-            
-            h_gf = int(s_home['goals'].split(':')[0])
-            a_gf = int(s_away['goals'].split(':')[0])
-            
-            h_avg = h_gf / h_mp
-            a_avg = a_gf / a_mp
-            
-            if (h_avg + a_avg) > 3.5:
-                adj_ou[1] += 0.05 
-                logs.append(f"Goal Fest Boost (Avg GF: {h_avg+a_avg:.2f})")
-                
-            total_ou = sum(adj_ou)
-            adj_ou = [x/total_ou for x in adj_ou]
-            
-        except: pass
+        Returns an AdjustmentBatch with the adjusted arrays and a per-row bitmask of fired rules.
+        """
+        if not isinstance(matches, pd.DataFrame):
+            matches = pd.DataFrame(list(matches))
+        n = len(matches)
 
-        # --- HEURISTIC 7: Value Bet Identification (Logging Only) ---
-        odds = match_info.get('Odds', {})
-        
-        # 1X2 Value
-        try:
-            o_h = float(odds.get('1', 0.0))
-            o_d = float(odds.get('X', 0.0))
-            o_a = float(odds.get('2', 0.0))
-            
-            # Implied Probs (1/Odd). e.g. 2.0 -> 0.5
-            imp_h = (1.0 / o_h) if o_h > 1.0 else 0.0
-            imp_d = (1.0 / o_d) if o_d > 1.0 else 0.0
-            imp_a = (1.0 / o_a) if o_a > 1.0 else 0.0
-            
-            # Value = Model Prob - Implied Prob
-            val_h = adj_1x2[0] - imp_h
-            val_d = adj_1x2[1] - imp_d
-            val_a = adj_1x2[2] - imp_a
-            
-            # Log significant value (> 0.05 or > 5%)
-            if val_h > 0.05: logs.append(f"Value 1(+{val_h:.2%})")
-            if val_d > 0.05: logs.append(f"Value X(+{val_d:.2%})")
-            if val_a > 0.05: logs.append(f"Value 2(+{val_a:.2%})")
-            
-        except: pass
-        
-        # O/U Value
-        try:
-            o_o = float(odds.get('O', 0.0))
-            o_u = float(odds.get('U', 0.0))
-            
-            imp_o = (1.0 / o_o) if o_o > 1.0 else 0.0
-            imp_u = (1.0 / o_u) if o_u > 1.0 else 0.0
-            
-            val_o = adj_ou[1] - imp_o # Index 1 is Over? Check predict_matches.py. Yes: ['Under', 'Over'] implied? 
-            # predict_matches.py: probs_ou = model.predict_proba... usually [class 0, class 1].
-            # Feature engineering usually maps 0=Under, 1=Over. 
-            # Let's assume Index 1 is Over.
-            val_u = adj_ou[0] - imp_u
-            
-            if val_o > 0.05: logs.append(f"Value O(+{val_o:.2%})")
-            if val_u > 0.05: logs.append(f"Value U(+{val_u:.2%})")
-            
-        except: pass
+        # --- Gather inputs (one resolution per league/team) ---
+        def column(name):
+            return matches[name].tolist() if name in matches.columns else [''] * n
+
+        leagues, homes, aways = column('League'), column('Home Team'), column('Away Team')
+        odds = matches['Odds'].tolist() if 'Odds' in matches.columns else [{}] * n
+
+        draw_rate = np.full(n, np.nan)
+        home_in, away_in = [], []
+        odds_1x2 = np.full((n, 3), np.nan)
+        odds_ou = np.full((n, 2), np.nan)
+        for i in range(n):
+            league = leagues[i] or ''
+            key = self.resolve_league(league)
+            if key and self.leagues[key]['draw_rate'] is not None:
+                draw_rate[i] = self.leagues[key]['draw_rate']
+            home_in.append(self._team_inputs(league, homes[i] or ''))
+            away_in.append(self._team_inputs(league, aways[i] or ''))
+            o = odds[i] if isinstance(odds[i], dict) else {}
+            o_1x2 = self._odds(o, ('1', 'X', '2'))
+            if o_1x2 is not None:
+                odds_1x2[i] = o_1x2
+            o_ou = self._odds(o, ('O', 'U'))
+            if o_ou is not None:
+                odds_ou[i] = o_ou
+
+        def arrays(inputs):
+            return {k: np.array([t[k] for t in inputs], dtype=float) for k in TEAM_INPUTS}
+
+        return apply_rules(probs_1x2, probs_ou, draw_rate, arrays(home_in), arrays(away_in), odds_1x2, odds_ou)
+
+
+# --- Rule bits of AdjustmentBatch.flags ---
+RULE_CALIBRATION = 1 << 0
+RULE_DRAW_CAP = 1 << 1
+RULE_RANK_HOME = 1 << 2
+RULE_RANK_AWAY = 1 << 3
+RULE_SPEC_RANK_HOME = 1 << 4
+RULE_SPEC_RANK_AWAY = 1 << 5
+RULE_FORM_HOME = 1 << 6
+RULE_FORM_FADE_AWAY = 1 << 7
+RULE_SPEC_FORM_HOME = 1 << 8
+RULE_SPEC_FORM_AWAY_FADE = 1 << 9
+RULE_SPEC_FORM_AWAY_BOOST = 1 << 10
+RULE_HOME_HEATING = 1 << 11
+RULE_HOME_COOLING = 1 << 12
+RULE_HOME_CONSISTENT = 1 << 13
+RULE_AWAY_HEATING = 1 << 14
+RULE_AWAY_COOLING = 1 << 15
+RULE_AWAY_CONSISTENT = 1 << 16
+RULE_GOAL_FEST = 1 << 17
+RULE_VALUE_1 = 1 << 18
+RULE_VALUE_X = 1 << 19
+RULE_VALUE_2 = 1 << 20
+RULE_VALUE_O = 1 << 21
+RULE_VALUE_U = 1 << 22
+RULE_NO_STANDINGS = 1 << 23
+
+# Log line of each rule, formatted from the AdjustmentBatch context of a row
+RULE_LOGS = [
+    (RULE_CALIBRATION, lambda c: f"Calibration: Draw {c['current_draw']:.2f}->{c['new_draw']:.2f} (Target {c['draw_rate']:.2f})"),
+    (RULE_DRAW_CAP, lambda c: f"Draw Cap: {c['old_draw']:.2f}->{c['draw_cap']:.2f} (Base {c['draw_rate']:.2f})"),
+    (RULE_NO_STANDINGS, lambda c: "No Standings Data"),
+    (RULE_RANK_HOME, lambda c: f"Rank Boost Home (+{c['rank_boost']:.2f}): H#{int(c['h_rank'])} vs A#{int(c['a_rank'])}"),
+    (RULE_RANK_AWAY, lambda c: f"Rank Boost Away (+{c['rank_boost']:.2f}): H#{int(c['h_rank'])} vs A#{int(c['a_rank'])}"),
+    (RULE_SPEC_RANK_HOME, lambda c: f"Spec Rank Boost Home (+{c['spec_rank_boost']:.2f}): H_home#{int(c['h_rank_spec'])} vs A_away#{int(c['a_rank_spec'])}"),
+    (RULE_SPEC_RANK_AWAY, lambda c: f"Spec Rank Boost Away (+{c['spec_rank_boost']:.2f}): H_home#{int(c['h_rank_spec'])} vs A_away#{int(c['a_rank_spec'])}"),
+    (RULE_FORM_HOME, lambda c: f"Form Boost Home (Wins={int(c['form_W'])})"),
+    (RULE_FORM_FADE_AWAY, lambda c: f"Form Fade Away (Losses={int(c['form_L'])})"),
+    (RULE_SPEC_FORM_HOME, lambda c: f"Spec Form Home Boost (Wins={int(c['form_home_W'])})"),
+    (RULE_SPEC_FORM_AWAY_FADE, lambda c: f"Spec Form Away Fade (Losses={int(c['form_away_L'])})"),
+    (RULE_SPEC_FORM_AWAY_BOOST, lambda c: f"Spec Form Away Boost (Wins={int(c['form_away_W'])})"),
+    (RULE_HOME_HEATING, lambda c: f"Home Heating Up (L5:{c['home_wr_5']:.1%} vs L10:{c['home_wr_10']:.1%})"),
+    (RULE_HOME_COOLING, lambda c: f"Home Cooling Down (L5:{c['home_wr_5']:.1%} vs L10:{c['home_wr_10']:.1%})"),
+    (RULE_HOME_CONSISTENT, lambda c: f"Home Consistent Form (L5:{c['home_wr_5']:.1%} & L10:{c['home_wr_10']:.1%})"),
+    (RULE_AWAY_HEATING, lambda c: f"Away Heating Up (L5:{c['away_wr_5']:.1%} vs L10:{c['away_wr_10']:.1%})"),
+    (RULE_AWAY_COOLING, lambda c: f"Away Cooling Down (L5:{c['away_wr_5']:.1%} vs L10:{c['away_wr_10']:.1%})"),
+    (RULE_AWAY_CONSISTENT, lambda c: f"Away Consistent Form (L5:{c['away_wr_5']:.1%} & L10:{c['away_wr_10']:.1%})"),
+    (RULE_GOAL_FEST, lambda c: f"Goal Fest Boost (Avg GF: {c['avg_gf']:.2f})"),
+    (RULE_VALUE_1, lambda c: f"Value 1(+{c['value_1x2'][0]:.2%})"),
+    (RULE_VALUE_X, lambda c: f"Value X(+{c['value_1x2'][1]:.2%})"),
+    (RULE_VALUE_2, lambda c: f"Value 2(+{c['value_1x2'][2]:.2%})"),
+    (RULE_VALUE_O, lambda c: f"Value O(+{c['value_ou'][0]:.2%})"),
+    (RULE_VALUE_U, lambda c: f"Value U(+{c['value_ou'][1]:.2%})"),
+]
+
+
+def apply_rules(probs_1x2, probs_ou, draw_rate, home, away, odds_1x2=None, odds_ou=None):
+    """
+    Vectorized heuristic rules (see HeuristicAdjuster.adjust_batch) on pre-gathered inputs.
+    draw_rate: (N,) league draw rate, NaN when the league has no standings
+    home / away: {TEAM_INPUTS key: (N,) array} for the home and away team (NaN = unknown)
+    odds_1x2: (N, 3) [1, X, 2]; odds_ou: (N, 2) [O, U] decimal odds, NaN rows skip value detection
+    
+    Returns an AdjustmentBatch.
+    """
+    p = np.array(probs_1x2, dtype=float).reshape(-1, 3)
+    ou = np.array(probs_ou, dtype=float).reshape(-1, 2)
+    n = len(p)
+    draw_rate = np.asarray(draw_rate, dtype=float)
+    odds_1x2 = np.full((n, 3), np.nan) if odds_1x2 is None else np.asarray(odds_1x2, dtype=float)
+    odds_ou = np.full((n, 2), np.nan) if odds_ou is None else np.asarray(odds_ou, dtype=float)
+    flags = np.zeros(n, dtype=np.uint32)
+    ctx = {}
+
+    def h(name):
+        return home[name]
+
+    def a(name):
+        return away[name]
+
+    def fire(mask, rule):
+        flags[mask] |= rule
+
+    # --- CALIBRATION (Step 3: League-Aware Shrinkage) ---
+    # Moves current draw prob 15% towards the league average, H/A scaled proportionally
+    has_rate = ~np.isnan(draw_rate)
+    alpha = 0.15
+    current_draw = p[:, 1].copy()
+    new_draw = (1 - alpha) * current_draw + alpha * draw_rate
+    prob_not_draw = 1.0 - new_draw
+    old_not_draw = 1.0 - current_draw
+    old_not_draw = np.where(old_not_draw < 0.001, 1.0, old_not_draw) # Safety
+    ratio = prob_not_draw / old_not_draw
+    calibrated = np.column_stack([p[:, 0] * ratio, new_draw, p[:, 2] * ratio])
+    calibrated /= (calibrated[:, 0] + calibrated[:, 1] + calibrated[:, 2])[:, None]
+    p = np.where(has_rate[:, None], calibrated, p)
+    fire(has_rate, RULE_CALIBRATION)
+    ctx.update(current_draw=current_draw, new_draw=new_draw, draw_rate=draw_rate)
+
+    # --- SOFT CAP ON DRAW PROBABILITY (cap = historical + 5%) ---
+    draw_cap = draw_rate + 0.05
+    capped = has_rate & (p[:, 1] > draw_cap)
+    old_draw = p[:, 1].copy()
+    diff = old_draw - draw_cap
+    not_draw = p[:, 0] + p[:, 2]
+    safe = np.where(not_draw > 0, not_draw, 1.0)
+    add_h = np.where(not_draw > 0, diff * (p[:, 0] / safe), diff / 2)
+    add_a = np.where(not_draw > 0, diff * (p[:, 2] / safe), diff / 2)
+    p[capped, 0] += add_h[capped]
+    p[capped, 1] = draw_cap[capped]
+    p[capped, 2] += add_a[capped]
+    fire(capped, RULE_DRAW_CAP)
+    ctx.update(old_draw=old_draw, draw_cap=draw_cap)
+
+    # Rows without standings for both teams stop here
+    has_std = h('has_standings').astype(bool) & a('has_standings').astype(bool)
+    fire(~has_std, RULE_NO_STANDINGS)
+
+    def rank_rule(h_rank, a_rank, weight, rule_home, rule_away):
+        valid = has_std & ~np.isnan(h_rank) & ~np.isnan(a_rank)
+        diff = a_rank - h_rank
+        boost = np.minimum(weight * (np.abs(diff) / 5), 0.10)
+        home_up = valid & (diff >= 5)
+        away_up = valid & (diff <= -5)
+        p[:, 0] += np.where(home_up, boost, 0.0)
+        p[:, 2] += np.where(away_up, boost, 0.0)
+        fire(home_up, rule_home)
+        fire(away_up, rule_away)
+        return boost
+
+    # --- HEURISTIC 1: Standings Differential (Overall) ---
+    h_rank, a_rank = h('standings_rank'), a('standings_rank')
+    boost = rank_rule(h_rank, a_rank, 0.02, RULE_RANK_HOME, RULE_RANK_AWAY)
+    ctx.update(h_rank=h_rank, a_rank=a_rank, rank_boost=boost)
+
+    # --- HEURISTIC 2: Standings Differential (Specific: Home Table vs Away Table) ---
+    h_rank_spec, a_rank_spec = h('home_table_rank'), a('away_table_rank')
+    boost = rank_rule(h_rank_spec, a_rank_spec, 0.03, RULE_SPEC_RANK_HOME, RULE_SPEC_RANK_AWAY)
+    ctx.update(h_rank_spec=h_rank_spec, a_rank_spec=a_rank_spec, spec_rank_boost=boost)
+
+    def bump(col, mask, amount, rule):
+        p[:, col] += np.where(mask, amount, 0.0)
+        fire(mask, rule)
+
+    # --- HEURISTIC 3: Form Momentum (Overall) ---
+    f_home = has_std & h('has_form').astype(bool)
+    f_away = has_std & a('has_form').astype(bool)
+    bump(0, f_home & (h('form_W') >= 4), 0.05, RULE_FORM_HOME)
+    bump(0, f_away & (a('form_L') >= 4), 0.05, RULE_FORM_FADE_AWAY)
+
+    # --- HEURISTIC 4: Form Momentum (Specific) ---
+    f_home_spec = has_std & h('has_form_home').astype(bool)
+    f_away_spec = has_std & a('has_form_away').astype(bool)
+    bump(0, f_home_spec & (h('form_home_W') >= 4), 0.06, RULE_SPEC_FORM_HOME)
+    away_fade = f_away_spec & (a('form_away_L') >= 4)
+    bump(0, away_fade, 0.06, RULE_SPEC_FORM_AWAY_FADE)
+    bump(2, f_away_spec & ~away_fade & (a('form_away_W') >= 4), 0.06, RULE_SPEC_FORM_AWAY_BOOST)
+    ctx.update(form_W=h('form_W'), form_L=a('form_L'), form_home_W=h('form_home_W'),
+               form_away_L=a('form_away_L'), form_away_W=a('form_away_W'))
+
+    # --- HEURISTIC 6: Form Trend Analysis (Last 5 vs Last 10) ---
+    def win_rate(side, field):
+        w, d, l = side(f'{field}_W'), side(f'{field}_D'), side(f'{field}_L')
+        total = w + d + l
+        return np.where(total > 0, w / np.where(total > 0, total, 1.0), 0.0)
+
+    for side, col, prefix, rules in ((h, 0, 'home', (RULE_HOME_HEATING, RULE_HOME_COOLING, RULE_HOME_CONSISTENT)),
+                                     (a, 2, 'away', (RULE_AWAY_HEATING, RULE_AWAY_COOLING, RULE_AWAY_CONSISTENT))):
+        valid = has_std & side('has_form').astype(bool) & side('has_form_10').astype(bool)
+        wr_5, wr_10 = win_rate(side, 'form'), win_rate(side, 'form_10')
+        heating = valid & (wr_5 >= (wr_10 + 0.3))
+        cooling = valid & ~heating & (wr_5 <= (wr_10 - 0.3))
+        consistent = valid & ~heating & ~cooling & (wr_5 >= 0.70) & (wr_10 >= 0.60)
+        p[:, col] += np.where(heating, 0.04, 0.0)
+        p[:, col] -= np.where(cooling, 0.03, 0.0)
+        p[:, col] += np.where(consistent, 0.03, 0.0)
+        fire(heating, rules[0])
+        fire(cooling, rules[1])
+        fire(consistent, rules[2])
+        ctx[f'{prefix}_wr_5'], ctx[f'{prefix}_wr_10'] = wr_5, wr_10
+
+    # Re-normalize 1x2
+    total = p[:, 0] + p[:, 1] + p[:, 2]
+    p = np.where(has_std[:, None], p / total[:, None], p)
+
+    # --- HEURISTIC 5: High Scoring Teams (O/U) ---
+    h_mp, a_mp, h_gf, a_gf = h('mp'), a('mp'), h('gf'), a('gf')
+    goals_ok = has_std & ~np.isnan(h_mp) & ~np.isnan(a_mp) & ~np.isnan(h_gf) & ~np.isnan(a_gf)
+    avg_gf = h_gf / np.where(goals_ok, h_mp, 1.0) + a_gf / np.where(goals_ok, a_mp, 1.0)
+    goal_fest = goals_ok & (avg_gf > 3.5)
+    ou[:, 1] += np.where(goal_fest, 0.05, 0.0)
+    ou = np.where(goals_ok[:, None], ou / (ou[:, 0] + ou[:, 1])[:, None], ou)
+    fire(goal_fest, RULE_GOAL_FEST)
+    ctx['avg_gf'] = avg_gf
+
+    # --- HEURISTIC 7: Value Bet Identification (Logging Only) ---
+    # Value = Model Prob - Implied Prob (1/Odd); flagged above 5%
+    with np.errstate(divide='ignore', invalid='ignore'):
+        implied_1x2 = np.where(odds_1x2 > 1.0, 1.0 / odds_1x2, 0.0)
+        implied_ou = np.where(odds_ou > 1.0, 1.0 / odds_ou, 0.0)
+    value_1x2 = p - implied_1x2
+    value_ou = ou[:, ::-1] - implied_ou # [Over, Under]
+    ok_1x2 = has_std & ~np.isnan(odds_1x2).any(axis=1)
+    ok_ou = has_std & ~np.isnan(odds_ou).any(axis=1)
+    for k, rule in enumerate((RULE_VALUE_1, RULE_VALUE_X, RULE_VALUE_2)):
+        fire(ok_1x2 & (value_1x2[:, k] > 0.05), rule)
+    for k, rule in enumerate((RULE_VALUE_O, RULE_VALUE_U)):
+        fire(ok_ou & (value_ou[:, k] > 0.05), rule)
+    ctx.update(value_1x2=value_1x2, value_ou=value_ou)
+
+    return AdjustmentBatch(p, ou, flags, ctx)
+
+
+class AdjustmentBatch:
+    """
+    Result of HeuristicAdjuster.adjust_batch: adjusted (N, 3) 1X2 and (N, 2) O/U
+    arrays plus a per-row bitmask of the rules that fired. The "Adj Logs"
+    strings are only formatted when logs(i) is called.
+    """
+
+    def __init__(self, probs_1x2, probs_ou, flags, context):
+        self.probs_1x2 = probs_1x2
+        self.probs_ou = probs_ou
+        self.flags = flags
+        self._context = context
+
+    def __len__(self):
+        return len(self.flags)
 
-        return adj_1x2, adj_ou, logs
+    def logs(self, i):
+        flags = int(self.flags[i])
+        if not flags:
+            return []
+        row = {k: v[i] for k, v in self._context.items()}
+        return [fmt(row) for rule, fmt in RULE_LOGS if flags & rule]
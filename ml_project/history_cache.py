@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Bump when the CSV normalization in DataLoader changes so old caches are ignored
+CACHE_VERSION = 1
+
+# String columns stored as categoricals (teams share one category set)
+TEAM_COLUMNS = ['home_team', 'away_team']
+CATEGORICAL_COLUMNS = ['league']
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed, compact layout for the concatenated MatchHistory frame:
+    team/league names become categoricals and integer columns are downcast
+    (int16 where the range allows). Float columns (odds, goals with gaps) are
+    left untouched so feature values do not change.
+    """
+    def is_text(values):
+        return all(isinstance(v, str) for v in values)
+
+    if all(c in df.columns for c in TEAM_COLUMNS):
+        teams = pd.unique(pd.concat([df[c] for c in TEAM_COLUMNS]).dropna())
+        if is_text(teams):
+            categories = sorted(teams)
+            for c in TEAM_COLUMNS:
+                df[c] = pd.Categorical(df[c], categories=categories)
+
+    for c in CATEGORICAL_COLUMNS:
+        if c in df.columns and df[c].dtype == object:
+            values = df[c].dropna().unique()
+            if is_text(values):
+                df[c] = df[c].astype('category')
+
+    for c in df.select_dtypes(include='integer').columns:
+        col = df[c]
+        if col.empty:
+            continue
+        if col.min() >= -32768 and col.max() <= 32767:
+            df[c] = col.astype('int16')
+        elif col.min() >= -2**31 and col.max() < 2**31:
+            df[c] = col.astype('int32')
+
+    return df
+
+
+class MatchHistoryCache:
+    """
+    Columnar (Parquet) cache for DataLoader.
+
+    Every source CSV is normalized once and stored as its own Parquet part,
+    keyed by (size, mtime). The concatenated, typed frame is stored as well,
+    keyed by a fingerprint of all source files. A warm load reads a single
+    Parquet file; when some CSVs change only those are re-parsed.
+    """
+
+    MANIFEST = "manifest.json"
+    COMBINED = "match_history.parquet"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.parts_dir = os.path.join(cache_dir, "parts")
+
+    @staticmethod
+    def _stat(path: str) -> dict:
+        st = os.stat(path)
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    @staticmethod
+    def fingerprint(entries: dict) -> str:
+        payload = json.dumps({'version': CACHE_VERSION, 'files': entries}, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _read_manifest(self) -> dict:
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == CACHE_VERSION:
+                return manifest
+        except (OSError, json.JSONDecodeError):
+            pass
+        return {'version': CACHE_VERSION, 'files': {}, 'combined': None}
+
+    def _write_manifest(self, manifest: dict):
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _write_parquet(self, df: pd.DataFrame, path: str) -> bool:
+        tmp_path = path + ".tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"Warning: Could not cache {os.path.basename(path)}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load(self, files: List[str], reader: Callable[[str], Optional[pd.DataFrame]]) -> pd.DataFrame:
+        """
+        Returns the normalized, concatenated frame for `files`.
+        `reader` parses one CSV (DataLoader._read_csv) and is only called for
+        files that are new or changed since the last load.
+        """
+        if not PARQUET_AVAILABLE:
+            print("Warning: pyarrow not installed, MatchHistory cache disabled.")
+            return self._concat([reader(f) for f in files])
+
+        os.makedirs(self.parts_dir, exist_ok=True)
+        entries = {os.path.basename(f): self._stat(f) for f in files}
+        fingerprint = self.fingerprint(entries)
+        manifest = self._read_manifest()
+        combined_path = os.path.join(self.cache_dir, self.COMBINED)
+
+        # 1. Warm path: nothing changed since the last load
+        if manifest.get('combined') == fingerprint and os.path.exists(combined_path):
+            try:
+                df = pd.read_parquet(combined_path)
+                print(f"Loaded {len(df)} matches from cache ({self.cache_dir}).")
+                return df
+            except Exception as e:
+                print(f"Warning: Cache file unreadable, rebuilding: {e}")
+
+        # 2. Incremental path: reuse unchanged parts, re-parse the rest
+        frames = []
+        files_manifest = {}
+        reparsed = 0
+        for filename in files:
+            name = os.path.basename(filename)
+            stat = entries[name]
+            part_name = os.path.splitext(name)[0] + ".parquet"
+            part_path = os.path.join(self.parts_dir, part_name)
+            cached = manifest['files'].get(name)
+
+            df = None
+            if cached and cached['size'] == stat['size'] and cached['mtime_ns'] == stat['mtime_ns']:
+                if cached.get('part') is None:
+                    # Unchanged file that was rejected by the reader last time
+                    files_manifest[name] = cached
+                    continue
+                try:
+                    df = pd.read_parquet(part_path)
+                    files_manifest[name] = cached
+                except Exception:
+                    df = None
+
+            if df is None:
+                reparsed += 1
+                df = reader(filename)
+                entry = dict(stat, part=None)
+                if df is not None:
+                    if self._write_parquet(df, part_path):
+                        entry['part'] = part_name
+                        files_manifest[name] = entry
+                else:
+                    files_manifest[name] = entry
+
+            if df is not None:
+                frames.append(df)
+
+        print(f"MatchHistory cache: re-parsed {reparsed}/{len(files)} files.")
+        combined = self._concat(frames)
+
+        manifest = {'version': CACHE_VERSION, 'files': files_manifest, 'combined': None}
+        if self._write_parquet(combined, combined_path):
+            manifest['combined'] = fingerprint
+        self._write_manifest(manifest)
+
+        # Drop parts of CSVs that no longer exist
+        live_parts = {e['part'] for e in files_manifest.values() if e.get('part')}
+        for part in os.listdir(self.parts_dir):
+            if part.endswith(".parquet") and part not in live_parts:
+                os.remove(os.path.join(self.parts_dir, part))
+
+        return combined
+
+    @staticmethod
+    def _concat(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            raise ValueError("No valid historical data found.")
+        combined_df = pd.concat(frames, ignore_index=True)
+        combined_df = combined_df.sort_values('date', kind='stable').reset_index(drop=True)
+        return compact_frame(combined_df)
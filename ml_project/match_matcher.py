@@ -0,0 +1,101 @@
+import datetime
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from scipy.optimize import linear_sum_assignment
+
+# Score given to pairs that must never be assigned (below threshold, different day)
+INVALID = -1e6
+
+
+def normalize(name):
+    return str(name).lower().strip() if name else ""
+
+
+def match_day(value):
+    """'YYYY-MM-DD' for ISO ('2025-12-12 21:45') or Flashscore ('12.12.2025 21:45') dates, else None."""
+    if not value or not isinstance(value, str):
+        return None
+    day = value.strip().split(' ')[0]
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"):
+        try:
+            return datetime.datetime.strptime(day, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _match_id(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value.lower() != 'nan' else None
+
+
+def match_records(left, right, min_score=80, away_min_score=None, scorer=fuzz.ratio, use_dates=True):
+    """
+    One-to-one matching of two fixture lists (predictions, bets, results,
+    live matches...). Records are dicts with optional keys
+    'home', 'away', 'date' and 'match_id'.
+
+    1. Records with the same match_id are joined first (exact).
+    2. The rest are scored in one vectorized pass: a home-name score matrix
+       (rapidfuzz cdist on normalized names), plus the away-name score where
+       both sides have one. Pairs below `min_score` (home) or
+       `away_min_score` (away, if given), or on different days, are invalid.
+    3. The optimal assignment (max total score) is solved with
+       scipy's linear_sum_assignment and invalid pairs are dropped.
+
+    Returns {left_index: (right_index, home_score)}; match_id joins score 100.
+    """
+    matches = {}
+    used_right = set()
+
+    # 1. Exact match_id join
+    right_ids = {}
+    for j, rec in enumerate(right):
+        mid = _match_id(rec.get('match_id'))
+        if mid and mid not in right_ids:
+            right_ids[mid] = j
+    for i, rec in enumerate(left):
+        j = right_ids.get(_match_id(rec.get('match_id')))
+        if j is not None and j not in used_right:
+            matches[i] = (j, 100.0)
+            used_right.add(j)
+
+    rest_left = [i for i in range(len(left)) if i not in matches]
+    rest_right = [j for j in range(len(right)) if j not in used_right]
+    if not rest_left or not rest_right:
+        return matches
+
+    # 2. Score matrices
+    def names(records, idx, key):
+        return [normalize(records[k].get(key)) for k in idx]
+
+    left_home, right_home = names(left, rest_left, 'home'), names(right, rest_right, 'home')
+    home = process.cdist(left_home, right_home, scorer=scorer, workers=-1).astype(float)
+    invalid = home < min_score
+    invalid |= np.array([not h for h in left_home])[:, None] | np.array([not h for h in right_home])[None, :]
+    total = home.copy()
+
+    left_away, right_away = names(left, rest_left, 'away'), names(right, rest_right, 'away')
+    has_away = np.array([bool(a) for a in left_away])[:, None] & np.array([bool(a) for a in right_away])[None, :]
+    if has_away.any():
+        away = process.cdist(left_away, right_away, scorer=scorer, workers=-1).astype(float)
+        total += np.where(has_away, away, 0.0)
+        if away_min_score is not None:
+            invalid |= has_away & (away < away_min_score)
+
+    if use_dates:
+        left_days = np.array([match_day(left[k].get('date')) for k in rest_left], dtype=object)
+        right_days = np.array([match_day(right[k].get('date')) for k in rest_right], dtype=object)
+        known = (left_days != None)[:, None] & (right_days != None)[None, :]  # noqa: E711
+        invalid |= known & (left_days[:, None] != right_days[None, :])
+
+    # 3. Assignment
+    total[invalid] = INVALID
+    rows, cols = linear_sum_assignment(total, maximize=True)
+    for r, c in zip(rows, cols):
+        if not invalid[r, c]:
+            matches[rest_left[r]] = (rest_right[c], float(home[r, c]))
+    return matches
@@ -5,15 +5,138 @@ import xgboost as xgb
 import json
 import os
 import datetime
+import argparse
 from feature_engineering import FeatureEngineer
 from entity_resolver import EntityResolver
 from data_loader import DataLoader
+from team_state_store import TeamStateStore, MISS
 import glob
 
 from heuristic_adjuster import HeuristicAdjuster
 
+# --- LEAGUE FILTERING ---
+SUPPORTED_COUNTRIES = {
+    'ENGLAND', 'SPAIN', 'FRANCE', 'GERMANY', 'ITALY', 'NETHERLANDS', 'PORTUGAL', 'SCOTLAND', 
+    'TURKEY', 'USA', 'POLAND', 'RUSSIA', 'NORWAY', 'SWEDEN', 'FINLAND', 'ROMANIA', 'GREECE', 
+    'IRELAND', 'SWITZERLAND', 'JAPAN', 'MEXICO', 'BELGIUM', 'AUSTRIA', 'DENMARK', 'CZECH REPUBLIC', 'CROATIA',
+    'EUROPE', 'WORLD'
+}
+
+def calculate_kelly(odd, prob):
+    """Returns (EV, Quarter-Kelly stake fraction) for a decimal odd and win probability."""
+    if odd <= 1.0 or prob <= 0: return 0.0, 0.0
+    b = odd - 1.0
+    q = 1.0 - prob
+    # Full Kelly
+    f = (b * prob - q) / b
+    f = max(f, 0.0) # No negative bets
+    # Quarter Kelly
+    return (prob * odd) - 1.0, f * 0.25
+
+# Draw is only picked when it beats the best of Home/Away by this margin (User suggested 0.03-0.06)
+DRAW_MARGIN = 0.05
+
+def combine_probabilities(probs_1x2_raw, prob_draw_binary, pred_lam):
+    """
+    2-stage combination of the model outputs.
+    probs_1x2_raw: (N, 3) 1X2 model; prob_draw_binary: (N,) draw model P(Draw); pred_lam: (N,) expected goals.
+    Returns (probs_1x2 (N, 3) [H, D, A], probs_ou (N, 2) [Under, Over]).
+    """
+    # P(Draw) = Average(P(Draw_Binary), P(Draw_Raw))
+    # P(Not Draw) = 1 - P(Draw)
+    # P(Home) = P(Not Draw) * (P(Home_Raw) / (P(Home_Raw) + P(Away_Raw)))
+    
+    prob_draw_final = (prob_draw_binary + probs_1x2_raw[:, 1]) / 2.0
+    prob_not_draw = 1.0 - prob_draw_final
+    
+    sum_ha_raw = probs_1x2_raw[:, 0] + probs_1x2_raw[:, 2]
+    sum_ha_raw = np.where(sum_ha_raw < 0.001, 1.0, sum_ha_raw) # Avoid div/0
+    
+    prob_home_final = prob_not_draw * (probs_1x2_raw[:, 0] / sum_ha_raw)
+    prob_away_final = prob_not_draw * (probs_1x2_raw[:, 2] / sum_ha_raw)
+    
+    probs_1x2 = np.column_stack([prob_home_final, prob_draw_final, prob_away_final])
+    
+    # Convert lambda to Prob(> 2.5) using Poisson
+    # P(X<=2) = e^-lam * (1 + lam + lam^2/2)
+    prob_le_2 = np.exp(-pred_lam) * (1 + pred_lam + (pred_lam**2 / 2))
+    prob_over = 1.0 - prob_le_2
+    prob_under = 1.0 - prob_over
+    
+    # Construct probs array [Under, Over] to match old interface
+    probs_ou = np.column_stack([prob_under, prob_over])
+    
+    return probs_1x2, probs_ou
+
+# Column order of the predictions CSV
+PREDICTION_COLUMNS = ['Date', 'League', 'Home Team', 'Away Team', 'Home ELO', 'Away ELO', 'Prediction 1X2', 'Prediction 1X2 Odd', 'Conf 1X2', 'EV 1X2', 'Kelly 1X2', 'Prediction O/U', 'Prediction O/U Odd', 'Conf O/U', 'EV O/U', 'Kelly O/U', 'Home Win %', 'Draw %', 'Away Win %', 'Over %', 'Under %', 'Adj Logs', 'match_id']
+
+def tail_jsonl(path, poll=0.5, idle_timeout=600, done_marker=None):
+    """
+    Yields lists of records as they are appended to a JSON Lines file (the
+    scraper's -a stream_output). Stops once `done_marker` (default
+    '<path>.done', written when the crawl closes) exists and every line has
+    been read, or after `idle_timeout` seconds without new lines. The idle
+    timer only starts with the first line, so a slow crawl start (browser
+    launch, league pages) never ends the stream before any match arrives.
+    """
+    done_marker = done_marker or f"{path}.done"
+    offset = 0
+    pending = b''
+    last_data = None
+    while True:
+        # Check before reading so lines written just before the marker are still drained
+        finished = os.path.exists(done_marker)
+        records = []
+        if os.path.exists(path):
+            if os.path.getsize(path) < offset:
+                # File was rewritten: start over (already predicted matches are skipped downstream)
+                offset, pending = 0, b''
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                chunk = f.read()
+                offset = f.tell()
+            *lines, pending = (pending + chunk).split(b'\n')
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"[stream] Skipping malformed line: {line[:80]!r}")
+        if records:
+            last_data = time.time()
+            yield records
+        elif finished:
+            return
+        elif last_data is not None and time.time() - last_data > idle_timeout:
+            print(f"[stream] No new matches for {idle_timeout}s and no end marker; stopping.")
+            return
+        else:
+            time.sleep(poll)
+
+def pick_1x2(p_h, p_d, p_a, margin=DRAW_MARGIN):
+    """Pick Draw only if P(D) > max(P(H), P(A)) + margin. Returns (label, confidence)."""
+    if p_d > (max(p_h, p_a) + margin):
+        return 'X', p_d
+    # If Draw is not confident enough, pick the max of Home or Away
+    if p_h >= p_a:
+        return '1', p_h
+    return '2', p_a
+
 class MatchPredictor:
     def __init__(self, history_dir="data_sets/MatchHistory", scraper_output="output/output.json"):
+        self.history_dir = history_dir
+        self.load_models()
+        
+        self.output_file = scraper_output
+        self.fe = FeatureEngineer()
+        self.resolver = EntityResolver()
+        
+        self.load_history()
+        self.adjuster = HeuristicAdjuster()
+
+    def load_models(self):
         # Load Models
         self.model_1x2 = xgb.XGBClassifier()
         self.model_1x2.load_model("models/xgb_model_1x2.json")
@@ -40,17 +163,18 @@ class MatchPredictor:
                 self.features_draw = json.load(f)
         else:
              self.features_draw = []
-            
-        self.output_file = scraper_output
-        self.fe = FeatureEngineer()
-        self.resolver = EntityResolver()
-        
+
+    def load_history(self):
         print("Loading historical data for feature calculation...")
-        self.loader = DataLoader(history_dir)
+        self.loader = DataLoader(self.history_dir)
         self.history_df = self.loader.load_historical_data()
-        self.history_df = self.history_df.sort_values('date')
+        self.history_df = self.history_df.sort_values('date', kind='stable')
         
-        self.adjuster = HeuristicAdjuster()
+        # Per-team ring buffers: O(1) form lookups instead of scanning history_df per fixture
+        self.team_state = TeamStateStore.load()
+        applied = self.team_state.sync(self.history_df)
+        if applied:
+            print(f"Team state store updated with {applied} matches.")
 
     # ... (existing methods) ...
 
@@ -62,6 +186,11 @@ class MatchPredictor:
         if not team_name:
             return None
             
+        stats = self.team_state.get_team_stats(team_name, date_before)
+        if stats is not MISS:
+            return stats
+            
+        # Fallback: the ring buffers do not reach back to date_before, scan the history.
         # Filter games played by this team BEFORE the match date
         # Note: We use date_before (string YYYY-MM-DD or datetime)
         mask = (self.history_df['date'] < date_before) & \
@@ -132,6 +261,10 @@ class MatchPredictor:
         """
         if not team_name: return None
         
+        stats = self.team_state.get_venue_specific_stats(team_name, is_home_focus, date_before)
+        if stats is not MISS:
+            return stats
+        
         if is_home_focus:
             mask = (self.history_df['date'] < date_before) & (self.history_df['home_team'] == team_name)
         else:
@@ -178,24 +311,19 @@ class MatchPredictor:
 
 
 
-    def predict(self):
-        start_time = time.time()
-        if not os.path.exists(self.output_file):
-            print("No output.json found.")
-            return
+    def build_feature_rows(self, upcoming_matches, match_dates):
+        """
+        Stage 1: resolves names, looks up Elo/form and parses odds for every fixture.
+        Returns (input_rows, fixtures): the model input dicts and the per-fixture
+        metadata needed by the heuristic/Kelly stage. Unsupported or odds-less fixtures are skipped.
+        """
+        input_rows = []
+        fixtures = []
 
-        with open(self.output_file, 'r') as f:
-            try:
-                upcoming_matches = json.load(f)
-            except json.JSONDecodeError:
-                print(f"[-] Error: The file {os.path.basename(self.output_file)} is corrupt or empty.")
-                print("[!] Please check 'Force Scrape' in the Dashboard and run Prediction again.")
-                return
-            
-        predictions = []
-        match_dates = set()
-        
-        print(f"Predicting {len(upcoming_matches)} matches...")
+        # Resolve every supported fixture name in one batch (fills the resolver cache)
+        supported = [m for m in upcoming_matches
+                     if m.get('league', 'Unknown').split(':')[0].upper().strip() in SUPPORTED_COUNTRIES]
+        self.resolver.resolve_many([m.get('home_team') for m in supported] + [m.get('away_team') for m in supported])
         
         for match in upcoming_matches:
             scraper_home = match.get('home_team')
@@ -203,12 +331,6 @@ class MatchPredictor:
             league_name = match.get('league', 'Unknown')
             
             # --- LEAGUE FILTERING ---
-            SUPPORTED_COUNTRIES = {
-                'ENGLAND', 'SPAIN', 'FRANCE', 'GERMANY', 'ITALY', 'NETHERLANDS', 'PORTUGAL', 'SCOTLAND', 
-                'TURKEY', 'USA', 'POLAND', 'RUSSIA', 'NORWAY', 'SWEDEN', 'FINLAND', 'ROMANIA', 'GREECE', 
-                'IRELAND', 'SWITZERLAND', 'JAPAN', 'MEXICO', 'BELGIUM', 'AUSTRIA', 'DENMARK', 'CZECH REPUBLIC', 'CROATIA',
-                'EUROPE', 'WORLD'
-            }
             country_prefix = league_name.split(':')[0].upper().strip()
             if country_prefix not in SUPPORTED_COUNTRIES:
                 continue
@@ -239,6 +361,7 @@ class MatchPredictor:
                      pass
 
             # Calculate Stats from DB
+            h_stats = a_stats = h_spec = a_spec = None
             try:
                 h_stats = self.get_team_stats(canon_home, match_date_obj)
                 a_stats = self.get_team_stats(canon_away, match_date_obj)
@@ -304,75 +427,14 @@ class MatchPredictor:
                 'elo_diff': elo_diff,
                 'abs_elo_diff': abs_elo_diff,
                 'abs_ppg_diff': abs_ppg_diff,
-                'abs_form_pts_diff': abs_form_pts_diff
+                'abs_form_pts_diff': abs_form_pts_diff,
+                # O/U specific features (only used by the O/U model)
+                'H_form_ou': h_stats['form_ou'],
+                'A_form_ou': a_stats['form_ou'],
             }
+            input_rows.append(input_row)
             
-            # Generate DF for prediction
-            input_df = pd.DataFrame([input_row])
-            input_df['league_cat'] = input_df['league_cat'].astype('category')
-            
-            # --- 2-STAGE PREDICTION ---
-            
-            # 1. Standard 1X2 Probabilities (Conditional H/A source)
-            for c in self.features_1x2:
-                if c not in input_df.columns: input_df[c] = 0
-            
-            probs_1x2_raw = self.model_1x2.predict_proba(input_df[self.features_1x2])[0]
-            # [P(H), P(D), P(A)]
-            
-            # 2. Draw Probability from Stage A
-            if self.model_draw:
-                for c in self.features_draw:
-                    if c not in input_df.columns: input_df[c] = 0
-                prob_draw_binary = self.model_draw.predict_proba(input_df[self.features_draw])[0][1] # Class 1 = Draw
-            else:
-                prob_draw_binary = probs_1x2_raw[1] # Fallback
-            
-            # 3. Combine
-            # P(Draw) = Average(P(Draw_Binary), P(Draw_Raw))
-            # P(Not Draw) = 1 - P(Draw)
-            # P(Home) = P(Not Draw) * (P(Home_Raw) / (P(Home_Raw) + P(Away_Raw)))
-            
-            prob_draw_final = (prob_draw_binary + probs_1x2_raw[1]) / 2.0
-            prob_not_draw = 1.0 - prob_draw_final
-            
-            sum_ha_raw = probs_1x2_raw[0] + probs_1x2_raw[2]
-            if sum_ha_raw < 0.001: sum_ha_raw = 1.0 # Avoid div/0
-            
-            prob_home_final = prob_not_draw * (probs_1x2_raw[0] / sum_ha_raw)
-            prob_away_final = prob_not_draw * (probs_1x2_raw[2] / sum_ha_raw)
-            
-            probs_1x2 = np.array([prob_home_final, prob_draw_final, prob_away_final])
-            
-            # Decision
-            pred_1x2_idx = probs_1x2.argmax()
-            pred_1x2_label = ['Home', 'Draw', 'Away'][pred_1x2_idx]
-            conf_1x2 = probs_1x2[pred_1x2_idx]
-            
-            # O/U
-            # Add OU specific features
-            input_row['H_form_ou'] = h_stats['form_ou']
-            input_row['A_form_ou'] = a_stats['form_ou']
-            input_df_ou = pd.DataFrame([input_row])
-            input_df_ou['league_cat'] = input_df_ou['league_cat'].astype('category')
-            for c in self.features_ou:
-                if c not in input_df_ou.columns: input_df_ou[c] = 0
-                
-            # --- POISSON PREDICTION ---
-            # Output is expected goals (lambda)
-            pred_lam = self.model_ou.predict(input_df_ou[self.features_ou])[0]
-            
-            # Convert lambda to Prob(> 2.5) using Poisson
-            # P(X<=2) = e^-lam * (1 + lam + lam^2/2)
-
-            prob_le_2 = np.exp(-pred_lam) * (1 + pred_lam + (pred_lam**2 / 2))
-            prob_over = 1.0 - prob_le_2
-            prob_under = 1.0 - prob_over
-            
-            # Construct probs array [Under, Over] to match old interface
-            probs_ou = np.array([prob_under, prob_over])
-            
-            # Extract O/U Odds (Moved Up)
+            # Extract O/U Odds
             try:
                 ov_str = match.get('over_2_5', '0.0')
                 un_str = match.get('under_2_5', '0.0')
@@ -381,99 +443,168 @@ class MatchPredictor:
             except:
                 ov_val, un_val = 0.0, 0.0
             
-            # --- HEURISTIC ADJUSTMENT ---
-            match_info = {
-                'League': league_name,
-                'Home Team': scraper_home,
-                'Away Team': scraper_away,
-                'Odds': {
-                    '1': b365_h,
-                    'X': b365_d,
-                    '2': b365_a,
-                    'O': ov_val,
-                    'U': un_val
-                }
-            }
-            adj_1x2, adj_ou, adj_logs = self.adjuster.adjust_probabilities(match_info, probs_1x2, probs_ou)
-            
-            # Select Final Predictions based on ADJUSTED probabilities
-            # 1X2
-            pred_1x2_idx = adj_1x2.index(max(adj_1x2))
-            # Use ADJUSTED probs for final decision
-            # Use ADJUSTED probs for final decision
-            # NEW RULE: Pick Draw only if P(D) > max(P(H), P(A)) + margin
-            p_h, p_d, p_a = adj_1x2
-            margin = 0.05 # Conservative margin (User suggested 0.03-0.06)
+            fixtures.append({
+                'date_str': match_date_str,
+                'league': league_name,
+                'home': scraper_home,
+                'away': scraper_away,
+                'home_elo': home_elo,
+                'away_elo': away_elo,
+                'odds': {'1': b365_h, 'X': b365_d, '2': b365_a, 'O': ov_val, 'U': un_val},
+                'match_id': match.get('match_id', ''),
+            })
             
-            if p_d > (max(p_h, p_a) + margin):
-                pred_1x2_label = 'X'
-                conf_1x2 = p_d
-            else:
-                # If Draw is not confident enough, pick the max of Home or Away
-                if p_h >= p_a:
-                    pred_1x2_label = '1'
-                    conf_1x2 = p_h
-                else:
-                    pred_1x2_label = '2'
-                    conf_1x2 = p_a
+        return input_rows, fixtures
 
+    def score_batch(self, input_rows):
+        """
+        Stage 2: scores all fixtures with one call per model.
+        Returns (probs_1x2, probs_ou) arrays of shape (N, 3) [H, D, A] and (N, 2) [Under, Over].
+        """
+        if not input_rows:
+            return np.empty((0, 3)), np.empty((0, 2))
             
-            # OU
-            pred_ou_idx = adj_ou.index(max(adj_ou))
-            pred_ou_label = "Over 2.5" if pred_ou_idx == 1 else "Under 2.5"
-            conf_ou = adj_ou[pred_ou_idx]
-            
-            
-            # Extract O/U Odds (Determine which one matches prediction)
-            ou_odd = ov_val if pred_ou_label == "Over 2.5" else un_val
-            
-            # Odd 1X2
-            pred_odd = b365_h if pred_1x2_label == '1' else (b365_d if pred_1x2_label == 'X' else b365_a)
-            
-            # --- BETTING STRATEGY (EV & KELLY) ---
-            def calculate_kelly(odd, prob):
-                if odd <= 1.0 or prob <= 0: return 0.0, 0.0
-                b = odd - 1.0
-                q = 1.0 - prob
-                # Full Kelly
-                f = (b * prob - q) / b
-                f = max(f, 0.0) # No negative bets
-                # Quarter Kelly
-                return (prob * odd) - 1.0, f * 0.25
-
-            # 1X2 Strategy
-            ev_1x2, kelly_1x2 = calculate_kelly(pred_odd, conf_1x2)
-            
-            # O/U Strategy
-            ev_ou, kelly_ou = calculate_kelly(ou_odd, conf_ou)
-
-            predictions.append({
-                'Date': match_date_str,
-                'League': league_name,
-                'Home Team': scraper_home,
-                'Away Team': scraper_away,
-                'Home ELO': int(home_elo),
-                'Away ELO': int(away_elo),
-                'Prediction 1X2': pred_1x2_label,
-                'Prediction 1X2 Odd': f"{pred_odd:.2f}",
-                'Conf 1X2': f"{conf_1x2:.2f}",
-                'EV 1X2': f"{ev_1x2:.2f}",
-                'Kelly 1X2': f"{kelly_1x2:.2%}",
-                'Prediction O/U': pred_ou_label,
-                'Prediction O/U Odd': f"{ou_odd:.2f}",
-                'Conf O/U': f"{conf_ou:.2f}",
-                'EV O/U': f"{ev_ou:.2f}",
-                'Kelly O/U': f"{kelly_ou:.2%}",
-                'Home Win %': f"{adj_1x2[0]:.2f}",
-                'Draw %': f"{adj_1x2[1]:.2f}",
-                'Away Win %': f"{adj_1x2[2]:.2f}",
-                'Over %': f"{adj_ou[1]:.2f}",
-                'Under %': f"{adj_ou[0]:.2f}",
-                'Under %': f"{adj_ou[0]:.2f}",
-                'Adj Logs': "; ".join(adj_logs),
-                'match_id': match.get('match_id', '')
-            })
+        input_df = pd.DataFrame(input_rows)
+        input_df['league_cat'] = input_df['league_cat'].astype('category')
+        
+        # 1X2 / Draw models never saw the O/U specific columns (missing features are zero-filled)
+        input_df_1x2 = input_df.drop(columns=['H_form_ou', 'A_form_ou'])
+        for c in set(self.features_1x2 + self.features_draw):
+            if c not in input_df_1x2.columns: input_df_1x2[c] = 0
+        for c in self.features_ou:
+            if c not in input_df.columns: input_df[c] = 0
+        
+        # --- 2-STAGE PREDICTION ---
+        
+        # 1. Standard 1X2 Probabilities (Conditional H/A source)
+        probs_1x2_raw = self.model_1x2.predict_proba(input_df_1x2[self.features_1x2])
+        # [P(H), P(D), P(A)]
+        
+        # 2. Draw Probability from Stage A
+        if self.model_draw:
+            prob_draw_binary = self.model_draw.predict_proba(input_df_1x2[self.features_draw])[:, 1] # Class 1 = Draw
+        else:
+            prob_draw_binary = probs_1x2_raw[:, 1] # Fallback
+        
+        # 3. Combine + Poisson O/U (output of the O/U model is expected goals, lambda)
+        pred_lam = self.model_ou.predict(input_df[self.features_ou])
+        
+        return combine_probabilities(probs_1x2_raw, prob_draw_binary, pred_lam)
+
+    def finalize_prediction(self, fixture, adj_1x2, adj_ou, adj_logs):
+        """
+        Stage 3: draw-margin decision and EV/Kelly sizing for one fixture,
+        from its heuristic-adjusted probabilities (HeuristicAdjuster.adjust_batch).
+        Returns the output row for the predictions CSV.
+        """
+        odds = fixture['odds']
+        b365_h, b365_d, b365_a = odds['1'], odds['X'], odds['2']
+        ov_val, un_val = odds['O'], odds['U']
+        
+        # Use ADJUSTED probs for final decision
+        p_h, p_d, p_a = adj_1x2
+        pred_1x2_label, conf_1x2 = pick_1x2(p_h, p_d, p_a)
+
+        # OU
+        pred_ou_idx = adj_ou.index(max(adj_ou))
+        pred_ou_label = "Over 2.5" if pred_ou_idx == 1 else "Under 2.5"
+        conf_ou = adj_ou[pred_ou_idx]
+        
+        # Extract O/U Odds (Determine which one matches prediction)
+        ou_odd = ov_val if pred_ou_label == "Over 2.5" else un_val
+        
+        # Odd 1X2
+        pred_odd = b365_h if pred_1x2_label == '1' else (b365_d if pred_1x2_label == 'X' else b365_a)
+        
+        # --- BETTING STRATEGY (EV & KELLY) ---
+        # 1X2 Strategy
+        ev_1x2, kelly_1x2 = calculate_kelly(pred_odd, conf_1x2)
+        
+        # O/U Strategy
+        ev_ou, kelly_ou = calculate_kelly(ou_odd, conf_ou)
 
+        return {
+            'Date': fixture['date_str'],
+            'League': fixture['league'],
+            'Home Team': fixture['home'],
+            'Away Team': fixture['away'],
+            'Home ELO': int(fixture['home_elo']),
+            'Away ELO': int(fixture['away_elo']),
+            'Prediction 1X2': pred_1x2_label,
+            'Prediction 1X2 Odd': f"{pred_odd:.2f}",
+            'Conf 1X2': f"{conf_1x2:.2f}",
+            'EV 1X2': f"{ev_1x2:.2f}",
+            'Kelly 1X2': f"{kelly_1x2:.2%}",
+            'Prediction O/U': pred_ou_label,
+            'Prediction O/U Odd': f"{ou_odd:.2f}",
+            'Conf O/U': f"{conf_ou:.2f}",
+            'EV O/U': f"{ev_ou:.2f}",
+            'Kelly O/U': f"{kelly_ou:.2%}",
+            'Home Win %': f"{adj_1x2[0]:.2f}",
+            'Draw %': f"{adj_1x2[1]:.2f}",
+            'Away Win %': f"{adj_1x2[2]:.2f}",
+            'Over %': f"{adj_ou[1]:.2f}",
+            'Under %': f"{adj_ou[0]:.2f}",
+            'Adj Logs': "; ".join(adj_logs),
+            'match_id': fixture['match_id']
+        }
+
+    def predict_fixtures(self, upcoming_matches, match_dates, timings=None):
+        """
+        Stages 1-3 for a list of scraped matches: features, batched inference,
+        heuristics and Kelly. Returns the prediction rows (PREDICTION_COLUMNS);
+        fixture dates are added to `match_dates`, stage times to `timings`.
+        """
+        timings = {} if timings is None else timings
+        
+        # --- STAGE 1: Feature assembly for all fixtures ---
+        t0 = time.time()
+        input_rows, fixtures = self.build_feature_rows(upcoming_matches, match_dates)
+        self.resolver.flush()
+        timings['features'] = time.time() - t0
+        
+        # --- STAGE 2: Batched model inference (one booster call per model) ---
+        t0 = time.time()
+        probs_1x2_all, probs_ou_all = self.score_batch(input_rows)
+        timings['inference'] = time.time() - t0
+        
+        # --- STAGE 3: Batched heuristics, then per-row decision & Kelly ---
+        t0 = time.time()
+        match_info = pd.DataFrame({
+            'League': [f['league'] for f in fixtures],
+            'Home Team': [f['home'] for f in fixtures],
+            'Away Team': [f['away'] for f in fixtures],
+            'Odds': [f['odds'] for f in fixtures],
+        })
+        adjusted = self.adjuster.adjust_batch(probs_1x2_all, probs_ou_all, match_info)
+        predictions = []
+        for i, fixture in enumerate(fixtures):
+            predictions.append(self.finalize_prediction(
+                fixture, adjusted.probs_1x2[i].tolist(), adjusted.probs_ou[i].tolist(), adjusted.logs(i)))
+        timings['adjust'] = time.time() - t0
+        return predictions
+
+    def predict(self):
+        """Predicts self.output_file and saves the CSV; returns its path (None if nothing was saved)."""
+        start_time = time.time()
+        if not os.path.exists(self.output_file):
+            print("No output.json found.")
+            return
+
+        with open(self.output_file, 'r') as f:
+            try:
+                upcoming_matches = json.load(f)
+            except json.JSONDecodeError:
+                print(f"[-] Error: The file {os.path.basename(self.output_file)} is corrupt or empty.")
+                print("[!] Please check 'Force Scrape' in the Dashboard and run Prediction again.")
+                return
+            
+        print(f"Predicting {len(upcoming_matches)} matches...")
+        timings = {'load': time.time() - start_time}
+        
+        match_dates = set()
+        predictions = self.predict_fixtures(upcoming_matches, match_dates, timings)
+        t_save = time.time()
 
         # Save Logic (Same as before)
         if match_dates:
@@ -502,12 +633,12 @@ class MatchPredictor:
         res_df = pd.DataFrame(predictions)
         if not res_df.empty:
              # Reorder cols
-             desired = ['Date', 'League', 'Home Team', 'Away Team', 'Home ELO', 'Away ELO', 'Prediction 1X2', 'Prediction 1X2 Odd', 'Conf 1X2', 'EV 1X2', 'Kelly 1X2', 'Prediction O/U', 'Prediction O/U Odd', 'Conf O/U', 'EV O/U', 'Kelly O/U', 'Home Win %', 'Draw %', 'Away Win %', 'Over %', 'Under %', 'Adj Logs', 'match_id']
-             existing = [c for c in desired if c in res_df.columns]
+             existing = [c for c in PREDICTION_COLUMNS if c in res_df.columns]
              print("\n--- PREDICTIONS ---")
              print(res_df[existing].to_string(index=False))
              res_df[existing].to_csv(filename, index=False)
              print(f"Saved to {filename}")
+             saved = filename
              
              # --- DIAGNOSTICS ---
              print("\n--- DRAW DIAGNOSTICS ---")
@@ -524,10 +655,74 @@ class MatchPredictor:
 
         else:
             print("No valid predictions generated.")
+            saved = None
             
+        timings['save'] = time.time() - t_save
         elapsed = time.time() - start_time
         print(f"[*] Prediction Finished in {elapsed:.2f} seconds.")
+        print(f"[*] Stage Timings: Read {timings['load']:.2f}s | Features {timings['features']:.2f}s | "
+              f"Inference {timings['inference']:.2f}s | Heuristics+Kelly {timings['adjust']:.2f}s | Save {timings['save']:.2f}s")
+        return saved
+
+    def predict_stream(self, batches, output_csv):
+        """
+        Streaming mode: scores each batch of matches as it arrives (e.g. from
+        tail_jsonl, or `iter(queue.get, None)` for an in-process queue) and
+        appends the rows to output_csv. Matches whose match_id is already in
+        the CSV are skipped, so restarts never duplicate rows.
+        """
+        start_time = time.time()
+        done_ids = set()
+        if os.path.exists(output_csv) and os.path.getsize(output_csv) > 0:
+            try:
+                done_ids = set(pd.read_csv(output_csv, dtype=str)['match_id'].dropna())
+                print(f"[stream] {len(done_ids)} matches already predicted in {output_csv}.")
+            except Exception as e:
+                # Appending blind would duplicate rows or mix columns: fail the run instead
+                raise RuntimeError(f"Could not read existing predictions {output_csv}: {e}") from e
+        write_header = not (os.path.exists(output_csv) and os.path.getsize(output_csv) > 0)
+        
+        total = 0
+        for batch in batches:
+            # Matches without odds are not predicted, so they stay eligible if they arrive again
+            new_matches = []
+            batch_ids = set()
+            for match in batch:
+                match_id = str(match.get('match_id') or '')
+                if match_id and (match_id in done_ids or match_id in batch_ids):
+                    continue
+                new_matches.append(match)
+                batch_ids.add(match_id)
+            if not new_matches:
+                continue
+            
+            predictions = self.predict_fixtures(new_matches, set())
+            if not predictions:
+                continue
+            res_df = pd.DataFrame(predictions)
+            res_df[[c for c in PREDICTION_COLUMNS if c in res_df.columns]].to_csv(
+                output_csv, mode='a', header=write_header, index=False)
+            write_header = False
+            done_ids.update(res_df['match_id'].astype(str))
+            total += len(res_df)
+            print(f"[stream] +{len(res_df)} predictions ({total} total) at {time.time() - start_time:.1f}s")
+        
+        print(f"[*] Streaming prediction finished: {total} new predictions saved to {output_csv} "
+              f"in {time.time() - start_time:.2f} seconds.")
 
 if __name__ == "__main__":
-    predictor = MatchPredictor()
-    predictor.predict()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="output/output.json", help="Scraper output (JSON array)")
+    parser.add_argument("--stream", help="Tail this JSON Lines file (scraper -a stream_output) and predict as matches arrive")
+    parser.add_argument("--output", help="Predictions CSV (required with --stream)")
+    parser.add_argument("--idle_timeout", type=int, default=600, help="Stream: stop after this many seconds without new matches (counted from the first match)")
+    args = parser.parse_args()
+    
+    if args.stream:
+        if not args.output:
+            parser.error("--output is required with --stream")
+        predictor = MatchPredictor()
+        predictor.predict_stream(tail_jsonl(args.stream, idle_timeout=args.idle_timeout), args.output)
+    else:
+        predictor = MatchPredictor(scraper_output=args.input)
+        predictor.predict()
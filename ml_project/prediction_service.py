@@ -0,0 +1,358 @@
+"""
+Resident prediction service.
+
+A fresh `predict_matches.py` process pays for the xgboost/pandas imports,
+three booster loads, the MatchHistory load and the HeuristicAdjuster /
+EntityResolver setup on every run. This service does that once and keeps
+the MatchPredictor warm behind a local HTTP endpoint (127.0.0.1 only):
+
+    GET  /status   cold start time, jobs served, last/median job latency
+    POST /predict  {"input": matches.json}                       -> predict()
+                   {"stream": matches.jsonl, "output": preds.csv} -> predict_stream()
+    POST /reload   reload everything now
+
+The warm predictor is used by one job at a time. A stream job only holds it
+while scoring a batch, not while waiting for the crawl, so /reload, the
+watcher and other /predict jobs run in between. Before each job (and every
+WATCH_INTERVAL seconds) the inputs are re-stat'ed and only the changed parts
+are reloaded: models/*.json, the MatchHistory CSVs, the standings JSONs, the
+Elo/mapping files.
+
+Usage:
+    python ml_project/prediction_service.py serve
+    python ml_project/prediction_service.py submit --input output/matches_2025-12-12.json
+    python ml_project/prediction_service.py submit --stream <jsonl> --output <csv>
+    python ml_project/prediction_service.py status
+
+Run from the project root (paths are relative, as for predict_matches.py).
+`submit` falls back to predicting in-process when the service is not running.
+"""
+import time
+
+T_PROCESS_START = time.time()
+
+import argparse
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("PREDICTION_SERVICE_PORT", 8765))
+# Seconds between background checks for changed models/data
+WATCH_INTERVAL = 10
+
+
+def stamp(paths):
+    """(path, size, mtime) of every existing file: changes whenever one is rewritten, added or removed."""
+    entries = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((path, st.st_size, st.st_mtime_ns))
+    return tuple(entries)
+
+
+class Tee(io.TextIOBase):
+    """Writes to the service log and to the job's captured output."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+class ThreadStdout(io.TextIOBase):
+    """
+    sys.stdout replacement that sends each thread's prints to the stream it
+    captured (see `capture`), or to the real stdout. Jobs run concurrently,
+    so a process-wide redirect_stdout would mix their logs.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def current(self):
+        return getattr(self.local, 'stream', None) or self.default
+
+    def write(self, text):
+        return self.current().write(text)
+
+    def flush(self):
+        self.current().flush()
+
+    def capture(self, stream):
+        """Context manager: this thread's prints go to `stream`."""
+        outer = self
+
+        class _Capture:
+            def __enter__(self):
+                self.previous = getattr(outer.local, 'stream', None)
+                outer.local.stream = stream
+
+            def __exit__(self, *exc):
+                outer.local.stream = self.previous
+
+        return _Capture()
+
+
+class PredictionService:
+    def __init__(self, history_dir="data_sets/MatchHistory"):
+        from predict_matches import MatchPredictor
+
+        if not isinstance(sys.stdout, ThreadStdout):
+            sys.stdout = ThreadStdout(sys.stdout)
+        self.history_dir = history_dir
+        self.lock = threading.Lock()
+        self.running = []
+        self.predictor = MatchPredictor(history_dir=history_dir)
+        self.stamps = {name: stamp(paths()) for name, (paths, _) in self.resources().items()}
+        self.cold_start = time.time() - T_PROCESS_START
+        self.started_at = time.time()
+        self.latencies = []
+        self.reloads = {}
+        print(f"[service] Warm after {self.cold_start:.2f}s cold start.")
+
+    def resources(self):
+        """name -> (files to watch, reload function)."""
+        resolver = self.predictor.resolver
+        return {
+            'models': (lambda: glob.glob("models/*.json"), self.predictor.load_models),
+            'history': (lambda: glob.glob(os.path.join(self.history_dir, "*.csv")), self.predictor.load_history),
+            'standings': (lambda: glob.glob(os.path.join(self.predictor.adjuster.data_dir, "*.json")), self._reload_adjuster),
+            'entities': (lambda: [resolver.elo_file, resolver.mapping_file], self._reload_resolver),
+        }
+
+    def _reload_adjuster(self):
+        from heuristic_adjuster import HeuristicAdjuster
+        self.predictor.adjuster = HeuristicAdjuster()
+
+    def _reload_resolver(self):
+        self.predictor.resolver.flush()
+        self.predictor.resolver.load_data()
+
+    def refresh(self, force=False):
+        """Reloads the parts whose files changed (all with force). Call with the lock held."""
+        reloaded = []
+        for name, (paths, reload) in self.resources().items():
+            current = stamp(paths())
+            if force or current != self.stamps[name]:
+                t0 = time.time()
+                reload()
+                self.stamps[name] = stamp(paths())
+                self.reloads[name] = self.reloads.get(name, 0) + 1
+                reloaded.append(name)
+                print(f"[service] Reloaded {name} in {time.time() - t0:.2f}s.")
+        return reloaded
+
+    def watch(self):
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            with self.lock:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[service] Reload failed: {e}")
+
+    def locked_batches(self, batches):
+        """Holds the lock while predict_stream scores each batch, releases it while waiting for the next."""
+        for batch in batches:
+            with self.lock:
+                self.refresh()
+                yield batch
+
+    def run_job(self, job):
+        """Runs one prediction job; returns the response payload."""
+        from predict_matches import tail_jsonl
+
+        name = job.get('stream') or job.get('input')
+        t0 = time.time()
+        captured = io.StringIO()
+        self.running.append(name)
+        try:
+            with sys.stdout.capture(Tee(sys.stdout.default, captured)):
+                if job.get('stream'):
+                    with self.lock:
+                        reloaded = self.refresh()
+                    batches = self.locked_batches(
+                        tail_jsonl(job['stream'], idle_timeout=job.get('idle_timeout', 600)))
+                    try:
+                        self.predictor.predict_stream(batches, job['output'])
+                    finally:
+                        # Releases the lock if predict_stream failed mid-batch
+                        batches.close()
+                    output = job['output']
+                else:
+                    with self.lock:
+                        reloaded = self.refresh()
+                        self.predictor.output_file = job['input']
+                        output = self.predictor.predict()
+            with self.lock:
+                # Our own mapping writes are not a reason to reload next time
+                self.stamps['entities'] = stamp(self.resources()['entities'][0]())
+        finally:
+            self.running.remove(name)
+        latency = time.time() - t0
+        self.latencies.append(latency)
+        print(f"[service] Job {len(self.latencies)} done in {latency:.2f}s "
+              f"(cold start {self.cold_start:.2f}s{', reloaded ' + ', '.join(reloaded) if reloaded else ''}).")
+        return {'output': output, 'latency': latency, 'cold_start': self.cold_start,
+                'reloaded': reloaded, 'log': captured.getvalue()}
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started_at,
+            'cold_start': self.cold_start,
+            'jobs': len(self.latencies),
+            'last_latency': self.latencies[-1] if self.latencies else None,
+            'median_latency': statistics.median(self.latencies) if self.latencies else None,
+            'reloads': self.reloads,
+            'busy': self.lock.locked(),
+            'running': list(self.running),
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/status':
+            self._reply(200, self.service.status())
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            job = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/predict':
+                if not job.get('input') and not (job.get('stream') and job.get('output')):
+                    self._reply(400, {'error': "need 'input', or 'stream' and 'output'"})
+                    return
+                self._reply(200, self.service.run_job(job))
+            elif self.path == '/reload':
+                with self.service.lock:
+                    reloaded = self.service.refresh(force=True)
+                self._reply(200, {'reloaded': reloaded})
+            else:
+                self._reply(404, {'error': 'not found'})
+        except Exception as e:
+            print(f"[service] Job failed: {e}")
+            self._reply(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=PORT):
+    Handler.service = PredictionService()
+    threading.Thread(target=Handler.service.watch, daemon=True).start()
+    server = ThreadingHTTPServer((HOST, port), Handler)
+    print(f"[service] Listening on http://{HOST}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        Handler.service.predictor.resolver.flush()
+
+
+def request(path, payload=None, port=PORT, timeout=None):
+    """Calls the service; raises urllib.error.URLError if it is not running."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(f"http://{HOST}:{port}{path}", data=data,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.load(resp)
+    except urllib.error.HTTPError as e:
+        return json.load(e)
+
+
+def predict_in_process(job):
+    """Fallback when no service is running: same job in this (cold) process."""
+    from predict_matches import MatchPredictor, tail_jsonl
+
+    predictor = MatchPredictor(scraper_output=job.get('input') or "output/output.json")
+    print(f"[*] Cold start: {time.time() - T_PROCESS_START:.2f}s")
+    if job.get('stream'):
+        predictor.predict_stream(tail_jsonl(job['stream'], idle_timeout=job.get('idle_timeout', 600)), job['output'])
+    else:
+        predictor.predict()
+
+
+def submit(job, port=PORT, fallback=True):
+    """Sends a job to the service (in-process fallback); returns the exit code."""
+    try:
+        request('/status', port=port, timeout=2)
+    except (urllib.error.URLError, OSError):
+        if not fallback:
+            print(f"[-] Prediction service is not running on port {port}.")
+            return 1
+        print("[*] Prediction service not running, predicting in-process.")
+        predict_in_process(job)
+        return 0
+
+    t0 = time.time()
+    result = request('/predict', job, port=port)
+    if 'error' in result:
+        print(f"[-] Prediction service error: {result['error']}")
+        return 1
+    print(result['log'], end='')
+    print(f"[*] Prediction service: job took {result['latency']:.2f}s ({time.time() - t0:.2f}s round trip); "
+          f"a cold process would first spend {result['cold_start']:.2f}s loading.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident prediction service")
+    parser.add_argument("command", choices=["serve", "submit", "status"])
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--input", help="submit: scraper output (JSON array)")
+    parser.add_argument("--stream", help="submit: JSON Lines file to tail (scraper -a stream_output)")
+    parser.add_argument("--output", help="submit: predictions CSV (required with --stream)")
+    parser.add_argument("--idle_timeout", type=int, default=600, help="submit --stream: stop after this many idle seconds (counted from the first match)")
+    parser.add_argument("--no_fallback", action="store_true", help="submit: fail instead of predicting in-process")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port)
+    elif args.command == "status":
+        try:
+            print(json.dumps(request('/status', port=args.port, timeout=2), indent=2))
+        except (urllib.error.URLError, OSError):
+            print(f"Prediction service is not running on port {args.port}.")
+            sys.exit(1)
+    else:
+        if args.stream and not args.output:
+            parser.error("--output is required with --stream")
+        if not args.stream and not args.input:
+            parser.error("--input or --stream is required")
+        job = {'stream': os.path.abspath(args.stream), 'output': os.path.abspath(args.output),
+               'idle_timeout': args.idle_timeout} if args.stream else {'input': os.path.abspath(args.input)}
+        sys.exit(submit(job, port=args.port, fallback=not args.no_fallback))
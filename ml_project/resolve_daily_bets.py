@@ -2,9 +2,9 @@ import json
 import os
 import argparse
 import pandas as pd
-import glob
 import re
-from rapidfuzz import process, fuzz
+from bet_ledger import LEDGER_FILE, Ledger, outcome
+from match_matcher import match_records
 
 def load_json(filepath):
     if not os.path.exists(filepath):
@@ -12,10 +12,6 @@ def load_json(filepath):
     with open(filepath, 'r') as f:
         return json.load(f)
 
-def save_json(filepath, data):
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=4)
-
 def extract_date_from_filename(filename):
     # Extracts YYYY-MM-DD from string
     match = re.search(r"(\d{4}-\d{2}-\d{2})", os.path.basename(filename))
@@ -26,6 +22,18 @@ def extract_date_from_filename(filename):
 def normalize(name):
     return name.lower().strip() if name else ""
 
+def fixture_key(bet):
+    """(home, away, date, match_id) of a bet; names parsed from 'match' ("A vs B" / "A - B") if missing."""
+    home = bet.get('home')
+    away = bet.get('away')
+    if not home and bet.get('match'):
+        m_str = bet.get('match')
+        for sep in (' vs ', ' - '):
+            if sep in m_str:
+                home, away = m_str.split(sep, 1)
+                break
+    return (home or None, away or None, bet.get('date'), bet.get('match_id'))
+
 def load_verification_csv(filepath):
     if not os.path.exists(filepath):
         return {}
@@ -54,8 +62,14 @@ def load_verification_csv(filepath):
         print(f"Error loading CSV {filepath}: {e}")
         return {}
 
-def resolve_all_bets(bets_dir, results_file=None, verification_file=None, config_file="data_sets/betting_config.json"):
-    print(f"Resolving all OPEN bets in {bets_dir}...")
+def resolve_all_bets(bets_dir="output", results_file=None, verification_file=None,
+                     config_file="data_sets/betting_config.json", ledger_file=LEDGER_FILE):
+    """
+    Settles the ledger's OPEN bets against a day's results in one transaction.
+    bets_dir / config_file are only read when the ledger is first created
+    (import of the legacy bets_*.json slips and bankroll).
+    """
+    print(f"Resolving all OPEN bets in {ledger_file}...")
     
     # 1. Load Results
     results_map = {}
@@ -69,17 +83,15 @@ def resolve_all_bets(bets_dir, results_file=None, verification_file=None, config
 
     if verification_file:
         csv_map = load_verification_csv(verification_file)
-        results_map.update(csv_map)
+        # CSV scores win, but keep match_id/away/start_time from the scraped result
+        for key, res in csv_map.items():
+            results_map[key] = {**results_map.get(key, {}), **res}
 
     if not results_map:
         print("No results loaded. Cannot resolve bets.")
         return
 
-    # Load Config (Bankroll)
-    config = load_json(config_file)
-    if not config:
-        config = {"current_bankroll": 1000.0}
-    current_bankroll = config.get('current_bankroll', 1000.0)
+    ledger = Ledger(ledger_file, config_file=config_file, slips_dir=bets_dir)
     
     # Extract target date from results file if available
     target_date = None
@@ -88,205 +100,87 @@ def resolve_all_bets(bets_dir, results_file=None, verification_file=None, config
         if target_date:
             print(f"Enforcing date check: Only resolving bets for {target_date}")
     
-    result_keys = list(results_map.keys())
+    results = list(results_map.values())
     
-    # 2. Find Bets Files
-    bet_files = glob.glob(os.path.join(bets_dir, "bets_*.json"))
-    print(f"Found {len(bet_files)} bet slips.")
-    
-    total_settled_count = 0
-    total_pnl_impact = 0.0
+    # 2. Open bets of the target day (slip date and bet date), straight from the index
+    open_bets = ledger.open_bets(slip_date=target_date, day=target_date)
+    print(f"Found {len(open_bets)} open bets.")
+
+    # 3. Match every open bet's fixture against the results in one pass
+    # (several bets on the same match share one fixture)
+    fixture_index = {}
+    fixtures = []
+    for bet in open_bets:
+        key = fixture_key(bet)
+        if key[0] and key not in fixture_index:
+            fixture_index[key] = len(fixtures)
+            fixtures.append({'home': key[0], 'away': key[1], 'date': key[2], 'match_id': key[3]})
+    matches = match_records(
+        fixtures,
+        [{'home': r.get('home_team'), 'away': r.get('away_team'), 'date': r.get('start_time'),
+          'match_id': r.get('match_id')} for r in results],
+        min_score=80)
     
-    for b_file in bet_files:
-        bets_data = load_json(b_file)
-        if not bets_data: continue
-        
-        # Optimization: Skip entire file if its date (from filename) does not match target_date
-        # Assuming file name format dates match the content dates
-        file_date = extract_date_from_filename(b_file)
-        if target_date and file_date and file_date != target_date:
-             continue
-        
-        # Skip if already fully settled
-        if bets_data.get('settled', False):
+    outcomes = []
+    for bet in open_bets:
+        key = fixture_key(bet)
+        if not key[0]:
             continue
-            
-        bets = bets_data.get('bets', [])
-        file_updated = False
-        file_pnl = 0.0
         
-        for bet in bets:
-            # Default status to OPEN if missing
-            if not bet.get('status'):
-                bet['status'] = 'OPEN'
-            
-            if bet.get('status') != 'OPEN':
-                continue
-                
-            # Date Check at Bet Level (Double Safety)
-            if target_date and bet.get('date') and not bet.get('date').startswith(target_date):
-                continue
-                
-            home = bet.get('home')
-            bet_type = bet.get('type')
-            selection = bet.get('selection')
-            
-            # Key Mapping / Normalization
-            stake = float(bet.get('stake', bet.get('stake_units', 0)))
-            odd = float(bet.get('odd', bet.get('odds', 1.0)))
-            
-            home = bet.get('home')
-            match_id = bet.get('match_id')
-
-            # Parse 'match' string if 'home' is missing
-            if not home and bet.get('match'):
-                m_str = bet.get('match')
-                if ' vs ' in m_str:
-                    home = m_str.split(' vs ')[0]
-                elif ' - ' in m_str:
-                     home = m_str.split(' - ')[0]
-            
-            if not home:
-                continue
-            
-            # Find Result
-            norm_home = normalize(home)
-            result_data = None
-            
-            # Prioritize clean ID match if available
-            # (Assuming results_map might eventually support ID indexing, but for now mostly name)
-            
-            if norm_home in results_map:
-                result_data = results_map[norm_home]
-            else:
-                match = process.extractOne(norm_home, result_keys, scorer=fuzz.ratio)
-                if match and match[1] >= 80:
-                    result_data = results_map[match[0]]
-            
-                # Result not found -> Mark as VOID (Neutral)
-                # This assumes relevant results file is complete. Mismatches will be voided.
-                bet['status'] = 'VOID'
-                bet['result'] = 'VOID'
-                bet['profit'] = 0.0 # Return stake logic (net change 0 relative to wallet deduction? No wait.)
-                # If deducted on OPEN, then VOID means return STAKE.
-                # Profit field usually means PnL.
-                # If WON: profit = (stake*odd) - stake.
-                # If LOST: profit = -stake.
-                # If VOID: profit = 0. (You get stake back, no win, no loss).
-                
-                # Bankroll impact:
-                # WON: bankroll += stake + profit (total return)
-                # LOST: bankroll += 0
-                # VOID: bankroll += stake
-                
-                # But here we handle bankroll at line 190 and 196.
-                # Let's align with that logic below or handle it here.
-                # Since we are modifying the flow, we should probably set variables and let downstream handle it,
-                # BUT the downstream logic (lines 145+) assumes we have scores.
-                # So we must handle VOID here and `continue` or skip scoring logic.
-                
-                current_bankroll += stake
-                file_pnl += 0.0 # No PnL change for file
-                file_updated = True
-                total_settled_count += 1
-                
-                continue 
+        # Find Result (match_id first, then name assignment)
+        match = matches.get(fixture_index[key])
+        result_data = results[match[0]] if match else None
 
-                
-            # Check Scores
-            try:
-                h_score = int(result_data['home_score'])
-                a_score = int(result_data['away_score'])
-            except: continue
-            
-            # Outcome
-            bet['final_score'] = f"{h_score}-{a_score}"
+        if result_data is None:
+            # Result not found -> Mark as VOID (Neutral)
+            # This assumes relevant results file is complete. Mismatches will be voided.
+            # VOID: profit = 0, the stake (deducted when the bet was placed) is returned.
+            outcomes.append(outcome(bet['id'], 'VOID', bet['stake'], bet['odds']))
+            continue
             
-            # Calculate and store 1X2 result
-            res_1x2 = "X"
-            if h_score > a_score: res_1x2 = "1"
-            elif a_score > h_score: res_1x2 = "2"
-            bet['result_1x2'] = res_1x2
-
-            # Calculate and store OU result
-            total_goals = h_score + a_score
-            res_ou = "OVER" if total_goals > 2.5 else "UNDER"
-            bet['result_ou'] = res_ou
+        # Check Scores
+        try:
+            h_score = int(result_data['home_score'])
+            a_score = int(result_data['away_score'])
+        except: continue
+        
+        # Calculate 1X2 and OU results
+        res_1x2 = "X"
+        if h_score > a_score: res_1x2 = "1"
+        elif a_score > h_score: res_1x2 = "2"
+        total_goals = h_score + a_score
+        res_ou = "OVER" if total_goals > 2.5 else "UNDER"
 
-            won = False
-            if bet_type == '1X2':
-                outcome = res_1x2
-                
-                sel = str(selection).upper()
-                if sel in ["HOME", "1"]: sel = "1"
-                elif sel in ["AWAY", "2"]: sel = "2"
-                elif sel in ["DRAW", "X"]: sel = "X"
-                if sel == outcome: won = True
-                
-            elif bet_type == 'O/U' or bet_type == 'OU2.5':
-                outcome = res_ou
-                sel = str(selection).upper()
-                if "OVER" in sel: sel = "OVER"
-                elif "UNDER" in sel: sel = "UNDER"
-                elif "2.5" in sel: 
-                     if "OVER" in sel: sel = "OVER"
-                     elif "UNDER" in sel: sel = "UNDER"
-                if sel == outcome: won = True
-            
-            # Update
-            if won:
-                bet['status'] = 'WON'
-                bet['result'] = 'WON'
-                profit = (stake * odd) - stake
-                bet['profit'] = round(profit, 2)
-                current_bankroll += (stake + profit)
-                file_pnl += profit
-            else:
-                bet['status'] = 'LOST'
-                bet['result'] = 'LOST'
-                bet['profit'] = -stake
-                file_pnl -= stake
-            
-            file_updated = True
-            total_settled_count += 1
-            total_pnl_impact += (bet['profit'] if won else -stake) # wait, profit logic above is inconsistent. 
-            # if WON: profit = (stake*odd)-stake. total_pnl += profit.
-            # if LOST: profit = -stake. total_pnl += (-stake).
-            # Correct.
-            
-            total_pnl_impact += (file_pnl) # No, accumulate carefully or just sum at the end.
-            # Let's just track file_pnl properly
-            
-        all_bets_closed = all(b.get('status') != 'OPEN' for b in bets)
+        won = False
+        sel = str(bet.get('selection')).upper()
+        if bet['type'] == '1X2':
+            if sel in ["HOME", "1"]: sel = "1"
+            elif sel in ["AWAY", "2"]: sel = "2"
+            elif sel in ["DRAW", "X"]: sel = "X"
+            won = sel == res_1x2
+        elif bet['type'] == 'O/U' or bet['type'] == 'OU2.5':
+            if "OVER" in sel: sel = "OVER"
+            elif "UNDER" in sel: sel = "UNDER"
+            won = sel == res_ou
         
-        # Save if actual updates occurred OR if we need to close the file (cleanup)
-        if file_updated or (not bets_data.get('settled') and all_bets_closed):
-            bets_data['bets'] = bets
-            bets_data['pnl'] = bets_data.get('pnl', 0) + file_pnl
-            
-            if all_bets_closed:
-                bets_data['settled'] = True
-                bets_data['status'] = 'CLOSED'
-                
-            save_json(b_file, bets_data)
-            if file_updated:
-                print(f"Updated {b_file}: PnL {file_pnl:.2f}")
-            else:
-                print(f"Closed {b_file} with no new updates.")
+        outcomes.append(outcome(bet['id'], 'WON' if won else 'LOST', bet['stake'], bet['odds'],
+                                final_score=f"{h_score}-{a_score}", result_1x2=res_1x2, result_ou=res_ou))
 
-    # Update Bankroll Once
-    if total_settled_count > 0:
-        config['current_bankroll'] = current_bankroll
-        save_json(config_file, config)
-        print(f"Total Settled: {total_settled_count}. New Bankroll: {current_bankroll:.2f}")
-    else:
+    # 4. Settlements, bet statuses and bankroll payouts in one set-based transaction
+    if not outcomes:
         print("No matches resolved across any open slips.")
+        return
+    summary, balance = ledger.settle(outcomes, source=os.path.basename(verification_file or results_file or ''))
+    for slip_date, (count, pnl) in sorted(summary.items()):
+        print(f"Updated slip {slip_date}: {count} bets, PnL {pnl:.2f}")
+    print(f"Total Settled: {sum(n for n, _ in summary.values())}. New Bankroll: {balance:.2f}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--bets_dir", default="output", help="Directory containing bets_*.json")
+    parser.add_argument("--bets_dir", default="output", help="Directory of the legacy bets_*.json (imported on first run)")
     parser.add_argument("--results", help="Path to results json")
     parser.add_argument("--verification_csv", help="Path to verification CSV")
+    parser.add_argument("--ledger", default=LEDGER_FILE, help="Bet ledger database")
     args = parser.parse_args()
     
-    resolve_all_bets(args.bets_dir, args.results, args.verification_csv)
+    resolve_all_bets(args.bets_dir, args.results, args.verification_csv, ledger_file=args.ledger)
@@ -0,0 +1,275 @@
+import json
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Returned by lookups that the ring buffers cannot answer (e.g. an as-of date
+# far in the past). Callers should fall back to scanning MatchHistory.
+MISS = object()
+
+
+def season_year(date):
+    """Season key (Aug-Jul), same convention as FeatureEngineer."""
+    return date.year if date.month >= 8 else date.year - 1
+
+
+class TeamStateStore:
+    """
+    Persisted per-team state for prediction-time feature lookups.
+
+    For every team we keep ring buffers with the last `capacity` results
+    overall, at home and away, plus season-to-date accumulators. The store is
+    built once from MatchHistory, updated incrementally with new results and
+    answers (team, as-of date) queries from the buffers in O(1) instead of
+    scanning the whole history frame.
+
+    Stats follow MatchPredictor.get_team_stats / get_venue_specific_stats
+    exactly, so swapping the scan for the store does not change predictions.
+    """
+
+    def __init__(self, path="data_sets/team_state.json", capacity=10):
+        self.path = path
+        self.capacity = capacity
+        self.teams = {}
+        self.last_date = None
+        # Matches already ingested on last_date (results for that day may arrive in several batches)
+        self.last_day_count = 0
+        self.n_matches = 0
+
+    # --- Build / Update ---
+
+    def _team(self, name):
+        state = self.teams.get(name)
+        if state is None:
+            state = {
+                'overall': deque(maxlen=self.capacity),
+                'home': deque(maxlen=self.capacity),
+                'away': deque(maxlen=self.capacity),
+                # Total matches ever pushed per buffer (to know when entries were evicted)
+                'seen': {'overall': 0, 'home': 0, 'away': 0},
+                'season': {'year': None, 'games': 0, 'pts': 0, 'gf': 0.0, 'ga': 0.0},
+            }
+            self.teams[name] = state
+        return state
+
+    @staticmethod
+    def _num(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def _push(self, state, buffer, record):
+        state[buffer].append(record)
+        state['seen'][buffer] += 1
+
+    def add_match(self, date, home, away, ftr, fthg, ftag, hst=np.nan, ast=np.nan, hc=np.nan, ac=np.nan):
+        """Applies one finished match. Matches must be fed in chronological order."""
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Match on {date.date()} is older than the store ({self.last_date.date()})")
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+            self.last_day_count = 0
+        self.last_day_count += 1
+
+        fthg, ftag = self._num(fthg), self._num(ftag)
+        # Record layout: [date, is_home, FTR, FTHG, FTAG, HST, AST, HC, AC]
+        base = [date, None, ftr, fthg, ftag, self._num(hst), self._num(ast), self._num(hc), self._num(ac)]
+
+        for team, is_home in ((home, True), (away, False)):
+            state = self._team(team)
+            record = list(base)
+            record[1] = is_home
+            self._push(state, 'overall', record)
+            self._push(state, 'home' if is_home else 'away', record)
+
+            # Season accumulators
+            season = state['season']
+            year = season_year(date)
+            if season['year'] != year:
+                season.update({'year': year, 'games': 0, 'pts': 0, 'gf': 0.0, 'ga': 0.0})
+            gf, ga = (fthg, ftag) if is_home else (ftag, fthg)
+            season['games'] += 1
+            season['pts'] += self._points(ftr, is_home)
+            season['gf'] += 0.0 if pd.isna(gf) else gf
+            season['ga'] += 0.0 if pd.isna(ga) else ga
+
+        self.n_matches += 1
+
+    def update(self, df: pd.DataFrame):
+        """Feeds the matches of `df` that are newer than the store. Returns the number applied."""
+        df = df.dropna(subset=['date']).sort_values('date', kind='stable')
+        if self.last_date is not None:
+            df = df[df['date'] >= self.last_date]
+            # Skip the same-day matches that were already ingested
+            same_day = int((df['date'] == self.last_date).sum())
+            df = df.iloc[min(same_day, self.last_day_count):]
+
+        def col(name):
+            return df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+
+        for row in zip(df['date'], df['home_team'], df['away_team'], col('FTR'), col('FTHG'), col('FTAG'),
+                       col('HST'), col('AST'), col('HC'), col('AC')):
+            self.add_match(*row)
+        return len(df)
+
+    def sync(self, history_df: pd.DataFrame):
+        """
+        Brings the store in line with MatchHistory: rebuilds from scratch if the
+        history up to `last_date` no longer matches what was ingested (e.g. CSVs
+        were corrected), otherwise only applies the new tail.
+        """
+        dated = history_df.dropna(subset=['date'])
+        if self.last_date is not None and (dated['date'] <= self.last_date).sum() != self.n_matches:
+            print("Team state store is out of sync with MatchHistory. Rebuilding...")
+            self.__init__(self.path, self.capacity)
+        applied = self.update(dated)
+        if applied:
+            self.save()
+        return applied
+
+    # --- Persistence ---
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        def encode(records):
+            return [[r[0].isoformat()] + r[1:] for r in records]
+
+        payload = {
+            'capacity': self.capacity,
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None,
+            'last_day_count': self.last_day_count,
+            'n_matches': self.n_matches,
+            'teams': {
+                name: {
+                    'overall': encode(s['overall']),
+                    'home': encode(s['home']),
+                    'away': encode(s['away']),
+                    'seen': s['seen'],
+                    'season': s['season'],
+                } for name, s in self.teams.items()
+            }
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, path="data_sets/team_state.json", capacity=10):
+        """Loads a persisted store, or returns an empty one if missing/corrupt/resized."""
+        store = cls(path, capacity)
+        if not os.path.exists(path):
+            return store
+        try:
+            with open(path, 'r') as f:
+                payload = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Could not read team state store {path}: {e}")
+            return store
+        if payload.get('capacity') != capacity:
+            return store
+
+        def decode(records):
+            return deque(([pd.Timestamp(r[0])] + r[1:] for r in records), maxlen=capacity)
+
+        store.last_date = pd.Timestamp(payload['last_date']) if payload.get('last_date') else None
+        store.last_day_count = payload.get('last_day_count', 0)
+        store.n_matches = payload.get('n_matches', 0)
+        for name, s in payload.get('teams', {}).items():
+            store.teams[name] = {
+                'overall': decode(s['overall']),
+                'home': decode(s['home']),
+                'away': decode(s['away']),
+                'seen': s['seen'],
+                'season': s['season'],
+            }
+        return store
+
+    # --- Queries ---
+
+    @staticmethod
+    def _points(ftr, is_home):
+        return 3 if ftr == ('H' if is_home else 'A') else (1 if ftr == 'D' else 0)
+
+    def _window(self, team, buffer, as_of, window):
+        """Last `window` records strictly before `as_of`, or MISS if evicted data would be needed."""
+        state = self.teams.get(team)
+        if state is None:
+            return []
+        records = [r for r in state[buffer] if r[0] < as_of]
+        evicted = state['seen'][buffer] > len(state[buffer])
+        if len(records) < window and evicted:
+            return MISS
+        return records[-window:]
+
+    def get_team_stats(self, team_name, date_before, window=5):
+        """Same output as MatchPredictor.get_team_stats (None if no prior games)."""
+        if not team_name:
+            return None
+        records = self._window(team_name, 'overall', pd.Timestamp(date_before), window)
+        if records is MISS or not records:
+            return records if records is MISS else None
+
+        sums = {'pts': 0, 'gf': 0, 'ga': 0, 'sf': 0, 'sa': 0, 'cf': 0, 'ca': 0, 'ou': 0}
+        for date, is_home, ftr, fthg, ftag, hst, ast, hc, ac in records:
+            sums['pts'] += self._points(ftr, is_home)
+            sums['gf'] += fthg if is_home else ftag
+            sums['ga'] += ftag if is_home else fthg
+            sums['sf'] += hst if is_home else ast
+            sums['sa'] += ast if is_home else hst
+            sums['cf'] += hc if is_home else ac
+            sums['ca'] += ac if is_home else hc
+            sums['ou'] += 1 if (fthg + ftag) > 2.5 else 0
+
+        count = len(records)
+        return {f'form_{k}': v / count for k, v in sums.items()}
+
+    def get_venue_specific_stats(self, team_name, is_home_focus, date_before, window=5):
+        """Same output as MatchPredictor.get_venue_specific_stats."""
+        if not team_name:
+            return None
+        buffer = 'home' if is_home_focus else 'away'
+        records = self._window(team_name, buffer, pd.Timestamp(date_before), window)
+        if records is MISS:
+            return MISS
+        if not records:
+            return {k: 0 for k in ['spec_pts', 'spec_gf', 'spec_ga', 'spec_sf', 'spec_sa']}
+
+        sums = {'pts': 0, 'gf': 0, 'ga': 0, 'sf': 0, 'sa': 0}
+        for date, is_home, ftr, fthg, ftag, hst, ast, hc, ac in records:
+            sf, sa = (hst, ast) if is_home else (ast, hst)
+            sums['pts'] += self._points(ftr, is_home)
+            sums['gf'] += fthg if is_home else ftag
+            sums['ga'] += ftag if is_home else fthg
+            sums['sf'] += sf if pd.notna(sf) else 0
+            sums['sa'] += sa if pd.notna(sa) else 0
+
+        count = len(records)
+        return {f'spec_{k}': v / count for k, v in sums.items()}
+
+    def get_season_stats(self, team_name, date_before):
+        """
+        Season-to-date accumulators (games, ppg, avg_gf, avg_ga) for the season
+        of `date_before`. MISS if the store has results on/after that date.
+        """
+        state = self.teams.get(team_name)
+        if state is None:
+            return None
+        as_of = pd.Timestamp(date_before)
+        if self.last_date is not None and self.last_date >= as_of:
+            return MISS
+        season = state['season']
+        if season['year'] != season_year(as_of) or season['games'] == 0:
+            return {'games': 0, 'ppg': 0.0, 'avg_gf': 0.0, 'avg_ga': 0.0}
+        games = season['games']
+        return {
+            'games': games,
+            'ppg': season['pts'] / games,
+            'avg_gf': season['gf'] / games,
+            'avg_ga': season['ga'] / games,
+        }
@@ -5,15 +5,15 @@ from sklearn.model_selection import TimeSeriesSplit
 import numpy as np
 import json
 import os
-import gc
-from data_loader import DataLoader
-from feature_engineering import FeatureEngineer
+from feature_store import FeatureStore
 import feature_engineering
 print(f"DEBUG: Loaded feature_engineering from {feature_engineering.__file__}")
 
 class ModelTrainer:
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, streaming: bool = False):
         self.data_dir = data_dir
+        # Build features season by season (lower peak memory, same output)
+        self.streaming = streaming
         self.common_features = [
             'H_form_pts', 'H_form_gf', 'H_form_ga',
             'A_form_pts', 'A_form_gf', 'A_form_ga',
@@ -42,58 +42,18 @@ class ModelTrainer:
         ]
 
     def prepare_data(self):
-        print("Loading data...")
-        loader = DataLoader(self.data_dir)
-        df = loader.load_historical_data()
-
-        # NOTE: We need full history for correct ELO calculation, but treating the huge DF triggers OOM.
-        # OPTIMIZATION:
-        # 1. Create a lightweight DF for ELO calculation (2010-Present)
-        # 2. Filter the main DF early for Training (2020-Present) to save memory
-        # 3. Merge ELOs back into the Training DF
-
-        # 1. Lightweight History for ELO
-        cols_for_elo = ['date', 'home_team', 'away_team', 'FTHG', 'FTAG']
-        existing_cols = [c for c in cols_for_elo if c in df.columns]
-        df_elo_history = df[existing_cols].copy().sort_values('date')
-
-        print("Calculating ELO ratings on full history...")
-        from elo_engine import EloTracker
-        elo_tracker = EloTracker()
-        df_elo_history = elo_tracker.process_history(df_elo_history)
+        # Elo (full history) + rolling features (since 2019-01-01) come from the
+        # shared feature store, which only recomputes what changed in MatchHistory.
+        print("Loading enriched data from feature store...")
+        store = FeatureStore(self.data_dir, buffer_start="2019-01-01", streaming=self.streaming)
+        df_fe = store.load()
+        training_start = pd.Timestamp("2020-01-01")
 
         # Save current ELO ratings for prediction usage
         with open("data_sets/elo_ratings.json", "w") as f:
-            json.dump(elo_tracker.ratings, f)
+            json.dump(store.elo_ratings, f)
         print("Saved final ELO ratings to data_sets/elo_ratings.json")
 
-        # 2. Filter Main DF for Feature Engineering (Buffer)
-        # We need prior data to calculate rolling features for the start of the training period.
-        buffer_date = pd.Timestamp("2019-01-01")
-        training_start = pd.Timestamp("2020-01-01")
-        print(f"Filtering data for FE since {buffer_date}...")
-        df_fe = df[df['date'] >= buffer_date].copy()
-        
-        # Free up original huge DF
-        del df
-        gc.collect()
-        
-        # 3. Merge ELOs into df_fe
-        home_elos = df_elo_history[['date', 'home_team', 'H_elo']].copy()
-        df_fe = pd.merge(df_fe, home_elos, on=['date', 'home_team'], how='left')
-        
-        away_elos = df_elo_history[['date', 'away_team', 'A_elo']].copy()
-        df_fe = pd.merge(df_fe, away_elos, on=['date', 'away_team'], how='left')
-        
-        # Clean up history df
-        del df_elo_history
-        gc.collect()
-        
-        # 4. Feature Engineering on the buffered DF
-        print("Engineering rolling features...")
-        fe = FeatureEngineer()
-        df_fe = fe.add_rolling_features(df_fe)
-        
         # 5. Filter for Final Training Set (2020-Present)
         print(f"Filtering final training set since {training_start}...")
         df_train = df_fe[df_fe['date'] >= training_start].copy()
@@ -391,7 +351,12 @@ class ModelTrainer:
         print("Saved final O/U model (Regression/Poisson).")
 
 if __name__ == "__main__":
-    trainer = ModelTrainer("data_sets/MatchHistory")
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streaming", action="store_true", help="Build features season by season to bound memory")
+    args = parser.parse_args()
+
+    trainer = ModelTrainer("data_sets/MatchHistory", streaming=args.streaming)
     data = trainer.prepare_data()
     trainer.train_1x2(data)
     trainer.train_draw(data)
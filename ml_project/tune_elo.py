@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from data_loader import DataLoader
+from elo_engine import GOAL_DIFF_VARIANTS, sweep_elo
+
+
+def parse_list(value, cast=float):
+    return tuple(cast(v) for v in value.split(',') if v.strip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate Elo (K, home advantage, goal-diff multiplier) in one pass.")
+    parser.add_argument("--data_dir", default="data_sets/MatchHistory", help="MatchHistory CSV directory")
+    parser.add_argument("--k", default="10,15,20,25,30,40", help="Comma-separated K factors")
+    parser.add_argument("--hfa", default="0,25,50,75,100", help="Comma-separated home advantage offsets (rating points)")
+    parser.add_argument("--multipliers", default=",".join(GOAL_DIFF_VARIANTS),
+                        help=f"Comma-separated goal-diff multipliers ({', '.join(GOAL_DIFF_VARIANTS)})")
+    parser.add_argument("--since", default="2010-01-01", help="First match replayed")
+    parser.add_argument("--eval_since", default="2015-01-01", help="Only score matches from this date (warm-up before)")
+    parser.add_argument("--top", type=int, default=15, help="Rows of the report to print")
+    parser.add_argument("--output", default="models/elo_sweep.csv", help="Full report CSV")
+    args = parser.parse_args()
+
+    multipliers = parse_list(args.multipliers, str)
+    unknown = [m for m in multipliers if m not in GOAL_DIFF_VARIANTS]
+    if unknown:
+        parser.error(f"Unknown multipliers: {unknown}")
+
+    df = DataLoader(args.data_dir).load_historical_data()
+    df = df[df['date'] >= pd.Timestamp(args.since)].sort_values('date', kind='stable')
+
+    start = time.perf_counter()
+    report = sweep_elo(df, k_factors=parse_list(args.k), home_advantages=parse_list(args.hfa),
+                       multipliers=multipliers, eval_since=args.eval_since)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s ({report['n_matches'].iloc[0]} scored matches)\n")
+    print(report.head(args.top).to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    report.to_csv(args.output, index=False)
+    best = report.iloc[0]
+    with open(os.path.join(os.path.dirname(args.output) or ".", "best_params_elo.json"), "w") as f:
+        json.dump({'k_factor': float(best['k_factor']), 'home_advantage': float(best['home_advantage']),
+                   'multiplier': best['multiplier'], 'log_loss': float(best['log_loss']),
+                   'brier': float(best['brier'])}, f, indent=4)
+    print(f"\nSaved {args.output} and best_params_elo.json")
@@ -6,16 +6,16 @@ from sklearn.metrics import accuracy_score, log_loss
 import json
 import os
 import argparse
-from data_loader import DataLoader
-from feature_engineering import FeatureEngineer
+from feature_store import FeatureStore
 import warnings
 
 # Suppress warnings for cleaner output
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 class StepwiseTuner:
-    def __init__(self, data_dir="data_sets/MatchHistory"):
+    def __init__(self, data_dir="data_sets/MatchHistory", streaming=False):
         self.data_dir = data_dir
+        self.streaming = streaming
         self.common_features = [
             'H_form_pts', 'H_form_gf', 'H_form_ga',
             'A_form_pts', 'A_form_gf', 'A_form_ga',
@@ -31,37 +31,10 @@ class StepwiseTuner:
     
     def load_data(self):
         print("Loading data for tuning...")
-        # Reusing logic from ModelTrainer manually for now 
-        # (Ideal world: refactor Trainer to share prepare_data)
-        loader = DataLoader(self.data_dir)
-        df = loader.load_historical_data()
-        
-        # ELO Handling (Simplified: reuse existing ELO json if possible, or recalculate)
-        # For tuning, we assume ELOs are generated via retrain_pipeline roughly correctly.
-        # But we need to attach them.
-        # Check if we should fully re-engineer features or assume they exist?
-        # The loader only loads CSVs. We strictly need FeatureEngineer here.
-        
-        # 1. ELO
-        cols_for_elo = ['date', 'home_team', 'away_team', 'FTHG', 'FTAG']
-        existing_cols = [c for c in cols_for_elo if c in df.columns]
-        df_elo_history = df[existing_cols].copy().sort_values('date')
-        
-        from elo_engine import EloTracker
-        elo_tracker = EloTracker()
-        df_elo_history = elo_tracker.process_history(df_elo_history)
-        
-        # Merge ELOs
-        home_elos = df_elo_history[['date', 'home_team', 'H_elo']].copy()
-        df = pd.merge(df, home_elos, on=['date', 'home_team'], how='left')
-        away_elos = df_elo_history[['date', 'away_team', 'A_elo']].copy()
-        df = pd.merge(df, away_elos, on=['date', 'away_team'], how='left')
+        # Same Elo + rolling features as ModelTrainer, served by the shared feature store
+        store = FeatureStore(self.data_dir, buffer_start="2019-01-01", streaming=self.streaming)
+        df = store.load()
 
-        # Feature Engineering
-        print("Engineering features...")
-        fe = FeatureEngineer()
-        df = fe.add_rolling_features(df)
-        
         # Filter for recent era (Training Set)
         training_start = pd.Timestamp("2020-01-01")
         df_train = df[df['date'] >= training_start].copy()
@@ -246,9 +219,10 @@ class StepwiseTuner:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--model", type=str, default="all", help="all, 1x2, or ou")
+    parser.add_argument("--streaming", action="store_true", help="Build features season by season to bound memory")
     args = parser.parse_args()
     
-    tuner = StepwiseTuner()
+    tuner = StepwiseTuner(streaming=args.streaming)
     df = tuner.load_data()
     
     if args.model in ['all', '1x2']:
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ml_project modules use flat imports (from elo_engine import ...)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ml_project"))
+
+from elo_engine import ArrayEloTracker, EloTracker
+
+ELO_COLUMNS = ['date', 'home_team', 'away_team', 'FTHG', 'FTAG']
+
+
+def timed(tracker, df, **kwargs):
+    start = time.perf_counter()
+    out = tracker.process_history(df, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EloTracker vs ArrayEloTracker.")
+    parser.add_argument("--history_dir", default="data_sets/MatchHistory", help="MatchHistory CSV directory")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic matches instead of MatchHistory")
+    parser.add_argument("--since", default="2010-01-01", help="Only replay matches since this date")
+    parser.add_argument("--checkpoints", type=int, default=12, help="Number of as-of dates to snapshot and verify")
+    args = parser.parse_args()
+
+    if args.synthetic or not os.path.isdir(args.history_dir):
+        from benchmark_rolling_features import synthetic_history
+        n = args.synthetic or 200000
+        print(f"Using {n} synthetic matches.")
+        df = synthetic_history(n, n_teams=400)
+    else:
+        from data_loader import DataLoader
+        df = DataLoader(args.history_dir).load_historical_data()
+    df = df[df['date'] >= pd.Timestamp(args.since)]
+    df = df[[c for c in ELO_COLUMNS if c in df.columns]].sort_values('date', kind='stable').reset_index(drop=True)
+    print(f"Replaying {len(df)} matches since {args.since}.")
+
+    legacy_tracker = EloTracker()
+    legacy, t_legacy = timed(legacy_tracker, df)
+
+    dates = df['date'].dropna()
+    cp_dates = pd.to_datetime(np.linspace(dates.min().value, dates.max().value, args.checkpoints).astype('int64'))
+    array_tracker = ArrayEloTracker()
+    fast, t_fast = timed(array_tracker, df, checkpoint_dates=cp_dates)
+
+    # Equivalence: per-row pre-match ratings and final ratings
+    for col in ['H_elo', 'A_elo']:
+        diff = np.abs(legacy[col].to_numpy(dtype=float) - fast[col].to_numpy(dtype=float))
+        assert np.nanmax(diff, initial=0.0) < 1e-9, f"{col} differs by up to {np.nanmax(diff)}"
+    final = array_tracker.ratings
+    assert final.keys() == legacy_tracker.ratings.keys()
+    assert all(abs(final[t] - r) < 1e-9 for t, r in legacy_tracker.ratings.items())
+
+    # As-of lookups must agree with the snapshots taken during the pass
+    snapshots = array_tracker.checkpoints()
+    start = time.perf_counter()
+    lookups = 0
+    for cp_date, row in snapshots.iterrows():
+        for team in array_tracker.teams:
+            assert abs(array_tracker.rating_as_of(team, cp_date) - row[team]) < 1e-9, (team, cp_date)
+            lookups += 1
+    t_lookup = time.perf_counter() - start
+    print(f"[+] Equivalence OK ({len(df)} rows, {len(final)} teams, {len(snapshots)} checkpoints)")
+
+    print(f"EloTracker:      {t_legacy:.3f}s")
+    print(f"ArrayEloTracker: {t_fast:.3f}s ({t_legacy / t_fast:.1f}x faster)")
+    print(f"rating_as_of:    {lookups} lookups in {t_lookup:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
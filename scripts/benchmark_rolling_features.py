@@ -0,0 +1,101 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ml_project modules use flat imports (from elo_engine import ...)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ml_project"))
+
+from feature_engineering import FeatureEngineer
+
+ROLLING_COLS = [f'{side}_form_{stat}' for side in ['H', 'A']
+                for stat in ['pts', 'gf', 'ga', 'ou', 'str', 'sf', 'sa', 'cf', 'ca']]
+VENUE_COLS = [f'H_home_{s}' for s in ['pts', 'gf', 'ga', 'sf', 'sa']] + \
+             [f'A_away_{s}' for s in ['pts', 'gf', 'ga', 'sf', 'sa']]
+
+
+def synthetic_history(n_matches, n_teams=60, seed=42):
+    """Random MatchHistory-like frame (incl. NaN stats and same-day fixtures)."""
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+    dates = pd.Timestamp("2015-08-01") + pd.to_timedelta(np.sort(rng.integers(0, 3000, n_matches)), unit='D')
+    fthg = rng.poisson(1.5, n_matches).astype(float)
+    ftag = rng.poisson(1.1, n_matches).astype(float)
+    df = pd.DataFrame({
+        'date': dates,
+        'home_team': np.array(teams)[home],
+        'away_team': np.array(teams)[away],
+        'FTHG': fthg, 'FTAG': ftag,
+        'FTR': np.where(fthg > ftag, 'H', np.where(fthg == ftag, 'D', 'A')),
+        'B365H': rng.uniform(1.2, 6, n_matches),
+        'B365D': rng.uniform(2.8, 4.5, n_matches),
+        'B365A': rng.uniform(1.2, 8, n_matches),
+        'HST': rng.poisson(5, n_matches).astype(float),
+        'AST': rng.poisson(4, n_matches).astype(float),
+        'HC': rng.poisson(5, n_matches).astype(float),
+        'AC': rng.poisson(4, n_matches).astype(float),
+        'league': rng.choice(['E0', 'SP1', 'D1'], n_matches),
+    })
+    # Extra leagues have no shots/corners for some rows
+    missing = rng.random(n_matches) < 0.05
+    df.loc[missing, ['HST', 'AST', 'HC', 'AC']] = np.nan
+    return df
+
+
+def check_equivalence(legacy, vectorized):
+    """Raises AssertionError if any rolling column differs between engines."""
+    for col in ROLLING_COLS + VENUE_COLS:
+        a = legacy[col].to_numpy()
+        b = vectorized[col].to_numpy()
+        if col.endswith('_str'):
+            mismatch = (a != b).sum()
+        else:
+            a = a.astype(float)
+            b = b.astype(float)
+            mismatch = (~np.isclose(a, b, equal_nan=True)).sum()
+        assert mismatch == 0, f"{col}: {mismatch} rows differ"
+    print(f"[+] Equivalence OK on {len(ROLLING_COLS + VENUE_COLS)} columns x {len(legacy)} rows")
+
+
+def timed(engine, df):
+    fe = FeatureEngineer(engine=engine)
+    start = time.perf_counter()
+    out = fe.add_rolling_features(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs vectorized rolling-form engine.")
+    parser.add_argument("--history_dir", default="data_sets/MatchHistory", help="MatchHistory CSV directory")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic matches instead of MatchHistory")
+    parser.add_argument("--since", default="2023-01-01", help="Limit legacy comparison to matches since this date")
+    parser.add_argument("--skip_legacy", action="store_true", help="Only time the vectorized engine")
+    args = parser.parse_args()
+
+    if args.synthetic or not os.path.isdir(args.history_dir):
+        n = args.synthetic or 20000
+        print(f"Using {n} synthetic matches.")
+        df = synthetic_history(n)
+    else:
+        from data_loader import DataLoader
+        df = DataLoader(args.history_dir).load_historical_data()
+        df = df[df['date'] >= pd.Timestamp(args.since)]
+
+    vec, t_vec = timed("vectorized", df)
+    print(f"Vectorized: {len(df)} rows in {t_vec:.3f}s ({len(df) / t_vec:,.0f} rows/sec)")
+
+    if not args.skip_legacy:
+        legacy, t_legacy = timed("legacy", df)
+        print(f"Legacy:     {len(df)} rows in {t_legacy:.3f}s ({len(df) / t_legacy:,.0f} rows/sec)")
+        print(f"Speedup:    {t_legacy / t_vec:.1f}x")
+        check_equivalence(legacy, vec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Offline check of the Flashscore match-list feed parser against recorded payloads.
+
+Every file in scripts/fixtures/flashscore_feed/ is a raw feed response:
+  - <name>.txt with a <name>.expected.json next to it must parse to exactly that list;
+  - any other file must be rejected with FeedDecodeError (the spider then falls back to the DOM).
+
+Record new payloads with:  scrapy crawl flashscore -a list_source=feed -a feed_record_dir=<dir>
+and write their expected output with --update (review the JSON before committing it).
+
+Usage: python scripts/check_feed_parser.py [--update]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+# Start times are rendered in local time: pin it so expectations are machine independent
+os.environ['TZ'] = 'UTC'
+time.tzset()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flashscore_scraper.feed_parser import FeedDecodeError, feed_day_offset, parse_match_list
+
+FIXTURE_DIR = os.path.join(PROJECT_ROOT, "scripts", "fixtures", "flashscore_feed")
+
+URL_CASES = {
+    "https://local-global.flashscore.ninja/2/x/feed/f_1_0_2_en_1": 0,
+    "https://local-global.flashscore.ninja/2/x/feed/f_1_1_2_en_1": 1,
+    "https://local-global.flashscore.ninja/2/x/feed/f_1_-3_2_en_1": -3,
+    "https://local-global.flashscore.ninja/2/x/feed/f_3_1_2_en_1": None,  # basketball
+    "https://www.flashscore.com/x/js/core_2_2198000000.js": None,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", action="store_true", help="(Re)write the .expected.json of every .txt fixture")
+    args = parser.parse_args()
+
+    failures = 0
+    for url, expected in URL_CASES.items():
+        got = feed_day_offset(url)
+        if got != expected:
+            print(f"[FAIL] feed_day_offset({url}) = {got}, expected {expected}")
+            failures += 1
+
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*"))):
+        if path.endswith(".expected.json"):
+            continue
+        name = os.path.basename(path)
+        expected_path = os.path.splitext(path)[0] + ".expected.json"
+        with open(path, encoding="utf-8") as f:
+            payload = f.read()
+
+        if args.update and path.endswith(".txt"):
+            try:
+                fixtures = parse_match_list(payload)
+            except FeedDecodeError as e:
+                print(f"[SKIPPED] {name}: rejected ({e}), kept as a decode-failure fixture")
+                continue
+            with open(expected_path, "w", encoding="utf-8") as f:
+                json.dump(fixtures, f, indent=2, ensure_ascii=False)
+            print(f"[UPDATED] {name}: {len(fixtures)} fixtures")
+            continue
+
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding="utf-8") as f:
+                expected = json.load(f)
+            try:
+                fixtures = parse_match_list(payload)
+            except FeedDecodeError as e:
+                print(f"[FAIL] {name}: {e}")
+                failures += 1
+                continue
+            if fixtures != expected:
+                print(f"[FAIL] {name}: parsed fixtures differ from {os.path.basename(expected_path)}")
+                failures += 1
+            else:
+                print(f"[OK] {name}: {len(fixtures)} fixtures")
+        else:
+            try:
+                parse_match_list(payload)
+            except FeedDecodeError as e:
+                print(f"[OK] {name}: rejected ({e})")
+            else:
+                print(f"[FAIL] {name}: expected FeedDecodeError")
+                failures += 1
+
+    if failures:
+        print(f"{failures} check(s) failed.")
+        sys.exit(1)
+    print("All feed parser checks passed.")
+
+
+if __name__ == "__main__":
+    main()
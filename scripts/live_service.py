@@ -0,0 +1,341 @@
+"""
+Resident live-analysis service.
+
+Keeps one Chromium open for the whole session instead of cold-starting two
+scrapy crawls every 10 minutes:
+  - one page stays on the Flashscore LIVE tab and is re-read every
+    LIST_INTERVAL seconds (one evaluate); a score change there is treated as
+    a goal and the match is refreshed immediately;
+  - each tracked match (live and in today's predictions) keeps its own
+    statistics page (up to MAX_MATCH_PAGES, least urgent ones are re-navigated),
+    polled on an adaptive interval, see poll_interval();
+  - every update runs LiveAdjuster and output/live_data.json is republished
+    atomically (same schema as run_live_analysis.py).
+
+A goal reaches live_data.json within LIST_INTERVAL plus one page read.
+
+Usage: python scripts/live_service.py [--once] [--max_pages N]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import signal
+import sys
+import time
+
+import pandas as pd
+from playwright.async_api import async_playwright
+from rapidfuzz import fuzz
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flashscore_scraper import settings as scraper_settings
+from flashscore_scraper.live_extract import (
+    LIVE_LIST_URL, MATCH_STATS_URL, accept_cookies, open_live_tab, read_live_list, read_match_state, show_stats_tab,
+)
+from flashscore_scraper.resource_filter import ResourceFilter
+from ml_project.live_adjuster import LiveAdjuster
+from ml_project.match_matcher import match_records
+
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+LIVE_OUTPUT = os.path.join(OUTPUT_DIR, "live_data.json")
+NO_MATCHES_MESSAGE = "No live matches we have predictions for found on Flashscore"
+
+# Seconds between reads of the LIVE list (goal detection) and full reloads of that page
+LIST_INTERVAL = 20
+LIST_RELOAD = 10 * 60
+# Per-match polling: fast after a goal and in the closing stages, slow at half time
+BASE_INTERVAL = 60
+LATE_INTERVAL = 20
+GOAL_INTERVAL = 15
+HALF_TIME_INTERVAL = 120
+LATE_MINUTE = 75
+RECENT_GOAL_WINDOW = 5 * 60
+# Match pages are reloaded this often even without a goal (stale live socket)
+PAGE_RELOAD = 5 * 60
+MAX_MATCH_PAGES = 6
+
+
+def poll_interval(minute, seconds_since_goal=None, half_time=False):
+    """Seconds until a match's statistics are read again."""
+    if seconds_since_goal is not None and seconds_since_goal < RECENT_GOAL_WINDOW:
+        return GOAL_INTERVAL
+    if half_time:
+        return HALF_TIME_INTERVAL
+    if minute >= LATE_MINUTE:
+        return LATE_INTERVAL
+    return BASE_INTERVAL
+
+
+def list_score(row):
+    if row.get('home_score') in (None, '') or row.get('away_score') in (None, ''):
+        return None
+    return f"{row['home_score']}-{row['away_score']}"
+
+
+def publish(results, path=LIVE_OUTPUT):
+    """Write live_data.json via a temp file so the web UI never reads a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp, path)
+
+
+class TrackedMatch:
+    def __init__(self, live_row, pred_row):
+        self.match_id = live_row['match_id']
+        self.home_team = live_row['home_team']
+        self.away_team = live_row['away_team']
+        self.pred_row = pred_row
+        self.list_score = list_score(live_row)
+        self.stage = live_row.get('stage') or ''
+        self.page = None
+        self.page_loaded_at = 0
+        self.next_poll = 0
+        self.last_goal = None
+        self.reload = False
+        self.result = None
+
+    def pre_probs(self):
+        try:
+            return {
+                'home': float(self.pred_row['Home Win %']),
+                'draw': float(self.pred_row['Draw %']),
+                'away': float(self.pred_row['Away Win %'])
+            }
+        except Exception:
+            return {'home': 0.33, 'draw': 0.33, 'away': 0.33}
+
+    def schedule(self, now):
+        since_goal = now - self.last_goal if self.last_goal is not None else None
+        minute = self.result['minute'] if self.result else 0
+        half_time = 'HALF TIME' in self.stage.upper()
+        self.next_poll = now + poll_interval(minute, since_goal, half_time)
+
+
+class LiveService:
+    def __init__(self, output=LIVE_OUTPUT, max_pages=MAX_MATCH_PAGES):
+        self.output = output
+        self.max_pages = max_pages
+        self.adjuster = LiveAdjuster()
+        self.resource_filter = ResourceFilter.from_settings(scraper_settings, "live_service")
+        self.tracked = {}
+        self.predictions = None
+        self.predictions_key = None
+        self.context = None
+        self.list_page = None
+        self.list_loaded_at = 0
+        self.next_list_read = 0
+        self.stopping = asyncio.Event()
+        self.published = None
+
+    # --- predictions -------------------------------------------------
+
+    def load_predictions(self):
+        """Today's predictions CSV, re-read when the day rolls over or the file is rewritten."""
+        path = os.path.join(OUTPUT_DIR, f"predictions_{datetime.date.today():%Y-%m-%d}.csv")
+        key = (path, os.path.getmtime(path)) if os.path.exists(path) else (path, None)
+        if key == self.predictions_key:
+            return
+        self.predictions_key = key
+        self.predictions = None
+        if key[1] is None:
+            print(f"No predictions file found ({os.path.basename(path)})")
+        else:
+            try:
+                self.predictions = [row for _, row in pd.read_csv(path).iterrows()]
+                print(f"Loaded {len(self.predictions)} predictions from {os.path.basename(path)}")
+            except Exception as e:
+                print(f"Error reading predictions: {e}")
+        # Matches were paired against the old rows: re-pair on this tick
+        for match in list(self.tracked.values()):
+            self.tracked.pop(match.match_id)
+            self.release_page(match)
+        self.next_list_read = 0
+
+    # --- browser -----------------------------------------------------
+
+    async def new_page(self):
+        page = await self.context.new_page()
+        if scraper_settings.RESOURCE_FILTER_ENABLED:
+            await page.route("**", self.resource_filter.route)
+        return page
+
+    def release_page(self, match):
+        page, match.page = match.page, None
+        if page is not None and not page.is_closed():
+            asyncio.ensure_future(page.close())
+
+    async def read_list(self, now):
+        """Current LIVE list, or None if the page could not be read."""
+        if self.list_page is None or self.list_page.is_closed():
+            self.list_page = await self.new_page()
+            self.list_loaded_at = 0
+        try:
+            if now - self.list_loaded_at > LIST_RELOAD:
+                await self.list_page.goto(LIVE_LIST_URL, timeout=60000, wait_until='domcontentloaded')
+                await accept_cookies(self.list_page)
+                await open_live_tab(self.list_page)
+                self.list_loaded_at = now
+            return await read_live_list(self.list_page)
+        except Exception as e:
+            print(f"Live list error: {e}")
+            self.list_loaded_at = 0
+            return None
+
+    async def assign_pages(self, batch):
+        """Give every match of the batch a page: its own, a new one, or one taken from a less urgent match."""
+        for match in batch:
+            if match.page is not None and not match.page.is_closed():
+                continue
+            match.page = None
+            owners = [m for m in self.tracked.values() if m.page is not None and m not in batch]
+            if len(owners) + sum(1 for m in batch if m.page is not None) < self.max_pages or not owners:
+                match.page = await self.new_page()
+            else:
+                donor = max(owners, key=lambda m: m.next_poll)
+                match.page, donor.page = donor.page, None
+            match.page_loaded_at = 0
+
+    async def poll_match(self, match, now):
+        page = match.page
+        try:
+            if match.reload or now - match.page_loaded_at > PAGE_RELOAD:
+                await page.goto(MATCH_STATS_URL.format(match_id=match.match_id), timeout=20000, wait_until='domcontentloaded')
+                await accept_cookies(page)
+                try:
+                    await page.wait_for_selector('.detailScore__wrapper', timeout=5000)
+                except Exception:
+                    pass
+                await show_stats_tab(page)
+                match.page_loaded_at = now
+                match.reload = False
+            state = await read_match_state(page)
+        except Exception as e:
+            print(f"Error reading match {match.match_id}: {e}")
+            match.page_loaded_at = 0
+            return False
+
+        pre_probs = match.pre_probs()
+        match.result = {
+            'match': f"{match.home_team} vs {match.away_team}",
+            'score': state['score'],
+            'minute': state['minute'],
+            'stats': state['stats'],
+            'pre_probs': pre_probs,
+            'adj_probs': self.adjuster.adjust_probabilities(pre_probs, state['stats'], state['minute'], state['score']),
+        }
+        return True
+
+    # --- main loop ---------------------------------------------------
+
+    def sync_tracked(self, live_rows, now):
+        """Pair live rows with predictions, start/stop tracking, and flag goals seen on the list."""
+        rows_by_id = {row['match_id']: row for row in live_rows}
+        for match_id in [m for m in self.tracked if m not in rows_by_id]:
+            print(f"Match {match_id} is no longer live.")
+            self.release_page(self.tracked.pop(match_id))
+
+        new_rows = [row for row in live_rows if row['match_id'] not in self.tracked]
+        if new_rows and self.predictions:
+            pairs = match_records(
+                [{'home': r['home_team'], 'away': r['away_team'], 'match_id': r['match_id']} for r in new_rows],
+                [{'home': row['Home Team'], 'away': row['Away Team'],
+                  'match_id': row.get('match_id') if pd.notna(row.get('match_id')) else None}
+                 for row in self.predictions],
+                min_score=80, away_min_score=70, scorer=fuzz.token_sort_ratio, use_dates=False)
+            claimed = {id(m.pred_row) for m in self.tracked.values()}
+            for i, (j, _) in pairs.items():
+                if id(self.predictions[j]) in claimed:
+                    continue
+                row = new_rows[i]
+                print(f"MATCH FOUND: {row['home_team']} vs {row['away_team']} (ID: {row['match_id']})")
+                self.tracked[row['match_id']] = TrackedMatch(row, self.predictions[j])
+
+        for match_id, match in self.tracked.items():
+            row = rows_by_id[match_id]
+            match.stage = row.get('stage') or ''
+            score = list_score(row)
+            if score is not None and match.list_score is not None and score != match.list_score:
+                print(f"GOAL: {match.home_team} vs {match.away_team} {match.list_score} -> {score}")
+                match.last_goal = now
+                match.next_poll = now
+                match.reload = True
+            if score is not None:
+                match.list_score = score
+
+    def results(self):
+        if self.predictions is None:
+            return []
+        done = [m.result for m in self.tracked.values() if m.result is not None]
+        return done or [{'message': NO_MATCHES_MESSAGE}]
+
+    async def tick(self):
+        """One scheduling step; returns the number of seconds to sleep."""
+        now = time.time()
+        self.load_predictions()
+
+        if now >= self.next_list_read:
+            live_rows = await self.read_list(now)
+            if live_rows is not None:
+                self.sync_tracked(live_rows, now)
+            self.next_list_read = now + LIST_INTERVAL
+
+        due = sorted((m for m in self.tracked.values() if m.next_poll <= now), key=lambda m: m.next_poll)
+        for start in range(0, len(due), self.max_pages):
+            batch = due[start:start + self.max_pages]
+            await self.assign_pages(batch)
+            now = time.time()
+            await asyncio.gather(*(self.poll_match(m, now) for m in batch))
+            for m in batch:
+                m.schedule(now)
+                if m.result:
+                    print(f"Match {m.match_id}: {m.result['score']} ({m.result['minute']}') "
+                          f"next read in {m.next_poll - now:.0f}s")
+
+        results = self.results()
+        if results != self.published:
+            publish(results, self.output)
+            self.published = results
+            print(f"[{time.ctime()}] Updated live data for {sum('match' in r for r in results)} matches.")
+
+        wake = min([self.next_list_read] + [m.next_poll for m in self.tracked.values()])
+        return max(1.0, wake - time.time())
+
+    async def run(self, once=False):
+        print(f"Starting live service (list every {LIST_INTERVAL}s, matches every "
+              f"{GOAL_INTERVAL}-{BASE_INTERVAL}s, up to {self.max_pages} match pages)...")
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**scraper_settings.PLAYWRIGHT_LAUNCH_OPTIONS)
+            self.context = await browser.new_context(user_agent=scraper_settings.USER_AGENT)
+            try:
+                while not self.stopping.is_set():
+                    delay = await self.tick()
+                    if once:
+                        break
+                    try:
+                        await asyncio.wait_for(self.stopping.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                print(self.resource_filter.summary())
+                await browser.close()
+
+
+async def main(args):
+    service = LiveService(max_pages=args.max_pages)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, service.stopping.set)
+    await service.run(once=args.once)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident live match analysis service")
+    parser.add_argument("--once", action="store_true", help="Single pass (list + every tracked match), then exit")
+    parser.add_argument("--max_pages", type=int, default=MAX_MATCH_PAGES, help="Match pages kept open at once")
+    asyncio.run(main(parser.parse_args()))
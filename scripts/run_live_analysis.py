@@ -4,8 +4,9 @@ import os
 import datetime
 import subprocess
 import sys
-from thefuzz import process, fuzz
+from rapidfuzz import fuzz
 from ml_project.live_adjuster import LiveAdjuster
+from ml_project.match_matcher import match_records
 
 # Config
 OUTPUT_DIR = "output"
@@ -71,23 +72,23 @@ def main():
     # We want to find matches in 'df' that correspond to 'live_matches_raw'
     # Use Home Team Name for matching
     
-    predicted_teams = df['Home Team'].tolist()
+    # One-to-one assignment on home + away names (match_id first when the
+    # prediction rows carry it), instead of a per-match scan of all predictions
+    pred_rows = [row for _, row in df.iterrows()]
+    matches = match_records(
+        [{'home': m.get('home_team'), 'away': m.get('away_team'), 'match_id': m.get('match_id')}
+         for m in live_matches_raw],
+        [{'home': row['Home Team'], 'away': row['Away Team'],
+          'match_id': row.get('match_id') if pd.notna(row.get('match_id')) else None}
+         for row in pred_rows],
+        min_score=80, away_min_score=70, scorer=fuzz.token_sort_ratio, use_dates=False)
     live_pairs = []
     
-    for m in live_matches_raw:
-        h_team = m['home_team']
-        # Fuzzy match
-        match, score = process.extractOne(h_team, predicted_teams, scorer=fuzz.token_sort_ratio)
-        if score > 80: # Threshold
-            # Found a candidate
-            # Verify Away team too?
-            row = df[df['Home Team'] == match].iloc[0]
-            a_team_pred = row['Away Team']
-            
-            # Simple check on away team
-            if fuzz.token_sort_ratio(m['away_team'], a_team_pred) > 70:
-                print(f"MATCH FOUND: {h_team} vs {m['away_team']} (ID: {m['match_id']})")
-                live_pairs.append((m, row))
+    for i, m in enumerate(live_matches_raw):
+        if i in matches:
+            h_team = m['home_team']
+            print(f"MATCH FOUND: {h_team} vs {m['away_team']} (ID: {m['match_id']})")
+            live_pairs.append((m, pred_rows[matches[i][0]]))
                 
     if not live_pairs:
         msg = "No live matches we have predictions for found on Flashscore"
@@ -1,4 +1,5 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, Response
+import html
 import pandas as pd
 import os
 import subprocess
@@ -6,11 +7,13 @@ import datetime
 import glob
 import json
 import sys
-import time
 
 # Import Blueprints
 # Import Blueprints
-from basketball_routes import basketball_bp, NBA_TASKS
+from basketball_routes import basketball_bp
+from file_catalog import FileCatalog
+from result_tables import DEFAULT_PAGE_SIZE, ResultTables
+from job_runner import JOBS
 
 app = Flask(__name__)
 app.secret_key = 'super_secret_key_flashscore'
@@ -25,12 +28,18 @@ app.config['TEMPLATES_AUTO_RELOAD'] = True
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(BASE_DIR)
 sys.path.append(PROJECT_ROOT) # Enable importing ml_project
+from ml_project.bet_ledger import InsufficientFunds, Ledger, outcome
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'output')
 DATA_SETS_DIR = os.path.join(PROJECT_ROOT, 'data_sets')
 app.config['DATA_SETS_DIR'] = DATA_SETS_DIR
 LOG_DIR = os.path.join(PROJECT_ROOT, 'logs')
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+CATALOG = FileCatalog(OUTPUT_DIR)
+# Bets and bankroll (the legacy bets_*.json slips are imported on first use)
+LEDGER = Ledger(os.path.join(DATA_SETS_DIR, 'bets.db'), slips_dir=OUTPUT_DIR)
+RESULT_TABLES = ResultTables()
 
 @app.template_filter('to_float')
 def to_float_filter(value):
@@ -39,102 +48,44 @@ def to_float_filter(value):
     except:
         return 0.0
 
-# Global dictionary to track running processes
-# Format: {'task_name': {'process': Popen_obj, 'start_time': datetime}}
-TASKS = {
-    'predict': {'process': None, 'log': 'predict.log'},
-    'verify': {'process': None, 'log': 'verify.log'},
-    'live': {'process': None, 'log': 'live_loop.log'},
-    'update': {'process': None, 'log': 'update.log'},
-    'leagues': {'process': None, 'log': 'leagues.log'},
-    'retrain': {'process': None, 'log': 'retrain.log'}
-}
+# Background jobs run through JOBS (job_runner.py); these always show up in /status
+TASK_NAMES = ['predict', 'verify', 'live', 'update', 'leagues', 'retrain', 'nba_verify', 'nba_retrain', 'nba_predict']
+# Seconds between SSE heartbeats (keeps proxies from closing idle streams)
+SSE_HEARTBEAT = 15
+
+def league_stats_rows(stats_data):
+    """league_analytics.json -> dashboard rows (accuracy %), most matches first."""
+    league_stats = []
+    for league, s in stats_data.items():
+        total = s['total_matches']
+        if total > 0:
+            acc_1x2 = round((s['correct_1x2'] / total) * 100, 2)
+            acc_ou = round((s['correct_ou'] / total) * 100, 2)
+        else:
+            acc_1x2 = 0
+            acc_ou = 0
+            
+        league_stats.append({
+            'League': league,
+            'Count': total,
+            'Acc_1X2': acc_1x2,
+            'Acc_OU': acc_ou
+        })
+    league_stats.sort(key=lambda x: x['Count'], reverse=True)
+    return league_stats
 
 @app.route('/')
 def index():
-    # List prediction and verification files
-    prediction_files = glob.glob(os.path.join(OUTPUT_DIR, 'predictions_*.csv'))
-    verification_files = glob.glob(os.path.join(OUTPUT_DIR, 'verification_*.csv'))
+    # Prediction/verification/scraped files from the incremental catalog (no per-view file reads)
+    predictions, verifications, scraped_data = CATALOG.listing()
     
-    predictions = []
-    for f in prediction_files:
-        basename = os.path.basename(f)
-        try:
-            # Count matches (lines - header)
-            with open(f, 'r') as fh:
-                count = sum(1 for _ in fh) - 1
-            count = max(0, count)
-
-            # Extract date
-            date_str = basename.replace('predictions_', '').replace('.csv', '')
-            predictions.append({'filename': basename, 'date': date_str, 'type': 'Prediction', 'count': count})
-        except:
-             predictions.append({'filename': basename, 'date': 'Unknown', 'type': 'Prediction', 'count': 0})
-             
-    # matches_*.json files
-    matches_files = glob.glob(os.path.join(OUTPUT_DIR, 'matches_*.json'))
-    scraped_data = []
-    for f in matches_files:
-        basename = os.path.basename(f)
-        try:
-            with open(f, 'r') as fh:
-                match_data = json.load(fh)
-                count = len(match_data)
-            scraped_data.append({'filename': basename, 'count': count})
-        except:
-             scraped_data.append({'filename': basename, 'count': 0})
-    scraped_data.sort(key=lambda x: x['filename'], reverse=True)
-             
-    verifications = []
-    for f in verification_files:
-        basename = os.path.basename(f)
-        # Extract date from verification_2025-01-20.csv
-        try:
-             date_str = basename.replace('verification_', '').replace('.csv', '')
-             verifications.append({'filename': basename, 'date': date_str, 'type': 'Verification'})
-        except Exception as e:
-             print(f"Error parsing verification filename {basename}: {e}")
-             verifications.append({'filename': basename, 'date': 'Unknown', 'type': 'Verification'})
-    verifications.sort(key=lambda x: x['date'], reverse=True)
-        
-    predictions.sort(key=lambda x: x['date'], reverse=True)
-    
-    # Load Cumulative Stats for Dashboard
-    league_stats = []
+    # Load Cumulative Stats for Dashboard (re-parsed only when the file changes)
     stats_file = os.path.join(PROJECT_ROOT, 'data_sets/league_analytics.json')
-    if os.path.exists(stats_file):
-        try:
-            with open(stats_file, 'r') as f:
-                stats_data = json.load(f)
-            
-            for league, s in stats_data.items():
-                total = s['total_matches']
-                if total > 0:
-                    acc_1x2 = round((s['correct_1x2'] / total) * 100, 2)
-                    acc_ou = round((s['correct_ou'] / total) * 100, 2)
-                else:
-                    acc_1x2 = 0
-                    acc_ou = 0
-                    
-                league_stats.append({
-                    'League': league,
-                    'Count': total,
-                    'Acc_1X2': acc_1x2,
-                    'Acc_OU': acc_ou
-                })
-            league_stats.sort(key=lambda x: x['Count'], reverse=True)
-        except:
-            pass
+    league_stats = CATALOG.cached_json(stats_file, league_stats_rows, default=[])
             
     # Load Live Live Data
     live_file = os.path.join(OUTPUT_DIR, "live_data.json")
-    live_matches = []
-    if os.path.exists(live_file):
-        try:
-            with open(live_file, 'r') as f:
-                live_matches = json.load(f)
-        except Exception as e:
-            pass
+    live_matches = CATALOG.cached_json(live_file, default=[])
             
     return render_template('dashboard.html', 
                           predictions=predictions, 
@@ -145,93 +96,72 @@ def index():
 
 @app.route('/status')
 def get_status():
-    status = {}
-    
-    # Merge NBA Tasks into checking logic
-    # NBA_TASKS format: {'retrain': Popen, 'verify': Popen}
-    # We prefix them to distinction: 'nba_retrain', 'nba_verify'
-    
-    # Check Standard Tasks
-    for task_name, task_info in TASKS.items():
-        if task_info and task_info.get('process'):
-            poll = task_info['process'].poll()
-            if poll is None:
-                status[task_name] = {'state': 'running'}
-            elif poll == 0:
-                status[task_name] = {'state': 'completed'}
+    return JOBS.status(TASK_NAMES)
+
+def sse(data, event=None):
+    msg = f"event: {event}\n" if event else ""
+    return msg + f"data: {json.dumps(data)}\n\n"
+
+@app.route('/events')
+def job_events():
+    """Server-Sent Events: the /status payload, pushed whenever a job changes state."""
+    def stream():
+        version, last = None, None
+        while True:
+            version = JOBS.wait(version, SSE_HEARTBEAT)
+            current = JOBS.status(TASK_NAMES)
+            if current != last:
+                last = current
+                yield sse(current, 'status')
             else:
-                # Capture last lines of log directly
-                log_file = os.path.join(LOG_DIR, f"{task_name}.log")
-                error_msg = 'Unknown error'
-                if os.path.exists(log_file):
-                     try:
-                         # Get last 3 lines
-                         lines = subprocess.check_output(['tail', '-n', '3', log_file]).decode('utf-8')
-                         error_msg = lines.strip()
-                     except:
-                         pass
-                status[task_name] = {'state': 'error', 'msg': error_msg}
-        elif task_info and task_info.get('state'): # Thread tasks wrapper
-             status[task_name] = {'state': task_info['state'], 'msg': task_info.get('msg', '')}
-        else:
-            status[task_name] = {'state': 'idle'}
-            
-    # Check NBA Tasks
-    for nba_task, proc in NBA_TASKS.items():
-        key = f"nba_{nba_task}"
-        if proc:
-            poll = proc.poll()
-            if poll is None:
-                status[key] = {'state': 'running'}
-            elif poll == 0:
-                status[key] = {'state': 'completed'}
-            else:
-                status[key] = {'state': 'error'}
-        else:
-             status[key] = {'state': 'idle'}
-             
-    return status
+                yield ": heartbeat\n\n"
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/events/<name>')
+def job_log_events(name):
+    """Server-Sent Events: log lines of one job after ?since=N, then an 'end' event when it finishes."""
+    job = JOBS.jobs.get(name)
+    if job is None:
+        return {'error': f'No job named {name}'}, 404
+    since = request.args.get('since', 0, type=int)
+
+    def stream():
+        nonlocal since
+        version = None
+        while True:
+            version = JOBS.wait(version, SSE_HEARTBEAT)
+            lines = job.lines_since(since)
+            if lines:
+                since = lines[-1][0]
+                yield sse({'seq': since, 'lines': [text for _, text in lines]}, 'log')
+            if not job.active:
+                yield sse(job.summary(), 'end')
+                return
+            if not lines:
+                yield ": heartbeat\n\n"
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/stop/<task_name>', methods=['POST'])
 def stop_task(task_name):
-    if task_name in TASKS and TASKS[task_name] and TASKS[task_name]['process']:
-        try:
-            # Send SIGTERM
-            TASKS[task_name]['process'].terminate()
-            time.sleep(1)
-            # If still alive, SIGKILL
-            if TASKS[task_name]['process'].poll() is None:
-                TASKS[task_name]['process'].kill()
-            
-            TASKS[task_name]['process'] = None # Set process to None to indicate it's stopped
-            flash(f'Task {task_name} stopped.', 'warning')
-        except Exception as e:
-            flash(f'Error stopping task: {str(e)}', 'danger')
+    if JOBS.cancel(task_name):
+        flash(f'Task {task_name} stopped.', 'warning')
     else:
         flash(f'No running {task_name} task found.', 'secondary')
     return redirect(url_for('index'))
 
 def process_bet_verification(verification_file_path):
     """
-    Checks if there is a 'bets_YYYY-MM-DD.json' corresponding to this verification file.
-    If so, verifies the bets, calculates P/L, and updates the bankroll.
+    Settles the ledger's open bets of the day of this verification file
+    (verification_YYYY-MM-DD.csv) against its actual 1X2 / O/U results.
     """
     try:
-        # verification_file_path: .../verify_2025-12-11.csv
         basename = os.path.basename(verification_file_path)
         # Extract date string "2025-12-11"
-        date_str = basename.replace('verification_', '').replace('.csv', '') # Changed from 'verify_' to 'verification_'
+        date_str = basename.replace('verification_', '').replace('.csv', '')
         
-        bets_file = os.path.join(OUTPUT_DIR, f"bets_{date_str}.json")
-        if not os.path.exists(bets_file):
-            print(f"No bets file found for {date_str} to verify.")
-            return
-
-        with open(bets_file, 'r') as f:
-            bets_data = json.load(f)
-            
-        if bets_data.get('status') == 'CLOSED':
-            print(f"Bets for {date_str} already processed.")
+        open_bets = LEDGER.open_bets(slip_date=date_str)
+        if not open_bets:
+            print(f"No open bets for {date_str} to verify.")
             return
 
         # Load verification data (Actual Results)
@@ -246,97 +176,36 @@ def process_bet_verification(verification_file_path):
                 'O/U': row['Actual O/U']
             }
             
-        total_pnl = 0.0 # Net Profit/Loss for stats
-        total_return = 0.0 # Amount to return to bankroll (Stake + Profit)
-        won_bets = 0
-        lost_bets = 0
-        
-        bets = bets_data.get('bets', [])
-        for bet in bets:
-            match_key = bet['match']
-            if match_key not in results_map:
-                bet['status'] = 'VOID' 
+        outcomes = []
+        for bet in open_bets:
+            actual = results_map.get(bet['match'])
+            if actual is None:
                 # If VOID, we return the stake
-                stake = float(bet.get('stake_units', 0))
-                total_return += stake
-                bet['pnl'] = 0.0
+                outcomes.append(outcome(bet['id'], 'VOID', bet['stake'], bet['odds']))
                 continue
-                
-            actual = results_map[match_key]
-            stake = float(bet.get('stake_units', 0))
-            odds = float(bet.get('odds', 0))
-            selection = bet['selection'] 
             
             # Check Win
             won = False
             if bet['type'] == '1X2':
-                if str(selection) == str(actual['1X2']):
-                    won = True
-            elif bet['type'] == 'O/U':
-                if str(selection) == str(actual['O/U']):
-                    won = True
-            
-            if won:
-                # Bankroll Logic: We already deducted stake.
-                # Return = Stake * Odds
-                payout = stake * odds
-                profit = payout - stake
-                
-                total_return += payout
-                total_pnl += profit
-                
-                bet['result'] = 'WON'
-                bet['pnl'] = profit
-                won_bets += 1
-            else:
-                # Loss
-                # Return = 0
-                # PnL = -Stake
-                total_return += 0.0
-                total_pnl -= stake
-                
-                bet['result'] = 'LOST'
-                bet['pnl'] = -stake
-                lost_bets += 1
-        
-        # Update Bankroll (Credit Returns)
-        config_path = os.path.join(DATA_SETS_DIR, 'betting_config.json')
-        current_bankroll = 1000.0
-        config = {}
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                current_bankroll = config.get('current_bankroll', 1000.0)
-            
-        # Add the returns to the CURRENT (already deducted) bankroll
-        new_bankroll = current_bankroll + total_return
-        config['current_bankroll'] = new_bankroll
+                won = str(bet['selection']) == str(actual['1X2'])
+            elif bet['type'] in ('O/U', 'OU2.5'): # OU2.5 = BettingEngine bets
+                won = str(bet['selection']) == str(actual['O/U'])
+            outcomes.append(outcome(bet['id'], 'WON' if won else 'LOST', bet['stake'], bet['odds'],
+                                    result_1x2=actual['1X2'], result_ou=actual['O/U']))
         
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
-            
-        # Update Bets File status
-        bets_data['status'] = 'CLOSED'
-        bets_data['pnl'] = total_pnl
-        bets_data['total_return'] = total_return
-        with open(bets_file, 'w') as f:
-            json.dump(bets_data, f, indent=4)
-            
-        print(f"Processed Bets for {date_str}: Returns {total_return:.2f} (Net P/L {total_pnl:.2f}). New Balance: {new_bankroll:.2f}")
+        # Stakes were deducted on placement; the ledger credits the payouts
+        summary, new_bankroll = LEDGER.settle(outcomes, source=basename)
+        count, total_pnl = summary.get(date_str, (0, 0.0))
+        print(f"Processed {count} bets for {date_str}: Net P/L {total_pnl:.2f}. New Balance: {new_bankroll:.2f}")
 
     except Exception as e:
         print(f"Error processing bet verification: {e}")
 
 @app.route('/predict', methods=['POST'])
 def run_prediction():
-    if TASKS['predict'] and TASKS['predict']['process'] and TASKS['predict']['process'].poll() is None:
-         flash('Prediction is already running!', 'warning')
-         return redirect(url_for('index'))
-
     try:
         # Execute run_predictions.sh from project root
         script_path = os.path.join(PROJECT_ROOT, 'bin', 'run_predictions.sh')
-        log_file = open(os.path.join(LOG_DIR, 'predict.log'), 'w')
         
         cmd = ['/bin/bash', script_path]
         
@@ -348,9 +217,9 @@ def run_prediction():
         if request.form.get('force'):
             cmd.append('--force')
             
-        proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['predict'] = {'process': proc, 'start_time': datetime.datetime.now()}
+        if JOBS.submit('predict', cmd, log_name='predict.log') is None:
+            flash('Prediction is already running!', 'warning')
+            return redirect(url_for('index'))
         
         flash('Prediction pipeline started! Check <a href="/logs/predict.log">logs</a> for status.', 'success')
     except Exception as e:
@@ -360,7 +229,7 @@ def run_prediction():
 
 @app.route('/verify', methods=['POST'])
 def run_verification():
-    if TASKS['verify'] and TASKS['verify']['process'] and TASKS['verify']['process'].poll() is None:
+    if JOBS.is_active('verify'):
          flash('Verification is already running!', 'warning')
          return redirect(url_for('index'))
 
@@ -383,15 +252,14 @@ def run_verification():
 
     try:
         script_path = os.path.join(PROJECT_ROOT, 'bin', 'run_verification.sh')
-        log_file = open(os.path.join(LOG_DIR, 'verify.log'), 'w')
         
         cmd = ['/bin/bash', script_path]
         if date_arg:
             cmd.append(date_arg)
             
-        proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['verify'] = {'process': proc, 'start_time': datetime.datetime.now()}
+        if JOBS.submit('verify', cmd, log_name='verify.log') is None:
+            flash('Verification is already running!', 'warning')
+            return redirect(url_for('index'))
         
         flash('Verification pipeline started! Check <a href="/logs/verify.log">logs</a> for status.', 'success')
     except Exception as e:
@@ -401,13 +269,19 @@ def run_verification():
 
 @app.route('/logs/<filename>')
 def view_log(filename):
-    filepath = os.path.join(LOG_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, 'r') as f:
-            content = f.read()
-        return f"<pre>{content}</pre>"
-    else:
+    filepath = os.path.join(LOG_DIR, os.path.basename(filename))
+    if not os.path.exists(filepath):
         return "Log file not found."
+    job = JOBS.job_for_log(os.path.basename(filename))
+    if job is not None and job.active:
+        # Page shows what is in the buffer now; the rest is streamed from /events/<job>
+        lines = list(job.lines)
+        since = lines[-1][0] if lines else 0
+        content = "\n".join(text for _, text in lines)
+        return render_template('log_stream.html', filename=filename, content=content, job=job.name, since=since)
+    with open(filepath, 'r', errors='replace') as f:
+        content = f.read()
+    return f"<pre>{html.escape(content)}</pre>"
 
 @app.route('/delete_file/<filename>', methods=['POST'])
 def delete_file(filename):
@@ -440,82 +314,41 @@ def view_file(filename):
         return redirect(url_for('index'))
         
     try:
-        df = pd.read_csv(filepath)
-        df = df.fillna('')  # Ensure NaNs are empty strings so template .split() works
-        
-        # Load Cumulative Stats from JSON
-        league_stats = []
-        stats_file = os.path.join(PROJECT_ROOT, 'data_sets/league_analytics.json')
-        if os.path.exists(stats_file):
-            try:
-                with open(stats_file, 'r') as f:
-                    stats_data = json.load(f)
-                    
-                # Convert dict to list for template
-                for league, s in stats_data.items():
-                    # Calculate percentages
-                    total = s['total_matches']
-                    if total > 0:
-                        acc_1x2 = round((s['correct_1x2'] / total) * 100, 2)
-                        acc_ou = round((s['correct_ou'] / total) * 100, 2)
-                    else:
-                        acc_1x2 = 0
-                        acc_ou = 0
-                        
-                    league_stats.append({
-                        'League': league,
-                        'Count': total,
-                        'Acc_1X2': acc_1x2,
-                        'Acc_OU': acc_ou
-                    })
-                # Sort by Count desc
-                league_stats.sort(key=lambda x: x['Count'], reverse=True)
-            except Exception as e:
-                print(f"Error loading league stats json: {e}")
-
-        # Convert to list of dicts for easy iteration
-        data = df.to_dict(orient='records')
-        
-        # Define Preferred Order
-        # prediction_cols starts with basic info
-        # prediction_cols starts with basic info
-        base_cols = ['Date', 'League', 'Home Team', 'Away Team', 'Home', 'Away', 'Score']
-        
-        # User requested 1x2 cluster then O/U cluster
-        target_cols = [
-            'Prediction 1X2', 'Prediction 1X2 Odd', 'Conf 1X2', 'EV 1X2', 'Kelly 1X2', 'Home Win %', 'Draw %', 'Away Win %', 
-            'Pred 1X2', 'Actual 1X2', 'Correct 1X2 Label', # Verification variants
-            
-            'Prediction O/U', 'Prediction O/U Odd', 'Conf O/U', 'EV O/U', 'Kelly O/U', 'Over %', 'Under %',
-            'Pred O/U', 'Actual O/U', 'Correct O/U Label' # Verification variants
-        ]
-        
-        final_cols = []
-        # Add base columns if they exist
-        for c in base_cols:
-            if c in df.columns:
-                final_cols.append(c)
-        
-        # Add target columns if they exist
-        for c in target_cols:
-             if c in df.columns:
-                 final_cols.append(c)
-                 
-        # Add any remaining columns (e.g. Form), but exclude user-requested removals
-        # Excluding: Home ELO, Away ELO, Home Form, Away Form, Match, and redundant booleans
-        exclude_cols = ['Home ELO', 'Away ELO', 'Home Form', 'Away Form', 'Adj Logs', 'Match', 'Correct 1X2', 'Correct O/U']
-        existing = set(final_cols)
-        for c in df.columns:
-            if c not in existing and c not in exclude_cols:
-                final_cols.append(c)
-        
-        columns = final_cols
-        count = len(data)
-        return render_template('results.html', filename=filename, columns=columns, data=data, league_stats=league_stats, count=count)
+        # Rows are fetched page by page from /api/view (see result_tables.py)
+        table = RESULT_TABLES.get(filepath)
+        return render_template('results.html', filename=filename, columns=table.columns,
+                               leagues=table.leagues, count=len(table.all_rows))
     except Exception as e:
         flash(f'Error reading file: {e}', 'danger')
         return redirect(url_for('index'))
 
+@app.route('/api/view/<filename>')
+def view_file_page(filename):
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    if not filename.endswith('.csv') or not os.path.exists(filepath):
+        return {'error': 'File not found'}, 404
+
+    def number(name):
+        try:
+            return float(request.args[name]) if request.args.get(name) not in (None, '') else None
+        except ValueError:
+            return None
+
+    try:
+        return RESULT_TABLES.page(
+            filepath,
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int),
+            league=request.args.get('league') or None,
+            min_conf=number('min_conf'),
+            min_ev=number('min_ev'),
+            kelly=request.args.get('kelly') in ('1', 'true', 'on'),
+            sort=request.args.get('sort') or None,
+            desc=request.args.get('order', 'desc') != 'asc',
+        )
+    except Exception as e:
+        return {'error': f'Error reading file: {e}'}, 500
+
 @app.route('/live_analysis')
 def live_analysis():
     live_file = os.path.join(OUTPUT_DIR, "live_data.json")
@@ -534,20 +367,15 @@ def live_analysis():
 @app.route('/refresh_live', methods=['POST'])
 def refresh_live():
     # Trigger the script
-    script_path = os.path.join(PROJECT_ROOT, 'scripts', 'run_live_analysis.py')
+    script_path = os.path.join(PROJECT_ROOT, 'scripts', 'live_service.py')
     try:
         # Run in background or wait?
         # User said "UI takes too long", so background is better, but then we need polling.
         # For simplicity now, let's wait (blocking) but user knows it takes time.
         # Or spawn Popen.
-        if TASKS.get('live') and TASKS['live']['process'] and TASKS['live']['process'].poll() is None:
+        if JOBS.submit('live', ['venv/bin/python', script_path, '--once'], log_name='live.log') is None:
              flash('Live analysis is already running!', 'warning')
              return redirect(url_for('index'))
-             
-        log_file = open(os.path.join(LOG_DIR, 'live.log'), 'w')
-        proc = subprocess.Popen(['venv/bin/python', script_path], cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['live'] = {'process': proc, 'start_time': datetime.datetime.now()}
         
         flash('Live analysis started! Auto-refreshing...', 'info')
     except Exception as e:
@@ -591,15 +419,10 @@ def reset_stats():
 def update_leagues():
     script_path = os.path.join(PROJECT_ROOT, 'bin', 'update_leagues_data.sh')
     try:
-        if TASKS.get('leagues') and TASKS['leagues']['process'] and TASKS['leagues']['process'].poll() is None:
+        # Use simple bash execution
+        if JOBS.submit('leagues', ['/bin/bash', script_path], log_name='leagues.log') is None:
              flash('Leagues update is already running!', 'warning')
              return redirect(url_for('index'))
-             
-        log_file = open(os.path.join(LOG_DIR, 'leagues.log'), 'w')
-        # Use simple bash execution
-        proc = subprocess.Popen(['/bin/bash', script_path], cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['leagues'] = {'process': proc, 'start_time': datetime.datetime.now()}
         
         flash('Leagues data update started! Check <a href="/logs/leagues.log">logs</a> for status.', 'success')
     except Exception as e:
@@ -670,113 +493,56 @@ def place_bets():
         if not bets:
             return jsonify({'error': 'No bets provided.'}), 400
             
-        # Calculate Total Stake
-        total_stake = sum(float(b.get('stake_units', 0)) for b in bets)
-        
-        # Load Bankroll
-        config_path = os.path.join(DATA_SETS_DIR, 'betting_config.json')
-        if not os.path.exists(config_path):
-             return jsonify({'error': 'Betting config not found. Cannot process transaction.'}), 500
-             
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            
-        current_bankroll = config.get('current_bankroll', 0.0)
-        
-        # Check Funds
-        if total_stake > current_bankroll:
-             return jsonify({'error': f"Insufficient funds. Total stake ({total_stake:.2f}) exceeds bankroll ({current_bankroll:.2f})."}), 400
-             
-        # Deduct Stake
-        new_bankroll = current_bankroll - total_stake
-        config['current_bankroll'] = new_bankroll
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
-            
-        # Save to output/bets_YYYY-MM-DD.json
-        filename = f"bets_{date_str}.json"
-        filepath = os.path.join(OUTPUT_DIR, filename)
-        
-        with open(filepath, 'w') as f:
-            json.dump({
-                'date': date_str,
-                'count': len(bets),
-                'bets': bets,
-                'total_stake': total_stake, # Store total stake for record
-                'status': 'OPEN',
-                'pnl': 0.0,
-                'settled': False # Flag to prevent double settlement
-            }, f, indent=4)
-            
-        return jsonify({'message': f"Successfully placed {len(bets)} virtual bets! Deducted {total_stake:.2f} units from bankroll.", 'file': filename, 'new_balance': new_bankroll})
+        # Funds check, dedupe (bets already placed are skipped) and stake deduction in one transaction
+        try:
+            placed, new_bankroll = LEDGER.place_bets(bets, slip_date=date_str)
+        except InsufficientFunds as e:
+            return jsonify({'error': str(e)}), 400
+        total_stake = sum(b['stake'] for b in placed)
+        skipped = len(bets) - len(placed)
+        
+        message = f"Successfully placed {len(placed)} virtual bets! Deducted {total_stake:.2f} units from bankroll."
+        if skipped:
+            message += f" Skipped {skipped} already placed."
+        return jsonify({'message': message, 'slip': date_str, 'new_balance': new_bankroll})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/betting')
 def betting_page():
-    # Load history
-    files = glob.glob(os.path.join(OUTPUT_DIR, "bets_*.json"))
-    history = []
-    for f in files:
-        try:
-            with open(f, 'r') as fh:
-                data = json.load(fh)
-                data['filename'] = os.path.basename(f)
-                
-                # Backfill total_stake if missing (for older files)
-                if 'total_stake' not in data:
-                    stake_sum = sum(float(b.get('stake_units', 0)) for b in data.get('bets', []))
-                    data['total_stake'] = stake_sum
-                    
-                # Backfill total_return if missing
-                if 'total_return' not in data:
-                    # If settled, return = stake + pnl
-                    if data.get('status') == 'CLOSED':
-                        data['total_return'] = data.get('total_stake', 0) + data.get('pnl', 0)
-                    else:
-                         data['total_return'] = 0.0
-                    
-                history.append(data)
-        except:
-            pass
-    history.sort(key=lambda x: x.get('date', ''), reverse=True)
-    return render_template('betting.html', history=history)
+    # Slips (bets grouped per day) with their stake, returns and P/L
+    return render_template('betting.html', history=LEDGER.slips())
+
+@app.route('/delete_slip/<slip_date>', methods=['POST'])
+def delete_slip(slip_date):
+    try:
+        deleted = LEDGER.delete_slip(slip_date)
+        if deleted:
+            flash(f'Bet slip {slip_date} deleted ({deleted} bets).', 'success')
+        else:
+            flash('Bet slip not found.', 'warning')
+    except Exception as e:
+        flash(f'Error deleting bet slip: {e}', 'danger')
+    return redirect(url_for('betting_page'))
 
 # Update Server Routes logic...
 @app.route('/live_analysis', methods=['POST'])
 def run_live_analysis():
-    task_name = 'live'
-    if TASKS[task_name] and TASKS[task_name]['process'] and TASKS[task_name]['process'].poll() is None:
+    cmd = [sys.executable, 'scripts/live_service.py']
+    if JOBS.submit('live', cmd, log_name='live_loop.log', service=True) is None:
         flash('Live Analysis Loop is already running!', 'warning')
         return redirect(url_for('index'))
-
-    cmd = [sys.executable, 'scripts/run_live_loop.py']
-    log_file = open(os.path.join(LOG_DIR, TASKS[task_name]['log']), 'w')
     
-    # Start process
-    TASKS[task_name]['process'] = subprocess.Popen(
-        cmd, 
-        stdout=log_file, 
-        stderr=subprocess.STDOUT,
-        cwd=PROJECT_ROOT
-    )
-    
-    flash('Live Analysis Loop started (running every 10 mins).', 'success')
+    flash('Live Analysis service started (updates within a minute of a goal).', 'success')
     return redirect(url_for('index'))
 
 @app.route('/update_data', methods=['POST'])
 def update_data():
-    if TASKS.get('update') and TASKS['update']['process'] and TASKS['update']['process'].poll() is None:
-         flash('Data update is already running!', 'warning')
-         return redirect(url_for('index'))
-
     try:
         script_path = os.path.join(PROJECT_ROOT, 'scripts', 'update_football_data.py')
-        log_file = open(os.path.join(LOG_DIR, 'update_data.log'), 'w')
-        proc = subprocess.Popen(['venv/bin/python', script_path], cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['update'] = {'process': proc, 'start_time': datetime.datetime.now()}
+        if JOBS.submit('update', ['venv/bin/python', script_path], log_name='update_data.log') is None:
+            flash('Data update is already running!', 'warning')
+            return redirect(url_for('index'))
         
         flash('Data update started! Check <a href="/logs/update_data.log">logs</a> for status.', 'success')
     except Exception as e:
@@ -786,17 +552,12 @@ def update_data():
 
 @app.route('/retrain_model', methods=['POST'])
 def retrain_model():
-    if TASKS.get('retrain') and TASKS['retrain']['process'] and TASKS['retrain']['process'].poll() is None:
-         flash('Model Retraining is already running!', 'warning')
-         return redirect(url_for('index'))
-
     try:
         script_path = os.path.join(PROJECT_ROOT, 'bin', 'retrain_pipeline.sh')
-        log_file = open(os.path.join(LOG_DIR, 'retrain.log'), 'w')
         # Using bash directly
-        proc = subprocess.Popen(['/bin/bash', script_path], cwd=PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT)
-        
-        TASKS['retrain'] = {'process': proc, 'start_time': datetime.datetime.now()}
+        if JOBS.submit('retrain', ['/bin/bash', script_path], log_name='retrain.log') is None:
+            flash('Model Retraining is already running!', 'warning')
+            return redirect(url_for('index'))
         
         flash('Full Retrain Pipeline started! Check <a href="/logs/retrain.log">logs</a> for progress.', 'success')
     except Exception as e:
@@ -804,71 +565,6 @@ def retrain_model():
         
     return redirect(url_for('index'))
 
-import threading
-
-def run_verify_task_thread(date_arg):
-    try:
-        cmd = ["/bin/bash", "run_verification.sh"]
-        if date_arg:
-            cmd.extend(["-d", date_arg])
-            
-        # Run process synchronously in this thread
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=os.getcwd()
-        )
-        
-        # We store the process in global TASKS so we can kill it if needed
-        TASKS['verify']['process'] = process
-        TASKS['verify']['state'] = 'running'
-        
-        stdout, stderr = process.communicate()
-        
-        if process.returncode == 0:
-            TASKS['verify']['state'] = 'completed'
-            TASKS['verify']['msg'] = 'Verification completed successfully.'
-            
-            # --- AUTO SETTLE BETS ---
-            # Determine the verification filename.
-            # run_verification.sh usually produces verify_YYYY-MM-DD.csv (Yesterday)
-            # If date_arg is passed, it uses that date.
-            target_date = date_arg if date_arg else (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            verify_file = os.path.join(OUTPUT_DIR, f"verify_{target_date}.csv")
-            
-            # Call settlement logic
-            print(f"Triggering bet settlement for {verify_file}...")
-            process_bet_verification(verify_file)
-            # ------------------------
-            
-        else:
-            TASKS['verify']['state'] = 'error'
-            TASKS['verify']['msg'] = f"Error: {stderr}"
-            
-    except Exception as e:
-        TASKS['verify']['state'] = 'error'
-        TASKS['verify']['msg'] = str(e)
-    finally:
-        TASKS['verify']['process'] = None
-
-@app.route('/verify', methods=['POST'])
-def run_verify():
-    if TASKS['verify'] and TASKS['verify']['process'] and TASKS['verify']['process'].poll() is None:
-        flash('Verification task is already running.', 'warning')
-        return redirect(url_for('index'))
-
-    # Reset state
-    TASKS['verify'] = {'state': 'running', 'process': None, 'msg': ''}
-    
-    # Launch in thread
-    thread = threading.Thread(target=run_verify_task_thread, args=(None,))
-    thread.start()
-    
-    flash('Verification task started! Bankroll will update upon completion.', 'success')
-    return redirect(url_for('index'))
-
 import glob
 import pandas as pd
 from flask import jsonify
@@ -900,15 +596,7 @@ def auto_wager():
                 return 0.0
 
         # Load Bankroll
-        config_path = os.path.join(DATA_SETS_DIR, 'betting_config.json')
-        config_bankroll = 100.0
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as f:
-                     config = json.load(f)
-                     config_bankroll = config.get('current_bankroll', 100.0)
-            except:
-                pass
+        config_bankroll = LEDGER.balance()
         
         # Override if user provided one
         custom_bankroll = request.args.get('bankroll')
@@ -988,15 +676,10 @@ def auto_wager():
 
 @app.context_processor
 def inject_bankroll():
-    config_path = os.path.join(DATA_SETS_DIR, 'betting_config.json')
-    bankroll = 1000.0
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r') as f:
-                data = json.load(f)
-                bankroll = data.get('current_bankroll', 1000.0)
-        except:
-            pass
+    try:
+        bankroll = LEDGER.balance()
+    except Exception:
+        bankroll = 1000.0
     return dict(bankroll=bankroll)
 
 
@@ -3,13 +3,12 @@ import os
 import json
 import glob
 import pandas as pd
-import subprocess
 import datetime
 from datetime import timedelta
 
-basketball_bp = Blueprint('basketball', __name__, template_folder='templates')
+from job_runner import JOBS
 
-NBA_TASKS = {}
+basketball_bp = Blueprint('basketball', __name__, template_folder='templates')
 
 def load_nba_analytics():
     path = os.path.join(current_app.config['DATA_SETS_DIR'], 'NBA', 'nba_analytics.json')
@@ -100,10 +99,6 @@ def index():
 
 @basketball_bp.route('/verify', methods=['POST'])
 def verify_nba():
-    if NBA_TASKS.get('verify') and NBA_TASKS['verify'].poll() is None:
-        flash("NBA Verification is already running.", "warning")
-        return redirect(url_for('basketball.index'))
-        
     try:
         project_root = os.path.dirname(current_app.root_path)
         script_path = os.path.join(project_root, 'bin', 'run_nba_verification.sh')
@@ -111,10 +106,9 @@ def verify_nba():
         # Determine Date (Default Yesterday, or from Form)
         # For now, default to Yesterday
         
-        log_file = open(os.path.join(project_root, 'logs', 'nba_verify.log'), 'w')
-        
-        proc = subprocess.Popen(['/bin/bash', script_path], cwd=project_root, stdout=log_file, stderr=subprocess.STDOUT)
-        NBA_TASKS['verify'] = proc
+        if JOBS.submit('nba_verify', ['/bin/bash', script_path], cwd=project_root, log_name='nba_verify.log') is None:
+            flash("NBA Verification is already running.", "warning")
+            return redirect(url_for('basketball.index'))
         
         flash("Started NBA Validation Pipeline (Yesterday).", "success")
     except Exception as e:
@@ -124,19 +118,14 @@ def verify_nba():
 
 @basketball_bp.route('/retrain', methods=['POST'])
 def retrain_nba():
-    if NBA_TASKS.get('retrain') and NBA_TASKS['retrain'].poll() is None:
-        flash("NBA Retraining is already running.", "warning")
-        return redirect(url_for('basketball.index'))
-        
     try:
         project_root = os.path.dirname(current_app.root_path)
         script_path = os.path.join(project_root, 'bin', 'retrain_nba_pipeline.sh')
         
-        log_file = open(os.path.join(project_root, 'logs', 'nba_retrain.log'), 'w')
-        
         # Use bash
-        proc = subprocess.Popen(['/bin/bash', script_path], cwd=project_root, stdout=log_file, stderr=subprocess.STDOUT)
-        NBA_TASKS['retrain'] = proc
+        if JOBS.submit('nba_retrain', ['/bin/bash', script_path], cwd=project_root, log_name='nba_retrain.log') is None:
+            flash("NBA Retraining is already running.", "warning")
+            return redirect(url_for('basketball.index'))
         
         flash("Started NBA Retraining Pipeline (Update Data + Train Models). Check logs for progress.", "success")
     except Exception as e:
@@ -146,19 +135,14 @@ def retrain_nba():
 
 @basketball_bp.route('/predict', methods=['POST'])
 def predict_nba():
-    if NBA_TASKS.get('predict') and NBA_TASKS['predict'].poll() is None:
-        flash("NBA Prediction is already running.", "warning")
-        return redirect(url_for('basketball.index'))
-        
     try:
         project_root = os.path.dirname(current_app.root_path)
         script_path = os.path.join(project_root, 'bin', 'run_nba_predictions.sh')
         
-        log_file = open(os.path.join(project_root, 'logs', 'nba_predict.log'), 'w')
-        
         # Use bash
-        proc = subprocess.Popen(['/bin/bash', script_path], cwd=project_root, stdout=log_file, stderr=subprocess.STDOUT)
-        NBA_TASKS['predict'] = proc
+        if JOBS.submit('nba_predict', ['/bin/bash', script_path], cwd=project_root, log_name='nba_predict.log') is None:
+            flash("NBA Prediction is already running.", "warning")
+            return redirect(url_for('basketball.index'))
         
         flash("Started NBA Prediction Pipeline (Tomorrow's Games). Check logs for progress.", "success")
     except Exception as e:
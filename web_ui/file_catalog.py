@@ -0,0 +1,162 @@
+"""
+Incremental index of the output/ files shown on the dashboard.
+
+The index route used to open every predictions CSV (line count) and
+json.load every matches JSON (row count) on each page view. The catalog
+keeps one small record per file (type, date, row count, size, mtime) in
+output/.file_catalog.json and only re-reads files whose size/mtime changed.
+
+A page view costs one stat of output/ (its mtime changes whenever a file is
+created, deleted or atomically replaced); files rewritten in place are picked
+up by a full stat scan at most every RESCAN_INTERVAL seconds.
+"""
+import json
+import os
+import threading
+import time
+
+CATALOG_VERSION = 1
+CATALOG_FILE = ".file_catalog.json"
+# Max seconds before in-place rewrites (same directory mtime) are noticed
+RESCAN_INTERVAL = 30
+
+# prefix, suffix -> type shown on the dashboard
+FILE_TYPES = {
+    ('predictions_', '.csv'): 'Prediction',
+    ('verification_', '.csv'): 'Verification',
+    ('matches_', '.json'): 'Scraped',
+}
+
+
+def file_type(filename):
+    for (prefix, suffix), kind in FILE_TYPES.items():
+        if filename.startswith(prefix) and filename.endswith(suffix):
+            return kind, filename[len(prefix):-len(suffix)]
+    return None, None
+
+
+def count_rows(path, kind):
+    """Data rows of a CSV (lines - header) or entries of a JSON array."""
+    if kind == 'Scraped':
+        with open(path, 'r') as f:
+            return len(json.load(f))
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+        # Last line without a trailing newline
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                lines += 1
+    return max(0, lines - 1)
+
+
+class FileCatalog:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, CATALOG_FILE)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dir_mtime = None
+        self.scanned_at = 0
+        self.views = None
+        self._json_cache = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                payload = json.load(f)
+            if payload.get('version') == CATALOG_VERSION:
+                self.entries = payload['entries']
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'version': CATALOG_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Warning: could not save file catalog: {e}")
+
+    def _scan(self):
+        """Stat every catalogued file type; re-count only new or changed files."""
+        seen = {}
+        changed = False
+        with os.scandir(self.directory) as it:
+            for de in it:
+                kind, date = file_type(de.name)
+                if kind is None or not de.is_file():
+                    continue
+                st = de.stat()
+                old = self.entries.get(de.name)
+                if old and old['size'] == st.st_size and old['mtime'] == st.st_mtime_ns:
+                    seen[de.name] = old
+                    continue
+                try:
+                    count = count_rows(de.path, kind)
+                except Exception:
+                    count = 0
+                seen[de.name] = {'type': kind, 'date': date, 'count': count,
+                                 'size': st.st_size, 'mtime': st.st_mtime_ns}
+                changed = True
+        if changed or seen.keys() != self.entries.keys():
+            self.entries = seen
+            self.views = None
+            self._save()
+
+    def refresh(self, force=False):
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self.entries, self.views = {}, None
+            return
+        now = time.time()
+        if force or dir_mtime != self.dir_mtime or now - self.scanned_at > RESCAN_INTERVAL:
+            self._scan()
+            self.dir_mtime = dir_mtime
+            self.scanned_at = now
+
+    def listing(self):
+        """(predictions, verifications, scraped_data) in the shapes the dashboard template expects."""
+        with self.lock:
+            self.refresh()
+            if self.views is None:
+                predictions, verifications, scraped = [], [], []
+                for name, e in self.entries.items():
+                    if e['type'] == 'Prediction':
+                        predictions.append({'filename': name, 'date': e['date'], 'type': 'Prediction', 'count': e['count']})
+                    elif e['type'] == 'Verification':
+                        verifications.append({'filename': name, 'date': e['date'], 'type': 'Verification'})
+                    else:
+                        scraped.append({'filename': name, 'count': e['count']})
+                predictions.sort(key=lambda x: x['date'], reverse=True)
+                verifications.sort(key=lambda x: x['date'], reverse=True)
+                scraped.sort(key=lambda x: x['filename'], reverse=True)
+                self.views = (predictions, verifications, scraped)
+            return self.views
+
+    def cached_json(self, path, transform=None, default=None):
+        """Parsed (and transformed) content of a JSON file, re-read only when its size/mtime changes."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return default
+        key = (st.st_size, st.st_mtime_ns)
+        with self.lock:
+            cached = self._json_cache.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+            if transform is not None:
+                value = transform(value)
+        except Exception:
+            return default
+        with self.lock:
+            self._json_cache[path] = (key, value)
+        return value
@@ -0,0 +1,224 @@
+"""
+In-process runner for the UI's background jobs (predict, verify, retrain...).
+
+Each job runs its command on a bounded worker pool. The command writes
+straight to logs/<job log> in its own session, so it keeps running (and
+logging) through a UI restart; the worker tails that file into an in-memory
+ring buffer, and every state change or new line wakes the Server-Sent Events
+streams (/events for job states, /events/<name> for one job's log). /status
+reads the same in-memory state, so polling it no longer forks `tail`.
+
+Long-running services (the live loop) are submitted with service=True and
+get their own thread instead of a pool worker.
+
+One job per name is active at a time; a finished job stays visible
+(completed / error / cancelled) until the next run of that name.
+"""
+import collections
+import datetime
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_DIR = os.path.join(PROJECT_ROOT, 'logs')
+
+MAX_WORKERS = 4
+LOG_BUFFER_LINES = 2000
+# Seconds between SIGTERM and SIGKILL when a job is cancelled
+KILL_GRACE = 5
+# Seconds between reads of a running job's log file
+TAIL_INTERVAL = 0.2
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class Job:
+    def __init__(self, name, cmd, cwd, log_name, on_success=None):
+        self.name = name
+        self.cmd = cmd
+        self.cwd = cwd
+        self.log_name = log_name
+        self.on_success = on_success
+        self.state = 'queued'
+        self.msg = ''
+        self.returncode = None
+        self.proc = None
+        self.cancel_requested = False
+        self.submitted_at = datetime.datetime.now()
+        self.started_at = None
+        self.ended_at = None
+        # (line number, text); line numbers keep counting past the buffer size
+        self.lines = collections.deque(maxlen=LOG_BUFFER_LINES)
+        self.line_count = 0
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    def tail(self, n=3):
+        return "\n".join(text for _, text in list(self.lines)[-n:])
+
+    def lines_since(self, seq):
+        return [(i, text) for i, text in list(self.lines) if i > seq]
+
+    def summary(self):
+        info = {'state': self.state}
+        if self.msg:
+            info['msg'] = self.msg
+        if self.started_at:
+            info['start_time'] = self.started_at.isoformat(timespec='seconds')
+        if self.ended_at:
+            info['end_time'] = self.ended_at.isoformat(timespec='seconds')
+        return info
+
+
+class JobRunner:
+    def __init__(self, log_dir=LOG_DIR, max_workers=MAX_WORKERS):
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.jobs = {}
+        # Bumped on every state change / log line; SSE streams wait on it
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def _notify(self):
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+    def wait(self, version, timeout):
+        """Blocks until something changed after `version` (or timeout); returns the current version."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    # --- Submission / cancellation ---
+
+    def is_active(self, name):
+        job = self.jobs.get(name)
+        return job is not None and job.active
+
+    def submit(self, name, cmd, cwd=PROJECT_ROOT, log_name=None, on_success=None, service=False):
+        """
+        Queues a job; returns it, or None if a job with that name is still queued/running.
+        service=True runs it on a dedicated thread, so a job that never ends does not hold a pool worker.
+        """
+        with self.changed:
+            if self.is_active(name):
+                return None
+            job = Job(name, cmd, cwd, log_name or f"{name}.log", on_success)
+            self.jobs[name] = job
+        if service:
+            threading.Thread(target=self._run, args=(job,), name=f'job-{name}', daemon=True).start()
+        else:
+            self.pool.submit(self._run, job)
+        self._notify()
+        return job
+
+    def cancel(self, name):
+        """Cancels a queued or running job; False if there was none."""
+        job = self.jobs.get(name)
+        if job is None or not job.active:
+            return False
+        job.cancel_requested = True
+        if job.proc is not None and job.proc.poll() is None:
+            self._signal(job, signal.SIGTERM)
+            timer = threading.Timer(KILL_GRACE, self._signal, args=(job, signal.SIGKILL))
+            timer.daemon = True
+            timer.start()
+        elif job.state == 'queued':
+            job.state = 'cancelled'
+            job.ended_at = datetime.datetime.now()
+        self._notify()
+        return True
+
+    @staticmethod
+    def _signal(job, sig):
+        # Jobs run in their own session, so the whole tree (bash -> scrapy -> browser) gets the signal
+        if job.proc is not None and job.proc.poll() is None:
+            try:
+                os.killpg(job.proc.pid, sig)
+            except OSError:
+                pass
+
+    # --- Worker ---
+
+    def _append(self, job, text):
+        job.line_count += 1
+        job.lines.append((job.line_count, text))
+        self._notify()
+
+    def _tail(self, job, log_path):
+        """Feeds the log file's new lines into the job's buffer until the process exits."""
+        pending = b''
+        with open(log_path, 'rb') as f:
+            while True:
+                exited = job.proc.poll() is not None
+                chunk = f.read()
+                if chunk:
+                    *lines, pending = (pending + chunk).split(b'\n')
+                    for line in lines:
+                        self._append(job, line.decode(errors='replace').rstrip('\r'))
+                elif exited:
+                    break
+                else:
+                    time.sleep(TAIL_INTERVAL)
+        if pending:
+            self._append(job, pending.decode(errors='replace').rstrip('\r'))
+
+    def _run(self, job):
+        if job.cancel_requested:
+            return
+        job.state = 'running'
+        job.started_at = datetime.datetime.now()
+        self._notify()
+        try:
+            env = dict(os.environ, PYTHONUNBUFFERED='1')
+            log_path = os.path.join(self.log_dir, job.log_name)
+            # The child owns its log file (not a pipe into this process), so it survives a UI restart
+            with open(log_path, 'wb') as log_file:
+                job.proc = subprocess.Popen(job.cmd, cwd=job.cwd, stdout=log_file, stderr=subprocess.STDOUT,
+                                            env=env, start_new_session=True)
+            if job.cancel_requested:
+                self._signal(job, signal.SIGTERM)
+            self._tail(job, log_path)
+            job.returncode = job.proc.wait()
+
+            if job.cancel_requested:
+                job.state = 'cancelled'
+            elif job.returncode == 0:
+                if job.on_success is not None:
+                    job.on_success()
+                job.state = 'completed'
+            else:
+                job.state = 'error'
+                job.msg = job.tail() or f"Exited with code {job.returncode}"
+        except Exception as e:
+            job.state = 'error'
+            job.msg = str(e)
+        finally:
+            job.ended_at = datetime.datetime.now()
+            self._notify()
+
+    # --- Views ---
+
+    def status(self, names=()):
+        """{name: summary} for every known job, plus 'idle' for the expected names never run."""
+        status = {name: {'state': 'idle'} for name in names}
+        for name, job in list(self.jobs.items()):
+            status[name] = job.summary()
+        return status
+
+    def job_for_log(self, log_name):
+        for job in list(self.jobs.values()):
+            if job.log_name == log_name:
+                return job
+        return None
+
+
+JOBS = JobRunner()
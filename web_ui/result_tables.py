@@ -0,0 +1,190 @@
+"""
+Paged, filtered and sorted access to prediction/verification CSVs for /view.
+
+Each file is parsed once per (size, mtime) into rows of display strings,
+per-cell highlight classes (the rules results.html used to apply in Jinja)
+and numeric columns for filtering/sorting. Requests then only slice that
+cache, so a multi-day file opens with its first page instead of every row.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Parsed files kept in memory (least recently viewed dropped first)
+MAX_CACHED_FILES = 8
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+BASE_COLS = ['Date', 'League', 'Home Team', 'Away Team', 'Home', 'Away', 'Score']
+# 1X2 cluster then O/U cluster (prediction and verification variants)
+TARGET_COLS = [
+    'Prediction 1X2', 'Prediction 1X2 Odd', 'Conf 1X2', 'EV 1X2', 'Kelly 1X2', 'Home Win %', 'Draw %', 'Away Win %',
+    'Pred 1X2', 'Actual 1X2', 'Correct 1X2 Label',
+    'Prediction O/U', 'Prediction O/U Odd', 'Conf O/U', 'EV O/U', 'Kelly O/U', 'Over %', 'Under %',
+    'Pred O/U', 'Actual O/U', 'Correct O/U Label'
+]
+EXCLUDE_COLS = ['Home ELO', 'Away ELO', 'Home Form', 'Away Form', 'Adj Logs', 'Match', 'Correct 1X2', 'Correct O/U']
+
+HIGH_CONF = 0.55
+CONF_COLS = ['Conf 1X2', 'Conf O/U']
+EV_COLS = ['EV 1X2', 'EV O/U']
+KELLY_COLS = ['Kelly 1X2', 'Kelly O/U']
+
+
+def view_columns(columns):
+    """Display order: base info, 1X2 cluster, O/U cluster, then the rest (minus noisy columns)."""
+    final_cols = [c for c in BASE_COLS if c in columns]
+    final_cols += [c for c in TARGET_COLS if c in columns]
+    existing = set(final_cols)
+    final_cols += [c for c in columns if c not in existing and c not in EXCLUDE_COLS]
+    return final_cols
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def numeric(series):
+    """'2.50%' / '0.55' / 0.55 -> float (NaN if not a number)."""
+    return pd.to_numeric(series.astype(str).str.rstrip('%'), errors='coerce')
+
+
+def verdict(row, col):
+    """True/False for a Correct 1X2 / Correct O/U result (boolean, 'True' or the ✅/❌ label), else None."""
+    value, label = row.get(col), row.get(f'{col} Label')
+    if value is True or value == 'True' or label == '✅':
+        return True
+    if value is False or value == 'False' or label == '❌':
+        return False
+    return None
+
+
+def cell_class(row, col):
+    """Bootstrap classes of one cell (confidence, value bets and verification results)."""
+    val = row.get(col)
+    bg_class = ""
+    if col in ('Conf 1X2', 'Home Win %', 'Away Win %', 'Draw %', 'Conf O/U', 'Over %', 'Under %'):
+        if to_float(val) >= HIGH_CONF:
+            bg_class = "table-success"
+    if col in EV_COLS and to_float(val) > 0.0:
+        bg_class = "table-warning fw-bold text-dark"
+    if col in KELLY_COLS and val and val not in ("0.00%", "0.0%"):
+        bg_class = "table-warning fw-bold text-dark"
+
+    if col == 'Prediction 1X2' and to_float(row.get('Conf 1X2')) >= HIGH_CONF:
+        bg_class = "table-success fw-bold"
+    if col == 'Prediction O/U' and to_float(row.get('Conf O/U')) >= HIGH_CONF:
+        bg_class = "table-success fw-bold"
+    if col == 'Prediction O/U Odd' and to_float(row.get('Conf O/U')) >= HIGH_CONF:
+        bg_class = "table-success"
+    if col == 'Prediction 1X2 Odd' and to_float(row.get('Conf 1X2')) >= HIGH_CONF:
+        bg_class = "table-success"
+
+    if col in ('Correct 1X2', 'Correct O/U', 'Correct 1X2 Label', 'Correct O/U Label'):
+        if val is True or val in ('True', '✅'):
+            bg_class = "table-success"
+        elif val is False or val in ('False', '❌'):
+            bg_class = "table-danger"
+
+    for market, cols in (('Correct 1X2', ('Prediction 1X2', 'Pred 1X2')), ('Correct O/U', ('Prediction O/U', 'Pred O/U'))):
+        if col in cols:
+            result = verdict(row, market)
+            if result is True:
+                bg_class = "table-success fw-bold"
+            elif result is False:
+                bg_class = "table-danger fw-bold"
+    return bg_class
+
+
+class ParsedTable:
+    def __init__(self, path):
+        df = pd.read_csv(path)
+        self.columns = view_columns(list(df.columns))
+        records = df.fillna('').to_dict(orient='records')
+        # [[display value, class], ...] per row, in display column order
+        self.cells = [[[str(row[c]), cell_class(row, c)] for c in self.columns] for row in records]
+        self.leagues = sorted({str(l) for l in df['League'].dropna()}) if 'League' in df.columns else []
+        self.league = (df['League'].fillna('').astype(str).str.lower().to_numpy(dtype=str)
+                       if 'League' in df.columns else None)
+        self.numeric = {c: numeric(df[c]).to_numpy() for c in self.columns}
+        self.text = {c: df[c].fillna('').astype(str).str.lower().to_numpy(dtype=str) for c in self.columns}
+        self.all_rows = np.arange(len(df))
+
+    def _any(self, cols, test):
+        """Rows where `test` holds for at least one of the (existing) columns; None if none exist."""
+        masks = [test(self.numeric[c]) for c in cols if c in self.numeric]
+        return np.logical_or.reduce(masks) if masks else None
+
+    def query(self, league=None, min_conf=None, min_ev=None, kelly=False, sort=None, desc=True):
+        """Row indices passing the filters, in sort order."""
+        mask = np.ones(len(self.all_rows), dtype=bool)
+        if league and self.league is not None:
+            mask &= np.char.find(self.league, league.lower()) >= 0
+        with np.errstate(invalid='ignore'):
+            for cols, test in ((CONF_COLS, (lambda v: v >= min_conf) if min_conf is not None else None),
+                               (EV_COLS, (lambda v: v >= min_ev) if min_ev is not None else None),
+                               (KELLY_COLS, (lambda v: v > 0) if kelly else None)):
+                if test is not None:
+                    passed = self._any(cols, test)
+                    if passed is not None:
+                        mask &= passed
+        rows = self.all_rows[mask]
+
+        if sort in self.numeric:
+            values = self.numeric[sort][rows]
+            if np.isnan(values).all():
+                keys = self.text[sort][rows]
+                order = np.argsort(keys, kind='stable')
+                rows = rows[order[::-1]] if desc else rows[order]
+            else:
+                # NaNs last in both directions
+                keys = -values if desc else values
+                rows = rows[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')]
+        return rows
+
+
+class ResultTables:
+    def __init__(self, max_files=MAX_CACHED_FILES):
+        self.max_files = max_files
+        self.lock = threading.Lock()
+        self.tables = OrderedDict()
+
+    def get(self, path):
+        """Parsed table of a CSV, re-parsed only when its size/mtime changed."""
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+        with self.lock:
+            cached = self.tables.get(path)
+            if cached and cached[0] == key:
+                self.tables.move_to_end(path)
+                return cached[1]
+        table = ParsedTable(path)
+        with self.lock:
+            self.tables[path] = (key, table)
+            self.tables.move_to_end(path)
+            while len(self.tables) > self.max_files:
+                self.tables.popitem(last=False)
+        return table
+
+    def page(self, path, page=1, per_page=DEFAULT_PAGE_SIZE, **filters):
+        """One page of the filtered/sorted rows plus the counts the viewer shows."""
+        table = self.get(path)
+        rows = table.query(**filters)
+        per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+        page = max(1, page)
+        start = (page - 1) * per_page
+        return {
+            'columns': table.columns,
+            'total': len(table.all_rows),
+            'filtered': len(rows),
+            'page': page,
+            'per_page': per_page,
+            'has_more': start + per_page < len(rows),
+            'rows': [table.cells[i] for i in rows[start:start + per_page]],
+        }